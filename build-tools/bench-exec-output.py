@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Loopback benchmark of printing the output of `neuro exec` and `neuro attach`.
+
+A local stand-in of the monitoring service streams stdout frames over a
+websocket.  The frames are printed to /dev/null the way it was done before,
+decoded, written and flushed one by one, and by the current code path.
+"""
+import asyncio
+import codecs
+import os
+import socket
+import sys
+import time
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+import click
+from aiohttp import web
+
+from neuromation.api import StdStream
+from neuromation.cli.ael import AttachHelper, _process_stdout_non_tty
+
+
+MB = 1024 * 1024
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _before(stream: StdStream) -> None:
+    decoder = codecs.getincrementaldecoder("utf8")("replace")
+    sem = asyncio.Semaphore()
+    while True:
+        chunk = await stream.read_out()
+        if chunk is None:
+            break
+        txt = decoder.decode(bytes(chunk.data))
+        async with sem:
+            sys.stdout.write(txt)
+            sys.stdout.flush()
+
+
+async def _after(stream: StdStream) -> None:
+    root: Any = None  # only used for the header, which is not printed when quiet
+    await _process_stdout_non_tty(root, stream, AttachHelper(quiet=True))
+
+
+async def _run(total: int, frame: int) -> None:
+    payload = b"\x01" + b"0123456789abcde\n" * (frame // 16)
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        resp = web.WebSocketResponse()
+        await resp.prepare(request)
+        for i in range(total // frame):
+            await resp.send_bytes(payload)
+        await resp.close()
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/exec_start", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = _unused_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    cases = {"before": _before, "after": _after}
+    async with aiohttp.ClientSession() as session:
+        for name, case in cases.items():
+            elapsed = await _measure(session, port, case)
+            click.echo(
+                f"{name:<8} {total / MB / elapsed:8.1f} MB/s", file=sys.__stdout__
+            )
+    await runner.cleanup()
+
+
+async def _measure(
+    session: aiohttp.ClientSession,
+    port: int,
+    case: Callable[[StdStream], Awaitable[None]],
+) -> float:
+    stdout = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            started = time.perf_counter()
+            async with session.ws_connect(f"http://127.0.0.1:{port}/exec_start") as ws:
+                await case(StdStream(ws))
+            return time.perf_counter() - started
+        finally:
+            sys.stdout = stdout
+
+
+@click.command()
+@click.option("--size", default=256, show_default=True, help="Megabytes of output.")
+@click.option(
+    "--frame", default=4096, show_default=True, help="Bytes per websocket frame."
+)
+def main(size: int, frame: int) -> None:
+    asyncio.run(_run(size * MB, frame))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of per-file and per-job client overhead.
+
+Compares the token decoding and image parser construction done for every
+item before memoization with the memoized code paths used now.
+"""
+import timeit
+from typing import Callable, Dict
+
+import click
+from jose import jwt
+from yarl import URL
+
+from neuromation.api.login import _AuthToken, _get_username
+from neuromation.api.parsing_utils import _ImageNameParser
+from neuromation.api.url_utils import normalize_storage_path_uri
+
+
+CLUSTER = "default"
+REGISTRY = URL("https://registry.neu.ro")
+IMAGE = "image://default/user/ubuntu:latest"
+
+
+def _make_cases(token: _AuthToken) -> Dict[str, Callable[[], object]]:
+    decode = _get_username.__wrapped__  # type: ignore
+    uri = URL("storage:folder/file.txt")
+    parser = _ImageNameParser(token.username, CLUSTER, REGISTRY)
+
+    def file_before() -> object:
+        return normalize_storage_path_uri(uri, decode(token.token), CLUSTER)
+
+    def file_after() -> object:
+        return normalize_storage_path_uri(uri, token.username, CLUSTER)
+
+    def job_before() -> object:
+        return _ImageNameParser(decode(token.token), CLUSTER, REGISTRY).parse_remote(
+            IMAGE
+        )
+
+    def job_after() -> object:
+        return parser.parse_remote(IMAGE)
+
+    return {
+        "per file, before": file_before,
+        "per file, after": file_after,
+        "per job, before": job_before,
+        "per job, after": job_after,
+    }
+
+
+@click.command()
+@click.option("--number", default=10000, show_default=True, help="Calls per round.")
+@click.option("--repeat", default=5, show_default=True, help="Number of rounds.")
+def main(number: int, repeat: int) -> None:
+    token = _AuthToken.create_non_expiring(
+        jwt.encode({"identity": "user"}, "secret", algorithm="HS256")
+    )
+    for name, case in _make_cases(token).items():
+        best = min(timeit.repeat(case, number=number, repeat=repeat))
+        click.echo(f"{name:<20} {best / number * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
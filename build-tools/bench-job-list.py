@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark of decoding a long job listing.
+
+Decodes a synthetic NDJSON stream the same way as Jobs.list() does, into full
+JobDescription objects and into JobRecord objects with a projection of fields.
+"""
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import click
+from yarl import URL
+
+from neuromation.api.jobs import (
+    _check_job_fields,
+    _job_description_from_api,
+    _job_record_from_api,
+)
+from neuromation.api.parser import Parser
+
+
+def _make_job(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"job-{i:08d}",
+        "status": "succeeded",
+        "history": {
+            "status": "succeeded",
+            "reason": "",
+            "description": "",
+            "created_at": "2020-06-01T12:28:21.298672+00:00",
+            "started_at": "2020-06-01T12:28:59.759433+00:00",
+            "finished_at": "2020-06-01T13:28:59.759433+00:00",
+            "exit_code": 0,
+        },
+        "container": {
+            "image": "image://default/user/ubuntu:latest",
+            "command": "sleep 1h",
+            "resources": {"cpu": 1.0, "memory_mb": 16384},
+            "volumes": [
+                {
+                    "src_storage_uri": "storage://default/user/data",
+                    "dst_path": "/var/storage/data",
+                    "read_only": True,
+                }
+            ],
+        },
+        "is_preemptible": False,
+        "owner": "user",
+        "cluster_name": "default",
+        "uri": f"job://default/user/job-{i:08d}",
+        "http_url": f"https://job-{i:08d}.jobs.neu.ro",
+        "ssh_server": "ssh://nobody@ssh-auth.neu.ro:22",
+        "internal_hostname": f"job-{i:08d}.platformapi-jobs",
+    }
+
+
+@click.command()
+@click.option("--jobs", default=100000, show_default=True, help="Number of jobs.")
+@click.option(
+    "--fields",
+    default="id,status",
+    show_default=True,
+    help="Comma separated fields to fetch in the lightweight mode.",
+)
+def main(jobs: int, fields: str) -> None:
+    config = SimpleNamespace(
+        username="user",
+        cluster_name="default",
+        registry_url=URL("https://registry.neu.ro"),
+    )
+    parse = Parser._create(config)
+    lines = [json.dumps(_make_job(i)).encode() for i in range(jobs)]
+    projection = _check_job_fields(fields.split(","))
+
+    def full(res: Dict[str, Any]) -> object:
+        return _job_description_from_api(res, parse)
+
+    def compact(res: Dict[str, Any]) -> object:
+        record = _job_record_from_api(res, parse, projection)
+        for name in projection:
+            getattr(record, name)
+        return record
+
+    cases: Dict[str, Callable[[Dict[str, Any]], object]] = {
+        "JobDescription": full,
+        f"JobRecord({fields})": compact,
+    }
+    for name, decode in cases.items():
+        started = time.perf_counter()
+        ret: List[object] = [decode(json.loads(line)) for line in lines]
+        elapsed = time.perf_counter() - started
+        click.echo(
+            f"{name:<30} {elapsed:6.2f} s {elapsed / len(ret) * 1e6:8.2f} us/job"
+        )
+
+
+if __name__ == "__main__":
+    main()
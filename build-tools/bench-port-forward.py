@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Loopback benchmark of job port-forwarding.
+
+Forwards a local port through Jobs.port_forward() to a local stand-in of the
+monitoring service which echoes every websocket message back.  Measures the
+throughput of a single connection and the rate of short connections with and
+without pre-opened channels.
+"""
+import asyncio
+import socket
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+import click
+from aiohttp import web
+from yarl import URL
+
+from neuromation.api.core import _Core
+from neuromation.api.jobs import PORT_FORWARD_POOL_SIZE, Jobs
+
+
+MB = 1024 * 1024
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start_echo(handshake_delay: float) -> web.AppRunner:
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        # Emulates the handshake latency of a remote cluster
+        await asyncio.sleep(handshake_delay)
+        resp = web.WebSocketResponse()
+        await resp.prepare(request)
+        async for msg in resp:
+            await resp.send_bytes(msg.data)
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/jobs/job-id/port_forward/{port}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    return runner
+
+
+async def _throughput(port: int, total: int) -> float:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    block = b"x" * (64 * 1024)
+
+    async def send() -> None:
+        for i in range(total // len(block)):
+            writer.write(block)
+            await writer.drain()
+
+    started = time.perf_counter()
+    sender = asyncio.ensure_future(send())
+    received = 0
+    while received < total // len(block) * len(block):
+        received += len(await reader.read(MB))
+    await sender
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return received / MB / elapsed
+
+
+async def _connections(port: int, count: int) -> float:
+    started = time.perf_counter()
+    for i in range(count):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET / HTTP/1.0\r\n\r\n")
+        await reader.read(1024)
+        writer.close()
+    return count / (time.perf_counter() - started)
+
+
+async def _run(total_mb: int, count: int, handshake_delay: float) -> None:
+    runner = await _start_echo(handshake_delay)
+    echo_port = _unused_port()
+    site = web.TCPSite(runner, "127.0.0.1", echo_port)
+    await site.start()
+
+    async def api_auth() -> str:
+        return "Bearer token"
+
+    config: Any = SimpleNamespace(
+        monitoring_url=URL(f"http://127.0.0.1:{echo_port}/jobs"), _api_auth=api_auth
+    )
+    async with aiohttp.ClientSession() as session:
+        jobs = Jobs._create(_Core(session, None), config, None)
+        for pool_size in (0, PORT_FORWARD_POOL_SIZE):
+            port = _unused_port()
+            async with jobs.port_forward("job-id", port, 80, pool_size=pool_size):
+                await asyncio.sleep(handshake_delay + 0.1)
+                mb_per_s = await _throughput(port, total_mb * MB)
+                conn_per_s = await _connections(port, count)
+            click.echo(
+                f"pool size {pool_size}: {mb_per_s:8.1f} MB/s "
+                f"{conn_per_s:8.1f} connections/s"
+            )
+    await runner.cleanup()
+
+
+@click.command()
+@click.option("--size", default=256, show_default=True, help="Megabytes to echo.")
+@click.option(
+    "--connections", default=200, show_default=True, help="Short connections."
+)
+@click.option(
+    "--handshake-delay",
+    default=0.02,
+    show_default=True,
+    help="Emulated websocket handshake latency in seconds.",
+)
+def main(size: int, connections: int, handshake_delay: float) -> None:
+    asyncio.run(_run(size, connections, handshake_delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -40,8 +40,10 @@ from .core import (
 from .images import Images
 from .jobs import (
     Container,
+    ExecResult,
     HTTPPort,
     JobDescription,
+    JobRecord,
     JobRestartPolicy,
     Jobs,
     JobStatus,
@@ -55,7 +57,7 @@ from .parser import Parser
 from .parsing_utils import LocalImage, RemoteImage, TagOption
 from .secrets import Secret, Secrets
 from .server_cfg import Cluster
-from .storage import FileStatus, FileStatusType, Storage
+from .storage import DiskUsage, FileStatus, FileStatusType, Storage
 from .tracing import gen_trace_id
 from .users import Action, Permission, Share, Users
 from .utils import _ContextManager
@@ -67,10 +69,12 @@ __all__ = (
     "CONFIG_ENV_NAME",
     "Jobs",
     "JobDescription",
+    "JobRecord",
     "JobRestartPolicy",
     "JobStatus",
     "JobStatusHistory",
     "JobTelemetry",
+    "ExecResult",
     "Resources",
     "StdStream",
     "Volume",
@@ -89,6 +93,7 @@ __all__ = (
     "Storage",
     "FileStatusType",
     "FileStatus",
+    "DiskUsage",
     "Container",
     "ResourceNotFound",
     "ClientError",
@@ -8,6 +8,7 @@ import re
 import time
 from dataclasses import dataclass
 from email.utils import parsedate
+from http import HTTPStatus
 from pathlib import Path, PurePath
 from typing import (
     AbstractSet,
@@ -45,8 +46,10 @@ from .file_filter import FileFilter, translate
 from .storage import (
     QueuedProgress,
     _always,
+    _format_range,
     _has_magic,
     _magic_check,
+    _slice_stream,
     run_concurrently,
     run_progress,
 )
@@ -345,11 +348,29 @@ class BlobStorage(metaclass=NoPublicConstructor):
             stats = _blob_status_from_response(bucket_name, key, resp)
             yield Blob(resp, stats)
 
-    async def fetch_blob(self, bucket_name: str, key: str) -> AsyncIterator[bytes]:
-        """ Return only bytes data of the blob
+    async def fetch_blob(
+        self, bucket_name: str, key: str, offset: int = 0
+    ) -> AsyncIterator[bytes]:
+        """ Return only bytes data of the blob starting from *offset*
         """
-        async with self.get_blob(bucket_name, key) as blob:
-            async for data in blob.body_stream.iter_any():
+        if not offset:
+            async with self.get_blob(bucket_name, key) as blob:
+                async for data in blob.body_stream.iter_any():
+                    yield data
+            return
+
+        url = self._config.blob_storage_url / "o" / bucket_name / key
+        auth = await self._config._api_auth()
+        timeout = attr.evolve(self._core.timeout, sock_read=None)
+        headers = {"Range": _format_range(offset, None)}
+        async with self._core.request(
+            "GET", url, headers=headers, timeout=timeout, auth=auth
+        ) as resp:
+            stream: AsyncIterator[bytes] = resp.content.iter_any()
+            if resp.status != HTTPStatus.PARTIAL_CONTENT:
+                # The server ignored Range header and sent the whole blob
+                stream = _slice_stream(stream, offset, None)
+            async for data in stream:
                 yield data
 
     async def put_blob(
@@ -654,21 +675,37 @@ class BlobStorage(metaclass=NoPublicConstructor):
         progress: QueuedProgress,
     ) -> None:
         loop = asyncio.get_event_loop()
+        bucket_name, key = self._extract_bucket_and_key(src)
         async with self._file_sem:
             await progress.start(StorageProgressStart(src, dst, size))
-            for retry in retries(f"Fail to download {src}"):
-                async with retry:
-                    with dst_path.open("wb") as stream:
-                        pos = 0
-                        bucket_name, key = self._extract_bucket_and_key(src)
+            with dst_path.open("wb") as stream:
+                pos = 0
+                for attempt, retry in enumerate(retries(f"Fail to download {src}")):
+                    async with retry:
+                        if attempt and pos:
+                            stat = await self.head_blob(
+                                bucket_name=bucket_name, key=key
+                            )
+                            if stat.size != size:
+                                if not stream.seekable():
+                                    raise OSError(
+                                        errno.EIO, "Blob was modified", str(src)
+                                    )
+                                log.info(f"{src} was modified, restart downloading")
+                                size = stat.size
+                                pos = 0
+                                stream.seek(0)
+                                stream.truncate()
+                        if pos and pos >= size:
+                            break
                         async for chunk in self.fetch_blob(
-                            bucket_name=bucket_name, key=key
+                            bucket_name=bucket_name, key=key, offset=pos
                         ):
+                            await loop.run_in_executor(None, stream.write, chunk)
                             pos += len(chunk)
                             await progress.step(
                                 StorageProgressStep(src, dst, pos, size)
                             )
-                            await loop.run_in_executor(None, stream.write, chunk)
             await progress.complete(StorageProgressComplete(src, dst, size))
 
     async def download_dir(
@@ -49,6 +49,7 @@ class Client(metaclass=NoPublicConstructor):
         if self._closed:
             return
         self._closed = True
+        await self._jobs._close()
         with self._config._open_db() as db:
             self._core._save_cookie(db)
         await self._core.close()
@@ -578,12 +578,20 @@ def _validate_user_config(
     # Right now this functionality is skipped for the sake of simplicity.
     _check_sections(config, {"alias", "job", "storage"}, filename)
     _check_section(
-        config, "job", {"ps-format": str, "life-span": str}, filename,
+        config,
+        "job",
+        {"ps-format": str, "life-span": str, "index-max-age": numbers.Real},
+        filename,
     )
     _check_section(
         config,
         "storage",
-        {"cp-exclude": (list, str), "cp-exclude-from-files": (list, str)},
+        {
+            "cp-exclude": (list, str),
+            "cp-exclude-from-files": (list, str),
+            "metadata-cache-ttl": numbers.Real,
+            "metadata-cache-persistent": bool,
+        },
         filename,
     )
     aliases = config.get("alias", {})
@@ -1,12 +1,18 @@
+import asyncio
 import contextlib
+import hashlib
+import json
 import logging
 import re
 from dataclasses import replace
-from typing import Any, Dict, List, Optional, Set
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
 
 import aiodocker
 import aiohttp
+import attr
 from aiodocker.exceptions import DockerError
+from yarl import URL
 
 from .abc import (
     AbstractDockerImageProgress,
@@ -18,14 +24,32 @@ from .abc import (
     ImageProgressStep,
 )
 from .config import Config
-from .core import AuthorizationError, _Core
+from .core import AuthorizationError, ResourceNotFound, _Core
 from .parser import Parser
-from .parsing_utils import LocalImage, RemoteImage, TagOption, _as_repo_str
-from .utils import NoPublicConstructor
+from .parsing_utils import (
+    LocalImage,
+    RemoteImage,
+    TagOption,
+    _as_repo_str,
+    _is_in_neuro_registry,
+)
+from .utils import NoPublicConstructor, _run_ordered
 
 
 log = logging.getLogger(__name__)
 
+# Number of blobs transferred concurrently by Images.pull_layout() and
+# Images.push_layout()
+BLOB_CONCURRENCY = 4
+READ_SIZE = 2 ** 20  # 1 MiB
+
+MANIFEST_MEDIA_TYPES = (
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+)
+OCI_LAYOUT = {"imageLayoutVersion": "1.0.0"}
+REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+
 
 class Images(metaclass=NoPublicConstructor):
     def __init__(self, core: _Core, config: Config, parse: Parser) -> None:
@@ -135,6 +159,188 @@ class Images(metaclass=NoPublicConstructor):
 
         return local
 
+    async def pull_layout(
+        self,
+        remote: RemoteImage,
+        path: Path,
+        *,
+        concurrency: int = BLOB_CONCURRENCY,
+        progress: Optional[AbstractDockerImageProgress] = None,
+    ) -> None:
+        """Download an image from the registry into an OCI image layout at *path*.
+
+        The local Docker daemon is not used.  Blobs are downloaded concurrently
+        and verified by their digests, blobs present in the layout are skipped.
+        The image is added to the layout's index with its tag as the ref name.
+        """
+        if progress is None:
+            progress = _DummyProgress()
+        tag = remote.tag or "latest"
+        name = self._registry_name(remote)
+        auth = await self._config._registry_auth()
+        headers = {"Accept": ", ".join(MANIFEST_MEDIA_TYPES)}
+        try:
+            async with self._core.request(
+                "GET",
+                self._registry_url / name / "manifests" / tag,
+                auth=auth,
+                headers=headers,
+            ) as resp:
+                raw = await resp.read()
+                content_type = resp.content_type
+                expected = resp.headers.get("Docker-Content-Digest")
+        except ResourceNotFound as error:
+            raise ValueError(f"Image {remote} was not found in registry") from error
+        digest = _sha256_digest(raw)
+        if expected is not None and expected != digest:
+            raise ValueError(f"Digest mismatch of manifest of {remote}")
+        manifest = json.loads(raw)
+        media_type = manifest.get("mediaType", content_type)
+        if media_type not in MANIFEST_MEDIA_TYPES:
+            raise ValueError(f"Unsupported manifest type {media_type} of {remote}")
+
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, lambda: _blobs_dir(path).mkdir(parents=True, exist_ok=True)
+        )
+        blobs = _unique_blobs(manifest)
+        async for blob, err in _run_ordered(
+            lambda blob: self._download_blob(name, blob["digest"], path, progress),
+            blobs,
+            concurrency,
+        ):
+            if err is not None:
+                raise err
+        await loop.run_in_executor(
+            None, _add_to_layout, path, raw, media_type, digest, tag
+        )
+
+    async def push_layout(
+        self,
+        path: Path,
+        remote: RemoteImage,
+        *,
+        concurrency: int = BLOB_CONCURRENCY,
+        progress: Optional[AbstractDockerImageProgress] = None,
+    ) -> RemoteImage:
+        """Upload an image from an OCI image layout at *path* to the registry.
+
+        The local Docker daemon is not used.  The image is looked up in the
+        layout's index by the tag of *remote* unless it is the only one.  Blobs
+        are verified by their digests and uploaded concurrently, blobs present
+        in the registry are skipped.
+        """
+        if progress is None:
+            progress = _DummyProgress()
+        if remote.tag is None:
+            remote = replace(remote, tag="latest")
+        assert remote.tag is not None
+        name = self._registry_name(remote)
+        loop = asyncio.get_event_loop()
+        descriptor = await loop.run_in_executor(None, _find_in_layout, path, remote.tag)
+        raw = await loop.run_in_executor(
+            None, _blob_path(path, descriptor["digest"]).read_bytes
+        )
+        if _sha256_digest(raw) != descriptor["digest"]:
+            raise ValueError(f"Digest mismatch of manifest {descriptor['digest']}")
+        manifest = json.loads(raw)
+
+        blobs = _unique_blobs(manifest)
+        async for blob, err in _run_ordered(
+            lambda blob: self._upload_blob(name, blob["digest"], path, progress),
+            blobs,
+            concurrency,
+        ):
+            if err is not None:
+                raise err
+
+        auth = await self._config._registry_auth()
+        media_type = manifest.get("mediaType", descriptor["mediaType"])
+        async with self._core.request(
+            "PUT",
+            self._registry_url / name / "manifests" / remote.tag,
+            auth=auth,
+            data=raw,
+            headers={"Content-Type": media_type},
+        ) as resp:
+            resp  # resp.status == 201
+        return remote
+
+    def _registry_name(self, image: RemoteImage) -> str:
+        if not _is_in_neuro_registry(image):
+            raise ValueError(f"Image `{image}` must be in the neuromation registry")
+        return f"{image.owner}/{image.name}"
+
+    async def _download_blob(
+        self, name: str, digest: str, path: Path, progress: AbstractDockerImageProgress,
+    ) -> None:
+        target = _blob_path(path, digest)
+        layer_id = _short_digest(digest)
+        if target.exists():
+            progress.step(ImageProgressStep(f"{layer_id}: Already exists", layer_id))
+            return
+        loop = asyncio.get_event_loop()
+        partial = target.with_name(target.name + ".partial")
+        hasher = hashlib.sha256()
+        auth = await self._config._registry_auth()
+        timeout = attr.evolve(self._core.timeout, sock_read=None)
+        try:
+            async with self._core.request(
+                "GET",
+                self._registry_url / name / "blobs" / digest,
+                auth=auth,
+                timeout=timeout,
+            ) as resp:
+                with partial.open("wb") as stream:
+                    async for chunk in resp.content.iter_chunked(READ_SIZE):
+                        hasher.update(chunk)
+                        await loop.run_in_executor(None, stream.write, chunk)
+            if "sha256:" + hasher.hexdigest() != digest:
+                raise ValueError(f"Digest mismatch of blob {digest}")
+        except BaseException:
+            # Also an interrupted download is not left in the layout
+            with contextlib.suppress(FileNotFoundError):
+                partial.unlink()
+            raise
+        partial.replace(target)
+        progress.step(ImageProgressStep(f"{layer_id}: Pull complete", layer_id))
+
+    async def _upload_blob(
+        self, name: str, digest: str, path: Path, progress: AbstractDockerImageProgress,
+    ) -> None:
+        source = _blob_path(path, digest)
+        layer_id = _short_digest(digest)
+        url = self._registry_url / name / "blobs"
+        auth = await self._config._registry_auth()
+        try:
+            async with self._core.request("HEAD", url / digest, auth=auth) as resp:
+                resp
+        except ResourceNotFound:
+            pass
+        else:
+            progress.step(
+                ImageProgressStep(f"{layer_id}: Layer already exists", layer_id)
+            )
+            return
+
+        loop = asyncio.get_event_loop()
+        if await loop.run_in_executor(None, _file_digest, source) != digest:
+            raise ValueError(f"Digest mismatch of blob {digest}")
+        async with self._core.request("POST", url / "uploads/", auth=auth) as resp:
+            location = self._registry_url.join(URL(resp.headers["Location"]))
+        location = location.with_query({**location.query, "digest": digest})
+        timeout = attr.evolve(self._core.timeout, sock_read=None)
+        async with self._core.request(
+            "PUT",
+            location,
+            auth=auth,
+            data=_iterate_file(source),
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=timeout,
+        ) as resp:
+            resp  # resp.status == 201
+        progress.step(ImageProgressStep(f"{layer_id}: Pushed", layer_id))
+
     async def ls(self) -> List[RemoteImage]:
         auth = await self._config._registry_auth()
         async with self._core.request(
@@ -193,6 +399,96 @@ def _raise_on_error_chunk(obj: Dict[str, Any]) -> None:
         raise DockerError(900, error_details)
 
 
+def _sha256_digest(data: bytes) -> str:
+    return "sha256:" + hashlib.sha256(data).hexdigest()
+
+
+def _short_digest(digest: str) -> str:
+    return digest.partition(":")[2][:12]
+
+
+def _unique_blobs(manifest: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # The same layer may be repeated in an image, every blob is transferred once
+    blobs = [manifest["config"], *manifest["layers"]]
+    return list({blob["digest"]: blob for blob in blobs}.values())
+
+
+def _blobs_dir(path: Path) -> Path:
+    return path / "blobs" / "sha256"
+
+
+def _blob_path(path: Path, digest: str) -> Path:
+    algorithm, sep, hex = digest.partition(":")
+    if algorithm != "sha256" or not re.fullmatch(r"[0-9a-f]{64}", hex):
+        raise ValueError(f"Unsupported digest {digest}")
+    return _blobs_dir(path) / hex
+
+
+def _file_digest(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as stream:
+        for chunk in iter(lambda: stream.read(READ_SIZE), b""):
+            hasher.update(chunk)
+    return "sha256:" + hasher.hexdigest()
+
+
+async def _iterate_file(path: Path) -> AsyncIterator[bytes]:
+    loop = asyncio.get_event_loop()
+    with path.open("rb") as stream:
+        chunk = await loop.run_in_executor(None, stream.read, READ_SIZE)
+        while chunk:
+            yield chunk
+            chunk = await loop.run_in_executor(None, stream.read, READ_SIZE)
+
+
+def _load_index(path: Path) -> Dict[str, Any]:
+    try:
+        with (path / "index.json").open() as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"schemaVersion": 2, "manifests": []}
+
+
+def _add_to_layout(
+    path: Path, raw: bytes, media_type: str, digest: str, tag: str
+) -> None:
+    blob = _blob_path(path, digest)
+    if not blob.exists():
+        blob.write_bytes(raw)
+    (path / "oci-layout").write_text(json.dumps(OCI_LAYOUT))
+    index = _load_index(path)
+    # The tag is moved to the pulled manifest
+    manifests = [
+        item
+        for item in index["manifests"]
+        if item.get("annotations", {}).get(REF_NAME_ANNOTATION) != tag
+    ]
+    manifests.append(
+        {
+            "mediaType": media_type,
+            "digest": digest,
+            "size": len(raw),
+            "annotations": {REF_NAME_ANNOTATION: tag},
+        }
+    )
+    index["manifests"] = manifests
+    tmp = path / "index.json.partial"
+    tmp.write_text(json.dumps(index, indent=2))
+    tmp.replace(path / "index.json")
+
+
+def _find_in_layout(path: Path, tag: str) -> Dict[str, Any]:
+    if not (path / "oci-layout").exists():
+        raise ValueError(f"{path} is not an OCI image layout")
+    manifests = _load_index(path)["manifests"]
+    for item in manifests:
+        if item.get("annotations", {}).get(REF_NAME_ANNOTATION) == tag:
+            return item
+    if len(manifests) == 1:
+        return manifests[0]
+    raise ValueError(f"Image with tag {tag} was not found in {path}")
+
+
 class _DummyProgress(AbstractDockerImageProgress):
     def pull(self, data: ImageProgressPull) -> None:
         pass
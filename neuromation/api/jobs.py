@@ -2,20 +2,31 @@ import asyncio
 import enum
 import json
 import logging
+import sqlite3
+import time
+from collections import deque
 from contextlib import suppress
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields as dataclass_fields
 from datetime import datetime, timezone
 from functools import partial
+from http import HTTPStatus
 from typing import (
+    AbstractSet,
     Any,
     AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
     Dict,
     Iterable,
     List,
     Mapping,
     Optional,
     Sequence,
+    Set,
+    Tuple,
     Union,
+    overload,
 )
 
 import aiohttp
@@ -43,13 +54,86 @@ from .images import (
 from .parser import Parser, Volume
 from .parsing_utils import LocalImage, RemoteImage, _as_repo_str, _is_in_neuro_registry
 from .url_utils import normalize_storage_path_uri
-from .utils import NoPublicConstructor, asynccontextmanager
+from .utils import (
+    NoPublicConstructor,
+    _run_ordered,
+    _TokenBucket,
+    asynccontextmanager,
+    flat,
+    retries,
+)
 
 
 log = logging.getLogger(__name__)
 
 INVALID_IMAGE_NAME = "INVALID-IMAGE-NAME"
 
+# The local job index is used as is if it is younger than INDEX_REFRESH_AGE
+# seconds, refreshed in background if it is younger than max_age and refreshed
+# before answering otherwise.  The background refresh is cancelled on close.
+INDEX_REFRESH_AGE = 5.0
+INDEX_MAX_AGE = 60.0
+INDEX_BATCH_SIZE = 1000
+
+# Delays between checks of job statuses by Jobs.wait()
+WAIT_MIN_DELAY = 0.2
+WAIT_MAX_DELAY = 2.0
+# Jobs.wait() checks so many jobs or fewer one by one, more by listing them
+WAIT_LIST_THRESHOLD = 10
+
+# Number of concurrent submits by Jobs.run_many()
+RUN_CONCURRENCY = 10
+
+# Number of concurrent kills by Jobs.kill_many()
+KILL_CONCURRENCY = 20
+
+# Number of concurrent exec sessions by Jobs.exec_many()
+EXEC_CONCURRENCY = 20
+# Delay between checks of a finished exec session's exit code
+EXEC_POLL_DELAY = 0.2
+
+# Number of port-forwarding websockets opened in advance per forwarded port,
+# an idle one is replaced by a new one after PORT_FORWARD_CHANNEL_TTL seconds
+PORT_FORWARD_POOL_SIZE = 2
+PORT_FORWARD_CHANNEL_TTL = 10.0
+# Max size of a forwarded websocket message, and of data buffered for a local
+# connection before waiting for it to drain
+PORT_FORWARD_CHUNK = 256 * 1024
+PORT_FORWARD_HIGH_WATER = 1024 * 1024
+
+SCHEMA = {
+    "job_index": flat(
+        """
+        CREATE TABLE job_index (id TEXT PRIMARY KEY,
+                                cluster_name TEXT,
+                                owner TEXT,
+                                name TEXT,
+                                status TEXT,
+                                tags TEXT,
+                                created_at REAL,
+                                data TEXT)"""
+    ),
+    "job_index_sync": flat(
+        """
+        CREATE TABLE job_index_sync (cluster_name TEXT PRIMARY KEY,
+                                     username TEXT,
+                                     timestamp REAL)"""
+    ),
+    "job_index_name": "CREATE INDEX job_index_name ON job_index (cluster_name, name)",
+    "job_index_created_at": flat(
+        """
+        CREATE INDEX job_index_created_at ON job_index (cluster_name,
+                                                        created_at,
+                                                        id)"""
+    ),
+}
+DROP = {
+    "job_index": "DROP TABLE IF EXISTS job_index",
+    "job_index_sync": "DROP TABLE IF EXISTS job_index_sync",
+    "job_index_name": "DROP INDEX IF EXISTS job_index_name",
+    "job_index_created_at": "DROP INDEX IF EXISTS job_index_created_at",
+}
+
 
 @dataclass(frozen=True)
 class Resources:
@@ -142,6 +226,67 @@ class JobDescription:
     life_span: Optional[float] = None
 
 
+JOB_FIELDS = tuple(f.name for f in dataclass_fields(JobDescription))
+
+
+class JobRecord:
+    """Compact read-only job record returned by Jobs.list(fields=...).
+
+    Has the same attributes as JobDescription, every attribute is decoded
+    from the raw server response on first access.  Accessing an attribute
+    not listed in *fields* raises AttributeError.
+    """
+
+    __slots__ = ("_data", "_parse", "_fields") + JOB_FIELDS
+
+    id: str
+    owner: str
+    cluster_name: str
+    status: JobStatus
+    history: JobStatusHistory
+    container: Container
+    is_preemptible: bool
+    uri: URL
+    name: Optional[str]
+    tags: Sequence[str]
+    description: Optional[str]
+    http_url: URL
+    ssh_server: URL
+    internal_hostname: Optional[str]
+    restart_policy: JobRestartPolicy
+    life_span: Optional[float]
+
+    def __init__(
+        self, data: Dict[str, Any], parse: Parser, fields: AbstractSet[str]
+    ) -> None:
+        self._data = data
+        self._parse = parse
+        self._fields = fields
+
+    def __getattr__(self, name: str) -> Any:
+        # Called only for slots that are not decoded yet
+        if name not in _JOB_FIELD_DECODERS:
+            raise AttributeError(name)
+        if name not in self._fields:
+            raise AttributeError(f"Field {name!r} is not fetched")
+        value = _JOB_FIELD_DECODERS[name](self._data, self._parse)
+        object.__setattr__(self, name, value)
+        return value
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in _JOB_FIELD_DECODERS:
+            raise AttributeError(f"Field {name!r} is read-only")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in JOB_FIELDS
+            if name in self._fields
+        )
+        return f"JobRecord({fields})"
+
+
 @dataclass(frozen=True)
 class JobTelemetry:
     cpu: float
@@ -162,10 +307,17 @@ class ExecInspect:
     command: str
 
 
+@dataclass(frozen=True)
+class ExecResult:
+    exit_code: int
+    stdout: bytes
+    stderr: bytes
+
+
 @dataclass(frozen=True)
 class Message:
     fileno: int
-    data: bytes
+    data: memoryview
 
 
 class StdStream:
@@ -184,7 +336,8 @@ class StdStream:
         if msg.type in (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.CLOSED):
             self._closing = True
             return None
-        return Message(msg.data[0], msg.data[1:])
+        # The payload is not copied out of the frame
+        return Message(msg.data[0], memoryview(msg.data)[1:])
 
     async def write_in(self, data: bytes) -> None:
         if self._closing:
@@ -192,11 +345,194 @@ class StdStream:
         await self._ws.send_bytes(data)
 
 
+class _ChannelPool:
+    """Websockets opened in advance for connections forwarded to a job port.
+
+    The server forwards a single connection over a websocket, so channels are
+    not reused; having a few open takes the handshake off the path of short
+    connections.  A message is received on every idle channel, a channel
+    closed by the server is replaced at once and the first message of an
+    alive one is handed over with it.  Idle channels are replaced after *ttl*
+    seconds since the job's server may drop their connections silently.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[aiohttp.ClientWebSocketResponse]],
+        size: int,
+        ttl: float,
+    ) -> None:
+        self._connect = connect
+        self._size = size
+        self._ttl = ttl
+        self._idle: Deque[_IdleChannel] = deque()
+        self._opening = 0
+        self._closed = False
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def warm(self) -> None:
+        if self._closed:
+            return
+        while len(self._idle) + self._opening < self._size:
+            self._opening += 1
+            self._spawn(self._open())
+
+    async def get(
+        self,
+    ) -> Tuple[
+        aiohttp.ClientWebSocketResponse, Optional["asyncio.Future[aiohttp.WSMessage]"]
+    ]:
+        # Return a channel and the receiving of its first message if it was
+        # started while the channel was idle
+        try:
+            while self._idle:
+                channel = self._idle.popleft()
+                if (
+                    time.monotonic() - channel.created < self._ttl
+                    and not channel.is_closing()
+                ):
+                    return channel.ws, channel.received
+                self._discard(channel)
+            return await self._connect(), None
+        finally:
+            self.warm()
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._idle:
+            channel = self._idle.popleft()
+            channel.received.cancel()
+            await channel.ws.close()
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _discard(self, channel: "_IdleChannel") -> None:
+        channel.received.cancel()
+        self._spawn(channel.ws.close())
+
+    async def _open(self) -> None:
+        try:
+            ws = await self._connect()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.debug("Failed to open a port-forwarding channel", exc_info=True)
+            return
+        finally:
+            self._opening -= 1
+        if self._closed:
+            await ws.close()
+            return
+        channel = _IdleChannel(
+            time.monotonic(), ws, asyncio.ensure_future(ws.receive())
+        )
+        self._idle.append(channel)
+        channel.received.add_done_callback(lambda fut: self._on_received(channel))
+        asyncio.get_event_loop().call_later(self._ttl, self._expire)
+
+    def _on_received(self, channel: "_IdleChannel") -> None:
+        if channel.is_closing() and channel in self._idle:
+            self._idle.remove(channel)
+            self._discard(channel)
+            self.warm()
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._idle and now - self._idle[0].created >= self._ttl:
+            self._discard(self._idle.popleft())
+        self.warm()
+
+
+@dataclass
+class _IdleChannel:
+    created: float
+    ws: aiohttp.ClientWebSocketResponse
+    received: "asyncio.Future[aiohttp.WSMessage]"
+
+    def is_closing(self) -> bool:
+        if not self.received.done():
+            return False
+        if self.received.cancelled() or self.received.exception() is not None:
+            return True
+        return self.received.result().type != WSMsgType.BINARY
+
+
 class Jobs(metaclass=NoPublicConstructor):
     def __init__(self, core: _Core, config: Config, parse: Parser) -> None:
         self._core = core
         self._config = config
         self._parse = parse
+        self._index_max_age: Optional[float] = None
+        self._index_task: Optional["asyncio.Task[None]"] = None
+
+    def enable_index(self, max_age: float = INDEX_MAX_AGE) -> None:
+        if max_age <= 0:
+            raise ValueError("max_age should be positive")
+        self._index_max_age = max_age
+
+    def disable_index(self) -> None:
+        self._index_max_age = None
+
+    async def sync_index(self) -> None:
+        cluster_name = self._config.cluster_name
+        with self._config._open_db() as db:
+            state = _load_index_state(db, cluster_name, self._config.username)
+        started = time.time()
+        seen: Set[str] = set()
+
+        async def save(items: AsyncIterator[Dict[str, Any]]) -> None:
+            batch: List[Dict[str, Any]] = []
+            async for res in items:
+                seen.add(res["id"])
+                batch.append(res)
+                if len(batch) >= INDEX_BATCH_SIZE:
+                    with self._config._open_db() as db:
+                        _save_index(db, batch)
+                    batch = []
+            with self._config._open_db() as db:
+                _save_index(db, batch)
+
+        if state is None:
+            await save(self._list_raw())
+        else:
+            created_at, live = state
+            # Jobs which are not finished
+            await save(self._list_raw(statuses=(JobStatus.PENDING, JobStatus.RUNNING)))
+            # Created jobs and jobs which were not finished at the last sync and
+            # are finished now, the margin covers the rounding of creation times
+            finished = live.keys() - seen
+            oldest = min([created_at, *(live[id] for id in finished)])
+            since = datetime.fromtimestamp(oldest - 1.0, timezone.utc)
+            await save(self._list_raw(since=since))
+            # Jobs which are not listed anymore are deleted
+            with self._config._open_db() as db:
+                for id in finished - seen:
+                    _drop_index(db, id)
+        with self._config._open_db() as db:
+            _save_index_state(db, cluster_name, self._config.username, started)
+
+    def _refresh_index(self) -> "asyncio.Task[None]":
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.ensure_future(self.sync_index())
+        return self._index_task
+
+    async def _close(self) -> None:
+        # Do not wait for the background refresh of the job index, the index
+        # stays consistent as the sync time is saved after all changes only
+        if self._index_task is not None:
+            self._index_task.cancel()
+            try:
+                await self._index_task
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                log.debug("Job index refresh has failed", exc_info=True)
 
     async def run(
         self,
@@ -231,7 +567,79 @@ class Jobs(metaclass=NoPublicConstructor):
         auth = await self._config._api_auth()
         async with self._core.request("POST", url, json=payload, auth=auth) as resp:
             res = await resp.json()
-            return _job_description_from_api(res, self._parse)
+        if self._index_max_age is not None:
+            with self._config._open_db() as db:
+                _save_index(db, [res])
+        return _job_description_from_api(res, self._parse)
+
+    async def run_many(
+        self,
+        containers: Iterable[Container],
+        *,
+        concurrency: int = RUN_CONCURRENCY,
+        rate: Optional[float] = None,
+        tags: Sequence[str] = (),
+        description: Optional[str] = None,
+        is_preemptible: bool = False,
+        schedule_timeout: Optional[float] = None,
+        restart_policy: JobRestartPolicy = JobRestartPolicy.NEVER,
+        life_span: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[Container, Optional[JobDescription], Optional[Exception]]]:
+        # Up to *concurrency* submits are in flight, and no more than *rate*
+        # submits are started per second.
+        bucket = _TokenBucket(rate) if rate is not None else None
+        started: Dict[int, JobDescription] = {}
+
+        async def run(item: Tuple[int, Container]) -> None:
+            index, container = item
+            if bucket is not None:
+                await bucket.acquire()
+            started[index] = await self.run(
+                container,
+                tags=tags,
+                description=description,
+                is_preemptible=is_preemptible,
+                schedule_timeout=schedule_timeout,
+                restart_policy=restart_policy,
+                life_span=life_span,
+            )
+
+        async for (index, container), error in _run_ordered(
+            run, enumerate(containers), concurrency
+        ):
+            yield container, started.pop(index, None), error
+
+    @overload
+    def list(
+        self,
+        *,
+        statuses: Iterable[JobStatus] = (),
+        name: str = "",
+        tags: Iterable[str] = (),
+        owners: Iterable[str] = (),
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        reverse: bool = False,
+        limit: Optional[int] = None,
+        fields: None = None,
+    ) -> AsyncIterator[JobDescription]:  # pragma: no cover
+        pass
+
+    @overload
+    def list(
+        self,
+        *,
+        statuses: Iterable[JobStatus] = (),
+        name: str = "",
+        tags: Iterable[str] = (),
+        owners: Iterable[str] = (),
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        reverse: bool = False,
+        limit: Optional[int] = None,
+        fields: Iterable[str],
+    ) -> AsyncIterator[JobRecord]:  # pragma: no cover
+        pass
 
     async def list(
         self,
@@ -244,7 +652,55 @@ class Jobs(metaclass=NoPublicConstructor):
         until: Optional[datetime] = None,
         reverse: bool = False,
         limit: Optional[int] = None,
-    ) -> AsyncIterator[JobDescription]:
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[Union[JobDescription, JobRecord]]:
+        if fields is None:
+            decode: Callable[
+                [Dict[str, Any]], Union[JobDescription, JobRecord]
+            ] = partial(_job_description_from_api, parse=self._parse)
+        else:
+            decode = partial(
+                _job_record_from_api,
+                parse=self._parse,
+                fields=_check_job_fields(fields),
+            )
+        if self._index_max_age is None:
+            items = self._list_raw(
+                statuses=statuses,
+                name=name,
+                tags=tags,
+                owners=owners,
+                since=since,
+                until=until,
+                reverse=reverse,
+                limit=limit,
+            )
+        else:
+            items = self._list_index(
+                statuses=statuses,
+                name=name,
+                tags=tags,
+                owners=owners,
+                since=since,
+                until=until,
+                reverse=reverse,
+                limit=limit,
+            )
+        async for res in items:
+            yield decode(res)
+
+    async def _list_raw(
+        self,
+        *,
+        statuses: Iterable[JobStatus] = (),
+        name: str = "",
+        tags: Iterable[str] = (),
+        owners: Iterable[str] = (),
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        reverse: bool = False,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
         url = self._config.api_url / "jobs"
         headers = {"Accept": "application/x-ndjson"}
         params: MultiDict[str] = MultiDict()
@@ -257,14 +713,9 @@ class Jobs(metaclass=NoPublicConstructor):
         for tag in tags:
             params.add("tag", tag)
         if since:
-            if since.tzinfo is None:
-                # Interpret naive datetime object as local time.
-                since = since.astimezone(timezone.utc)
-            params.add("since", since.isoformat())
+            params.add("since", _aware_datetime(since).isoformat())
         if until:
-            if until.tzinfo is None:
-                until = until.astimezone(timezone.utc)
-            params.add("until", until.isoformat())
+            params.add("until", _aware_datetime(until).isoformat())
         params["cluster_name"] = self._config.cluster_name
         if reverse:
             params.add("reverse", "1")
@@ -277,11 +728,58 @@ class Jobs(metaclass=NoPublicConstructor):
             if resp.headers.get("Content-Type", "").startswith("application/x-ndjson"):
                 async for line in resp.content:
                     j = json.loads(line)
-                    yield _job_description_from_api(j, self._parse)
+                    yield j
             else:
                 ret = await resp.json()
                 for j in ret["jobs"]:
-                    yield _job_description_from_api(j, self._parse)
+                    yield j
+
+    async def _list_index(
+        self,
+        *,
+        statuses: Iterable[JobStatus] = (),
+        name: str = "",
+        tags: Iterable[str] = (),
+        owners: Iterable[str] = (),
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        reverse: bool = False,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        assert self._index_max_age is not None
+        cluster_name = self._config.cluster_name
+        with self._config._open_db() as db:
+            timestamp = _load_index_timestamp(db, cluster_name, self._config.username)
+        if timestamp is None or time.time() - timestamp >= self._index_max_age:
+            await self._refresh_index()
+        elif time.time() - timestamp >= INDEX_REFRESH_AGE:
+            self._refresh_index()
+
+        tags = set(tags)
+        count = 0
+        after: Optional[Tuple[float, str]] = None
+        while limit is None or count < limit:
+            with self._config._open_db() as db:
+                rows = _load_index(
+                    db,
+                    cluster_name,
+                    statuses=statuses,
+                    name=name,
+                    owners=owners,
+                    since=since,
+                    until=until,
+                    reverse=reverse,
+                    after=after,
+                )
+            if not rows:
+                return
+            for row in rows:
+                if tags <= set(json.loads(row["tags"])):
+                    yield json.loads(row["data"])
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+            after = rows[-1]["created_at"], rows[-1]["id"]
 
     async def kill(self, id: str) -> None:
         url = self._config.api_url / "jobs" / id
@@ -290,26 +788,103 @@ class Jobs(metaclass=NoPublicConstructor):
             # an error is raised for status >= 400
             return None  # 201 status code
 
-    async def monitor(self, id: str) -> AsyncIterator[bytes]:
+    async def kill_many(
+        self, ids: Iterable[str], *, concurrency: int = KILL_CONCURRENCY
+    ) -> AsyncIterator[Tuple[str, Optional[Exception]]]:
+        async for id, error in _run_ordered(self.kill, ids, concurrency):
+            yield id, error
+
+    async def monitor(self, id: str, *, offset: int = 0) -> AsyncIterator[bytes]:
         url = self._config.monitoring_url / id / "log"
         timeout = attr.evolve(self._core.timeout, sock_read=None)
-        auth = await self._config._api_auth()
-        async with self._core.request(
-            "GET",
-            url,
-            headers={"Accept-Encoding": "identity"},
-            timeout=timeout,
-            auth=auth,
-        ) as resp:
-            async for data in resp.content.iter_any():
-                yield data
+        # A dropped connection is resumed from the last received byte
+        for retry in retries(f"Fail to read the log of {id}"):
+            async with retry:
+                headers = {"Accept-Encoding": "identity"}
+                if offset:
+                    headers["Range"] = f"bytes={offset}-"
+                auth = await self._config._api_auth()
+                async with self._core.request(
+                    "GET", url, headers=headers, timeout=timeout, auth=auth
+                ) as resp:
+                    # The whole log is sent if ranges are not supported
+                    skip = offset if resp.status != HTTPStatus.PARTIAL_CONTENT else 0
+                    async for data in resp.content.iter_any():
+                        if skip:
+                            if len(data) <= skip:
+                                skip -= len(data)
+                                continue
+                            data = data[skip:]
+                            skip = 0
+                        offset += len(data)
+                        yield data
 
     async def status(self, id: str) -> JobDescription:
+        ret = await self._status_raw(id)
+        return _job_description_from_api(ret, self._parse)
+
+    async def _status_raw(self, id: str) -> Dict[str, Any]:
         url = self._config.api_url / "jobs" / id
         auth = await self._config._api_auth()
         async with self._core.request("GET", url, auth=auth) as resp:
-            ret = await resp.json()
-            return _job_description_from_api(ret, self._parse)
+            return await resp.json()
+
+    async def wait(
+        self,
+        ids: Iterable[str],
+        *,
+        until: Iterable[JobStatus] = (JobStatus.SUCCEEDED, JobStatus.FAILED),
+        min_delay: float = WAIT_MIN_DELAY,
+        max_delay: float = WAIT_MAX_DELAY,
+    ) -> AsyncIterator[JobDescription]:
+        until = frozenset(until)
+        # Many watched jobs are checked by a single listing of their owners'
+        # jobs in statuses which are waited to change, jobs missing in the
+        # listing are changed to other statuses and are checked separately.
+        # A few jobs are checked one by one.
+        polled = [
+            status
+            for status in (JobStatus.PENDING, JobStatus.RUNNING)
+            if status not in until
+        ]
+        waiting: Dict[str, Optional[JobStatusHistory]] = dict.fromkeys(ids)
+        owners: Dict[str, str] = {}
+        delay = min_delay
+        while waiting:
+            found: Dict[str, Dict[str, Any]] = {}
+            if (
+                polled
+                and len(waiting) > WAIT_LIST_THRESHOLD
+                and all(id in owners for id in waiting)
+            ):
+                async for res in self._list_raw(
+                    statuses=polled, owners={owners[id] for id in waiting}
+                ):
+                    if res["id"] in waiting:
+                        found[res["id"]] = res
+            missing = [id for id in waiting if id not in found]
+            found.update(
+                zip(
+                    missing,
+                    await asyncio.gather(*(self._status_raw(id) for id in missing)),
+                )
+            )
+            changed = False
+            for id, res in found.items():
+                job = _job_description_from_api(res, self._parse)
+                owners[id] = job.owner
+                if job.history != waiting[id]:
+                    changed = True
+                    waiting[id] = job.history
+                    yield job
+                if job.status in until or job.status not in (
+                    JobStatus.PENDING,
+                    JobStatus.RUNNING,
+                ):
+                    del waiting[id]
+            if waiting:
+                delay = min_delay if changed else min(delay * 2, max_delay)
+                await asyncio.sleep(delay)
 
     async def tags(self) -> List[str]:
         url = self._config.api_url / "tags"
@@ -377,39 +952,54 @@ class Jobs(metaclass=NoPublicConstructor):
 
     @asynccontextmanager
     async def port_forward(
-        self, id: str, local_port: int, job_port: int, *, no_key_check: bool = False
+        self,
+        id: str,
+        local_port: int,
+        job_port: int,
+        *,
+        no_key_check: bool = False,
+        pool_size: int = PORT_FORWARD_POOL_SIZE,
     ) -> AsyncIterator[None]:
+        pool = _ChannelPool(
+            partial(self._port_forward_connect, id, job_port),
+            pool_size,
+            PORT_FORWARD_CHANNEL_TTL,
+        )
         srv = await asyncio.start_server(
-            partial(self._port_forward, id=id, job_port=job_port),
-            "localhost",
-            local_port,
+            partial(self._port_forward, pool=pool), "localhost", local_port,
         )
+        pool.warm()
         try:
             yield
         finally:
             srv.close()
             await srv.wait_closed()
+            await pool.close()
+
+    async def _port_forward_connect(
+        self, id: str, job_port: int
+    ) -> aiohttp.ClientWebSocketResponse:
+        url = self._config.monitoring_url / id / "port_forward" / str(job_port)
+        auth = await self._config._api_auth()
+        return await self._core._session.ws_connect(
+            url,
+            headers={"Authorization": auth},
+            timeout=None,  # type: ignore
+            receive_timeout=None,
+            heartbeat=30,
+        )
 
     async def _port_forward(
         self,
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
-        id: str,
-        job_port: int,
+        pool: _ChannelPool,
     ) -> None:
         try:
             loop = asyncio.get_event_loop()
-            url = self._config.monitoring_url / id / "port_forward" / str(job_port)
-            auth = await self._config._api_auth()
-            ws = await self._core._session.ws_connect(
-                url,
-                headers={"Authorization": auth},
-                timeout=None,  # type: ignore
-                receive_timeout=None,
-                heartbeat=30,
-            )
+            ws, received = await pool.get()
             tasks = []
-            tasks.append(loop.create_task(self._port_reader(ws, writer)))
+            tasks.append(loop.create_task(self._port_reader(ws, writer, received)))
             tasks.append(loop.create_task(self._port_writer(ws, reader)))
             try:
                 await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
@@ -428,12 +1018,21 @@ class Jobs(metaclass=NoPublicConstructor):
             log.exception("Unhandled exception during port-forwarding")
 
     async def _port_reader(
-        self, ws: aiohttp.ClientWebSocketResponse, writer: asyncio.StreamWriter
+        self,
+        ws: aiohttp.ClientWebSocketResponse,
+        writer: asyncio.StreamWriter,
+        received: Optional["asyncio.Future[aiohttp.WSMessage]"] = None,
     ) -> None:
-        async for msg in ws:
-            assert msg.type == aiohttp.WSMsgType.BINARY
+        # Messages are written as they arrive and the local connection is only
+        # waited for when PORT_FORWARD_HIGH_WATER bytes are pending.  The first
+        # message of a pooled channel is received while it is idle.
+        transport = writer.transport
+        msg = await (received if received is not None else ws.receive())
+        while msg.type == aiohttp.WSMsgType.BINARY:
             writer.write(msg.data)
-            await writer.drain()
+            if transport.get_write_buffer_size() > PORT_FORWARD_HIGH_WATER:
+                await writer.drain()
+            msg = await ws.receive()
         writer.close()
         await writer.wait_closed()
 
@@ -441,7 +1040,8 @@ class Jobs(metaclass=NoPublicConstructor):
         self, ws: aiohttp.ClientWebSocketResponse, reader: asyncio.StreamReader
     ) -> None:
         while True:
-            data = await reader.read(4 * 1024 * 1024)
+            # Everything buffered so far is sent in one message
+            data = await reader.read(PORT_FORWARD_CHUNK)
             if not data:
                 # EOF
                 break
@@ -485,10 +1085,12 @@ class Jobs(metaclass=NoPublicConstructor):
         async with self._core.request("POST", url, auth=auth):
             pass
 
-    async def exec_create(self, id: str, cmd: str, *, tty: bool = False) -> str:
+    async def exec_create(
+        self, id: str, cmd: str, *, tty: bool = False, stdin: bool = True
+    ) -> str:
         payload = {
             "command": cmd,
-            "stdin": True,
+            "stdin": stdin,
             "stdout": True,
             "stderr": True,
             "tty": tty,
@@ -539,6 +1141,40 @@ class Jobs(metaclass=NoPublicConstructor):
         finally:
             await ws.close()
 
+    async def exec_many(
+        self, ids: Iterable[str], cmd: str, *, concurrency: int = EXEC_CONCURRENCY
+    ) -> AsyncIterator[Tuple[str, Optional[ExecResult], Optional[Exception]]]:
+        # Up to *concurrency* exec sessions are run at once, the output of
+        # every session is collected and yielded in the order of *ids*.
+        results: Dict[int, ExecResult] = {}
+
+        async def run(item: Tuple[int, str]) -> None:
+            index, id = item
+            results[index] = await self._exec_collect(id, cmd)
+
+        async for (index, id), error in _run_ordered(run, enumerate(ids), concurrency):
+            yield id, results.pop(index, None), error
+
+    async def _exec_collect(self, id: str, cmd: str) -> ExecResult:
+        exec_id = await self.exec_create(id, cmd, stdin=False)
+        output: Dict[int, List[memoryview]] = {1: [], 2: []}
+        async with self.exec_start(id, exec_id) as stream:
+            while True:
+                msg = await stream.read_out()
+                if msg is None:
+                    break
+                output[msg.fileno].append(msg.data)
+        info = await self.exec_inspect(id, exec_id)
+        while info.running:
+            # The output is closed slightly before the exit code is known
+            await asyncio.sleep(EXEC_POLL_DELAY)
+            info = await self.exec_inspect(id, exec_id)
+        return ExecResult(
+            exit_code=info.exit_code,
+            stdout=b"".join(output[1]),
+            stderr=b"".join(output[2]),
+        )
+
     async def send_signal(self, id: str, signal: Union[str, int]) -> None:
         url = self._config.monitoring_url / id / "kill"
         url = url.with_query(signal=signal)
@@ -670,14 +1306,8 @@ def _container_to_api(container: Container, config: Config) -> Dict[str, Any]:
     return primitive
 
 
-def _job_description_from_api(res: Dict[str, Any], parse: Parser) -> JobDescription:
-    container = _container_from_api(res["container"], parse)
-    owner = res["owner"]
-    cluster_name = res["cluster_name"]
-    name = res.get("name")
-    tags = res.get("tags", ())
-    description = res.get("description")
-    history = JobStatusHistory(
+def _job_history_from_api(res: Dict[str, Any]) -> JobStatusHistory:
+    return JobStatusHistory(
         status=JobStatus(res["history"].get("status", "unknown")),
         reason=res["history"].get("reason", ""),
         description=res["history"].get("description", ""),
@@ -686,35 +1316,68 @@ def _job_description_from_api(res: Dict[str, Any], parse: Parser) -> JobDescript
         finished_at=_parse_datetime(res["history"].get("finished_at")),
         exit_code=res["history"].get("exit_code"),
     )
-    http_url = URL(res.get("http_url", ""))
-    http_url_named = URL(res.get("http_url_named", ""))
-    ssh_server = URL(res.get("ssh_server", ""))
-    internal_hostname = res.get("internal_hostname", None)
-    restart_policy = JobRestartPolicy(res.get("restart_policy", JobRestartPolicy.NEVER))
+
+
+def _job_life_span_from_api(res: Dict[str, Any]) -> Optional[float]:
     max_run_time_minutes = res.get("max_run_time_minutes")
-    life_span = (
-        max_run_time_minutes * 60.0 if max_run_time_minutes is not None else None
-    )
+    return max_run_time_minutes * 60.0 if max_run_time_minutes is not None else None
+
+
+_JOB_FIELD_DECODERS: Dict[str, Callable[[Dict[str, Any], Parser], Any]] = {
+    "id": lambda res, parse: res["id"],
+    "owner": lambda res, parse: res["owner"],
+    "cluster_name": lambda res, parse: res["cluster_name"],
+    "status": lambda res, parse: JobStatus(res["status"]),
+    "history": lambda res, parse: _job_history_from_api(res),
+    "container": lambda res, parse: _container_from_api(res["container"], parse),
+    "is_preemptible": lambda res, parse: res["is_preemptible"],
+    "uri": lambda res, parse: URL(res["uri"]),
+    "name": lambda res, parse: res.get("name"),
+    "tags": lambda res, parse: res.get("tags", ()),
+    "description": lambda res, parse: res.get("description"),
+    "http_url": lambda res, parse: (
+        URL(res.get("http_url_named", "")) or URL(res.get("http_url", ""))
+    ),
+    "ssh_server": lambda res, parse: URL(res.get("ssh_server", "")),
+    "internal_hostname": lambda res, parse: res.get("internal_hostname", None),
+    "restart_policy": lambda res, parse: JobRestartPolicy(
+        res.get("restart_policy", JobRestartPolicy.NEVER)
+    ),
+    "life_span": lambda res, parse: _job_life_span_from_api(res),
+}
+
+# Keys of server response used for decoding a field, the field name by default
+_JOB_FIELD_KEYS: Dict[str, Sequence[str]] = {
+    "http_url": ("http_url", "http_url_named"),
+    "life_span": ("max_run_time_minutes",),
+}
+
+
+def _job_description_from_api(res: Dict[str, Any], parse: Parser) -> JobDescription:
     return JobDescription(
-        status=JobStatus(res["status"]),
-        id=res["id"],
-        owner=owner,
-        cluster_name=cluster_name,
-        history=history,
-        container=container,
-        is_preemptible=res["is_preemptible"],
-        name=name,
-        tags=tags,
-        description=description,
-        http_url=http_url_named or http_url,
-        ssh_server=ssh_server,
-        internal_hostname=internal_hostname,
-        uri=URL(res["uri"]),
-        restart_policy=restart_policy,
-        life_span=life_span,
+        **{name: decode(res, parse) for name, decode in _JOB_FIELD_DECODERS.items()}
     )
 
 
+def _job_record_from_api(
+    res: Dict[str, Any], parse: Parser, fields: AbstractSet[str]
+) -> JobRecord:
+    data = {}
+    for name in fields:
+        for key in _JOB_FIELD_KEYS.get(name, (name,)):
+            if key in res:
+                data[key] = res[key]
+    return JobRecord(data, parse, fields)
+
+
+def _check_job_fields(fields: Iterable[str]) -> AbstractSet[str]:
+    ret = frozenset(fields)
+    unknown = ret - set(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+    return ret
+
+
 def _job_telemetry_from_api(value: Dict[str, Any]) -> JobTelemetry:
     return JobTelemetry(
         cpu=value["cpu"],
@@ -750,3 +1413,169 @@ def _parse_datetime(dt: Optional[str]) -> Optional[datetime]:
     if dt is None:
         return None
     return isoparse(dt)
+
+
+def _aware_datetime(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        # Interpret naive datetime object as local time.
+        dt = dt.astimezone(timezone.utc)
+    return dt
+
+
+def _ensure_schema(db: sqlite3.Connection) -> None:
+    cur = db.cursor()
+    ok = True
+    found = set()
+    cur.execute("SELECT type, name, sql from sqlite_master")
+    for type, name, sql in cur:
+        if type not in ("table", "index"):
+            continue
+        if name in SCHEMA:
+            if SCHEMA[name] != sql:
+                ok = False
+                break
+            else:
+                found.add(name)
+
+    if not ok or found < SCHEMA.keys():
+        for sql in reversed(list(DROP.values())):
+            cur.execute(sql)
+        for sql in SCHEMA.values():
+            cur.execute(sql)
+
+
+def _load_index_timestamp(
+    db: sqlite3.Connection, cluster_name: str, username: str
+) -> Optional[float]:
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT timestamp FROM job_index_sync
+        WHERE cluster_name = ? AND username = ?""",
+        (cluster_name, username),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return float(row["timestamp"])
+
+
+def _load_index_state(
+    db: sqlite3.Connection, cluster_name: str, username: str
+) -> Optional[Tuple[float, Dict[str, float]]]:
+    # Return the latest creation time and creation times of unfinished jobs
+    # by their IDs, or None if the index should be built from scratch
+    if _load_index_timestamp(db, cluster_name, username) is None:
+        # Never synced or synced for another user
+        db.execute("DELETE FROM job_index WHERE cluster_name = ?", (cluster_name,))
+        return None
+    cur = db.execute(
+        "SELECT MAX(created_at) FROM job_index WHERE cluster_name = ?", (cluster_name,),
+    )
+    created_at = cur.fetchone()[0]
+    if created_at is None:
+        return None
+    cur = db.execute(
+        """
+        SELECT id, created_at FROM job_index
+        WHERE cluster_name = ? AND status IN (?, ?)""",
+        (cluster_name, JobStatus.PENDING.value, JobStatus.RUNNING.value),
+    )
+    return created_at, {row["id"]: row["created_at"] for row in cur}
+
+
+def _save_index_state(
+    db: sqlite3.Connection, cluster_name: str, username: str, timestamp: float
+) -> None:
+    _ensure_schema(db)
+    db.execute(
+        """
+        INSERT OR REPLACE INTO job_index_sync (cluster_name, username, timestamp)
+        VALUES (?, ?, ?)""",
+        (cluster_name, username, timestamp),
+    )
+    with suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _save_index(db: sqlite3.Connection, items: Iterable[Dict[str, Any]]) -> None:
+    _ensure_schema(db)
+    rows = []
+    for res in items:
+        created_at = _parse_datetime(res.get("history", {}).get("created_at"))
+        rows.append(
+            (
+                res["id"],
+                res["cluster_name"],
+                res["owner"],
+                res.get("name"),
+                res["status"],
+                json.dumps(res.get("tags", [])),
+                created_at.timestamp() if created_at is not None else time.time(),
+                json.dumps(res),
+            )
+        )
+    db.executemany(
+        """
+        INSERT OR REPLACE INTO job_index
+        (id, cluster_name, owner, name, status, tags, created_at, data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows,
+    )
+    with suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _drop_index(db: sqlite3.Connection, id: str) -> None:
+    _ensure_schema(db)
+    db.execute("DELETE FROM job_index WHERE id = ?", (id,))
+    with suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _load_index(
+    db: sqlite3.Connection,
+    cluster_name: str,
+    *,
+    statuses: Iterable[JobStatus],
+    name: str,
+    owners: Iterable[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    reverse: bool,
+    after: Optional[Tuple[float, str]],
+) -> List[sqlite3.Row]:
+    # Load the next batch of jobs ordered by creation time (and ID)
+    _ensure_schema(db)
+    conditions = ["cluster_name = ?"]
+    params: List[Any] = [cluster_name]
+    status_values = [status.value for status in statuses]
+    if status_values:
+        conditions.append(f"status IN ({', '.join('?' * len(status_values))})")
+        params.extend(status_values)
+    if name:
+        conditions.append("name = ?")
+        params.append(name)
+    owner_values = list(owners)
+    if owner_values:
+        conditions.append(f"owner IN ({', '.join('?' * len(owner_values))})")
+        params.extend(owner_values)
+    if since:
+        conditions.append("created_at >= ?")
+        params.append(_aware_datetime(since).timestamp())
+    if until:
+        conditions.append("created_at <= ?")
+        params.append(_aware_datetime(until).timestamp())
+    if after is not None:
+        conditions.append(f"(created_at, id) {'<' if reverse else '>'} (?, ?)")
+        params.extend(after)
+    order = "DESC" if reverse else "ASC"
+    cur = db.execute(
+        f"""
+        SELECT id, tags, created_at, data FROM job_index
+        WHERE {' AND '.join(conditions)}
+        ORDER BY created_at {order}, id {order}
+        LIMIT ?""",
+        params + [INDEX_BATCH_SIZE],
+    )
+    return cur.fetchall()
@@ -2,6 +2,7 @@ import abc
 import asyncio
 import base64
 import errno
+import functools
 import hashlib
 import secrets
 import time
@@ -252,16 +253,7 @@ class _AuthToken:
 
     @property
     def username(self) -> str:
-        try:
-            claims = jwt.get_unverified_claims(self.token)
-        except JWTError as e:
-            raise ValueError(
-                f"Passed string does not contain valid JWT structure."
-            ) from e
-        for identity_claim in JWT_IDENTITY_CLAIM_OPTIONS:
-            if identity_claim in claims:
-                return claims[identity_claim]
-        raise ValueError("JWT Claims structure is not correct.")
+        return _get_username(self.token)
 
     @classmethod
     def create(
@@ -288,6 +280,20 @@ class _AuthToken:
         return cls.create(token, expires_in=expires_in, refresh_token="")
 
 
+@functools.lru_cache(maxsize=8)
+def _get_username(token: str) -> str:
+    # Decoding is relatively slow and the username is read on hot paths,
+    # e.g. for every copied file or parsed image name.
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError as e:
+        raise ValueError(f"Passed string does not contain valid JWT structure.") from e
+    for identity_claim in JWT_IDENTITY_CLAIM_OPTIONS:
+        if identity_claim in claims:
+            return claims[identity_claim]
+    raise ValueError("JWT Claims structure is not correct.")
+
+
 class AuthTokenClient:
     def __init__(
         self, session: aiohttp.ClientSession, url: URL, client_id: str
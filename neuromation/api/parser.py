@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
 
 from yarl import URL
 
@@ -18,6 +19,21 @@ class Volume:
 class Parser(metaclass=NoPublicConstructor):
     def __init__(self, config: Config) -> None:
         self._config = config
+        self._image_parser_cache: Optional[
+            Tuple[Tuple[str, str, URL], _ImageNameParser]
+        ] = None
+
+    def _image_parser(self) -> _ImageNameParser:
+        # The parser is rebuilt only after relogin or cluster switching
+        key = (
+            self._config.username,
+            self._config.cluster_name,
+            self._config.registry_url,
+        )
+        cache = self._image_parser_cache
+        if cache is None or cache[0] != key:
+            cache = self._image_parser_cache = (key, _ImageNameParser(*key))
+        return cache[1]
 
     def volume(self, volume: str) -> Volume:
         parts = volume.split(":")
@@ -40,27 +56,15 @@ class Parser(metaclass=NoPublicConstructor):
         )
 
     def local_image(self, image: str) -> LocalImage:
-        parser = _ImageNameParser(
-            self._config.username, self._config.cluster_name, self._config.registry_url
-        )
-        return parser.parse_as_local_image(image)
+        return self._image_parser().parse_as_local_image(image)
 
     def remote_image(
         self, image: str, *, tag_option: TagOption = TagOption.DEFAULT
     ) -> RemoteImage:
-        parser = _ImageNameParser(
-            self._config.username, self._config.cluster_name, self._config.registry_url
-        )
-        return parser.parse_remote(image, tag_option=tag_option)
+        return self._image_parser().parse_remote(image, tag_option=tag_option)
 
     def _local_to_remote_image(self, image: LocalImage) -> RemoteImage:
-        parser = _ImageNameParser(
-            self._config.username, self._config.cluster_name, self._config.registry_url
-        )
-        return parser.convert_to_neuro_image(image)
+        return self._image_parser().convert_to_neuro_image(image)
 
     def _remote_to_local_image(self, image: RemoteImage) -> LocalImage:
-        parser = _ImageNameParser(
-            self._config.username, self._config.cluster_name, self._config.registry_url
-        )
-        return parser.convert_to_local_image(image)
+        return self._image_parser().convert_to_local_image(image)
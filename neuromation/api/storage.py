@@ -1,15 +1,23 @@
 import asyncio
+import contextlib
 import datetime
 import enum
 import errno
 import fnmatch
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import math
 import os
 import re
+import sqlite3
 import time
+from collections import deque
 from dataclasses import dataclass
 from email.utils import parsedate
+from http import HTTPStatus
 from pathlib import Path
 from stat import S_ISREG
 from typing import (
@@ -17,12 +25,18 @@ from typing import (
     Any,
     AsyncIterator,
     Awaitable,
+    BinaryIO,
     Callable,
+    Deque,
     Dict,
     Iterable,
+    Iterator,
+    List,
     Optional,
     Sequence,
+    Set,
     Tuple,
+    TypeVar,
     Union,
     cast,
 )
@@ -50,17 +64,107 @@ from .url_utils import (
     normalize_storage_path_uri,
 )
 from .users import Action
-from .utils import NoPublicConstructor, retries
+from .utils import NoPublicConstructor, _run_ordered, asynccontextmanager, flat, retries
 
 
 log = logging.getLogger(__name__)
 
 MAX_OPEN_FILES = 20
 READ_SIZE = 2 ** 20  # 1 MiB
+SEGMENT_SIZE = 64 * 2 ** 20  # 64 MiB
+JOURNAL_MIN_SIZE = 16 * 2 ** 20  # 16 MiB
+JOURNAL_MAXAGE = 7 * 24 * 3600  # 1 week
+MANIFEST_MAXAGE = 30 * 24 * 3600  # 30 days
+CACHE_TTL = 10.0  # seconds
+WORKERS = MAX_OPEN_FILES
+WALKERS = 8
+QUEUE_SIZE = 1000
+SCHEDULES = ("size-desc", "fifo", "small-first")
 TIME_THRESHOLD = 1.0
 
 Printer = Callable[[str], None]
 
+_T = TypeVar("_T")
+
+SCHEMA = {
+    "download_journal": flat(
+        """
+        CREATE TABLE download_journal (src TEXT,
+                                       dst TEXT,
+                                       size INTEGER,
+                                       modification_time INTEGER,
+                                       timestamp REAL)"""
+    ),
+    "upload_journal": flat(
+        """
+        CREATE TABLE upload_journal (src TEXT,
+                                     dst TEXT,
+                                     size INTEGER,
+                                     modification_time REAL,
+                                     part_size INTEGER,
+                                     upload_id TEXT,
+                                     parts TEXT,
+                                     timestamp REAL)"""
+    ),
+    "file_hashes": flat(
+        """
+        CREATE TABLE file_hashes (path TEXT,
+                                  size INTEGER,
+                                  modification_time INTEGER,
+                                  inode INTEGER,
+                                  hash TEXT,
+                                  timestamp REAL)"""
+    ),
+    "remote_hashes": flat(
+        """
+        CREATE TABLE remote_hashes (uri TEXT,
+                                    size INTEGER,
+                                    modification_time INTEGER,
+                                    hash TEXT,
+                                    timestamp REAL)"""
+    ),
+    "metadata_cache": flat(
+        """
+        CREATE TABLE metadata_cache (uri TEXT,
+                                     op TEXT,
+                                     data TEXT,
+                                     timestamp REAL)"""
+    ),
+    # The manifest can be large, index lookups and the cleanup of outdated rows
+    "file_hashes_path": "CREATE INDEX file_hashes_path ON file_hashes (path)",
+    "file_hashes_timestamp": (
+        "CREATE INDEX file_hashes_timestamp ON file_hashes (timestamp)"
+    ),
+    "remote_hashes_uri": "CREATE INDEX remote_hashes_uri ON remote_hashes (uri)",
+    "remote_hashes_timestamp": (
+        "CREATE INDEX remote_hashes_timestamp ON remote_hashes (timestamp)"
+    ),
+    "metadata_cache_uri": "CREATE INDEX metadata_cache_uri ON metadata_cache (uri)",
+    "disk_usage": flat(
+        """
+        CREATE TABLE disk_usage (uri TEXT,
+                                 modification_time INTEGER,
+                                 size INTEGER,
+                                 files INTEGER,
+                                 timestamp REAL)"""
+    ),
+    "disk_usage_uri": "CREATE INDEX disk_usage_uri ON disk_usage (uri)",
+}
+DROP = {
+    "download_journal": "DROP TABLE IF EXISTS download_journal",
+    "upload_journal": "DROP TABLE IF EXISTS upload_journal",
+    "file_hashes": "DROP TABLE IF EXISTS file_hashes",
+    "remote_hashes": "DROP TABLE IF EXISTS remote_hashes",
+    "file_hashes_path": "DROP INDEX IF EXISTS file_hashes_path",
+    "file_hashes_timestamp": "DROP INDEX IF EXISTS file_hashes_timestamp",
+    "remote_hashes_uri": "DROP INDEX IF EXISTS remote_hashes_uri",
+    "remote_hashes_timestamp": "DROP INDEX IF EXISTS remote_hashes_timestamp",
+    "metadata_cache": "DROP TABLE IF EXISTS metadata_cache",
+    "metadata_cache_uri": "DROP INDEX IF EXISTS metadata_cache_uri",
+    "disk_usage": "DROP TABLE IF EXISTS disk_usage",
+    "disk_usage_uri": "DROP INDEX IF EXISTS disk_usage_uri",
+}
+
 
 class FileStatusType(str, enum.Enum):
     DIRECTORY = "DIRECTORY"
@@ -86,6 +190,13 @@ class FileStatus:
         return Path(self.path).name
 
 
+@dataclass(frozen=True)
+class DiskUsage:
+    uri: URL
+    size: int
+    files: int
+
+
 class Storage(metaclass=NoPublicConstructor):
     def __init__(self, core: _Core, config: Config) -> None:
         self._core = core
@@ -93,6 +204,20 @@ class Storage(metaclass=NoPublicConstructor):
         self._file_sem = asyncio.BoundedSemaphore(MAX_OPEN_FILES)
         self._min_time_diff = 0.0
         self._max_time_diff = 0.0
+        self._ranges_supported: Optional[bool] = None
+        self._cache: Optional[_MetadataCache] = None
+
+    def enable_cache(self, ttl: float = CACHE_TTL, *, persistent: bool = False) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl should be positive")
+        self._cache = _MetadataCache(self._config, ttl, persistent)
+
+    def disable_cache(self) -> None:
+        self._cache = None
+
+    def _invalidate(self, uri: URL, *, recursive: bool = False) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(self._uri_to_path(uri), recursive=recursive)
 
     def _uri_to_path(self, uri: URL) -> str:
         uri = normalize_storage_path_uri(
@@ -133,8 +258,86 @@ class Storage(metaclass=NoPublicConstructor):
             < self._max_time_diff + TIME_THRESHOLD + 1.0
         )
 
+    async def _is_local_changed(
+        self, src_path: Path, src_stat: os.stat_result, dst: URL, dst_stat: FileStatus
+    ) -> bool:
+        # Compare with the content hash recorded when dst was copied last time.
+        with self._config._open_db() as db:
+            content_hash = _load_remote_hash(db, dst, dst_stat)
+        if content_hash is None:
+            # Not copied in checksum mode or modified since that
+            return self._is_local_modified(src_stat, dst_stat)
+        if src_stat.st_size != dst_stat.size:
+            return True
+        return await self._file_hash(src_path, src_stat) != content_hash
+
+    async def _is_remote_changed(
+        self, src: URL, src_stat: FileStatus, dst_path: Path, dst_stat: os.stat_result
+    ) -> bool:
+        with self._config._open_db() as db:
+            content_hash = _load_remote_hash(db, src, src_stat)
+        if content_hash is None:
+            return self._is_remote_modified(dst_stat, src_stat)
+        if dst_stat.st_size != src_stat.size:
+            return True
+        return await self._file_hash(dst_path, dst_stat) != content_hash
+
+    async def _file_hash(self, path: Path, stat: os.stat_result) -> str:
+        with self._config._open_db() as db:
+            content_hash = _load_file_hash(db, path, stat)
+        if content_hash is None:
+            loop = asyncio.get_event_loop()
+            content_hash = await loop.run_in_executor(None, _calc_file_hash, path)
+            # Don't cache the hash of a file modified while hashing
+            if _is_same_file(path.stat(), stat):
+                with self._config._open_db() as db:
+                    _save_file_hash(db, path, stat, content_hash)
+        return content_hash
+
+    async def _record_upload(
+        self, src_path: Path, src_stat: os.stat_result, dst: URL
+    ) -> None:
+        content_hash = await self._file_hash(src_path, src_stat)
+        if not _is_same_file(src_path.stat(), src_stat):
+            return
+        dst_stat = await self.stat(dst)
+        if dst_stat.size == src_stat.st_size:
+            with self._config._open_db() as db:
+                _save_remote_hash(db, dst, dst_stat, content_hash)
+
+    async def _record_download(
+        self, src: URL, src_stat: FileStatus, dst_path: Path
+    ) -> None:
+        try:
+            dst_stat = dst_path.stat()
+        except OSError:
+            return
+        if not S_ISREG(dst_stat.st_mode) or dst_stat.st_size != src_stat.size:
+            return
+        content_hash = await self._file_hash(dst_path, dst_stat)
+        with self._config._open_db() as db:
+            _save_remote_hash(db, src, src_stat, content_hash)
+
     async def ls(self, uri: URL) -> AsyncIterator[FileStatus]:
-        url = self._config.storage_url / self._uri_to_path(uri)
+        path = self._uri_to_path(uri)
+        if self._cache is None:
+            async for status in self._ls(path):
+                yield status
+            return
+        found, listing = self._cache.get("ls", path)
+        if found:
+            for status in listing:
+                yield status
+            return
+        listing = []
+        async for status in self._ls(path):
+            listing.append(status)
+            yield status
+        # Only a complete listing is cached
+        self._cache.put("ls", path, listing)
+
+    async def _ls(self, path: str) -> AsyncIterator[FileStatus]:
+        url = self._config.storage_url / path
         url = url.with_query(op="LISTSTATUS")
         headers = {"Accept": "application/x-ndjson"}
 
@@ -151,11 +354,157 @@ class Storage(metaclass=NoPublicConstructor):
                 for status in res["FileStatuses"]["FileStatus"]:
                     yield _file_status_from_api(status)
 
+    async def walk(
+        self,
+        uri: URL,
+        *,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[[URL, FileStatus], Awaitable[bool]]] = None,
+        walkers: int = WALKERS,
+    ) -> AsyncIterator[Tuple[URL, FileStatus]]:
+        async for dir_uri, listing in self._walk_dirs(
+            uri, max_depth=max_depth, prune=prune, walkers=walkers
+        ):
+            for status in listing:
+                yield dir_uri, status
+
+    async def _walk_dirs(
+        self,
+        uri: URL,
+        *,
+        max_depth: Optional[int] = None,
+        prune: Optional[Callable[[URL, FileStatus], Awaitable[bool]]] = None,
+        walkers: int = WALKERS,
+    ) -> AsyncIterator[Tuple[URL, List[FileStatus]]]:
+        # Directories are listed breadth-first, up to *walkers* listings are
+        # requested ahead while the first one is consumed.  Listings are
+        # yielded in the breadth-first order regardless of the order in which
+        # they are completed, subdirectories of a yielded listing are already
+        # checked by *prune* and scheduled.
+        if walkers < 1:
+            raise ValueError(f"Invalid number of walkers: {walkers}")
+        if max_depth is not None and max_depth < 1:
+            raise ValueError(f"Invalid max depth: {max_depth}")
+        loop = asyncio.get_event_loop()
+        dirs: Deque[Tuple[URL, int]] = deque([(uri, 1)])
+        listings: Deque[Tuple[URL, int, "asyncio.Task[List[FileStatus]]"]] = deque()
+        try:
+            while dirs or listings:
+                while dirs and len(listings) < walkers:
+                    dir_uri, depth = dirs.popleft()
+                    task = loop.create_task(self._listdir(dir_uri))
+                    listings.append((dir_uri, depth, task))
+                dir_uri, depth, task = listings.popleft()
+                listing = await task
+                for status in listing:
+                    if (
+                        status.is_dir()
+                        and (max_depth is None or depth < max_depth)
+                        and (
+                            prune is None
+                            or not await prune(dir_uri / status.name, status)
+                        )
+                    ):
+                        dirs.append((dir_uri / status.name, depth + 1))
+                yield dir_uri, listing
+        finally:
+            for dir_uri, depth, task in listings:
+                task.cancel()
+            await asyncio.gather(
+                *(task for dir_uri, depth, task in listings), return_exceptions=True
+            )
+
+    async def _listdir(self, uri: URL) -> List[FileStatus]:
+        return [status async for status in self.ls(uri)]
+
+    async def disk_usage(
+        self,
+        uri: URL,
+        *,
+        depth: Optional[int] = None,
+        cache: bool = False,
+        walkers: int = WALKERS,
+    ) -> AsyncIterator["DiskUsage"]:
+        # Subtotals are yielded as soon as the subtree is listed, so a
+        # directory always goes after its subdirectories and *uri* is the last.
+        if depth is not None and depth < 0:
+            raise ValueError(f"Invalid depth: {depth}")
+        nodes = {uri: _UsageNode(None, uri, 0, None)}
+        cached: Dict[URL, Tuple[int, int]] = {}
+
+        async def prune(child: URL, status: FileStatus) -> bool:
+            if not cache:
+                return False
+            with self._config._open_db() as db:
+                subtotal = _load_disk_usage(
+                    db, self._cache_uri(child), status.modification_time
+                )
+            if subtotal is None:
+                return False
+            cached[child] = subtotal
+            return True
+
+        async for dir_uri, listing in self._walk_dirs(
+            uri, prune=prune, walkers=walkers
+        ):
+            node = nodes.pop(dir_uri)
+            for status in listing:
+                child = dir_uri / status.name
+                if not status.is_dir():
+                    node.size += status.size
+                    node.files += 1
+                elif child in cached:
+                    size, files = cached.pop(child)
+                    node.size += size
+                    node.files += files
+                    if depth is None or node.depth < depth:
+                        yield DiskUsage(child, size, files)
+                else:
+                    node.pending += 1
+                    nodes[child] = _UsageNode(
+                        node, child, node.depth + 1, status.modification_time
+                    )
+            current: Optional[_UsageNode] = node
+            while current is not None:
+                current.pending -= 1
+                if current.pending:
+                    break
+                if depth is None or current.depth <= depth:
+                    yield DiskUsage(current.uri, current.size, current.files)
+                if cache and current.modification_time is not None:
+                    with self._config._open_db() as db:
+                        _save_disk_usage(
+                            db,
+                            self._cache_uri(current.uri),
+                            current.modification_time,
+                            current.size,
+                            current.files,
+                        )
+                parent = current.parent
+                if parent is not None:
+                    parent.size += current.size
+                    parent.files += current.files
+                current = parent
+
+    def _cache_uri(self, uri: URL) -> str:
+        return f"{self._config.storage_url}/{self._uri_to_path(uri).rstrip('/')}"
+
     async def glob(self, uri: URL, *, dironly: bool = False) -> AsyncIterator[URL]:
         if not _has_magic(uri.path):
             yield uri
             return
         basename = uri.name
+        if (
+            _has_magic(basename)
+            and not _isrecursive(basename)
+            and _isrecursive(uri.parent.name)
+        ):
+            # Basenames are matched in the single walk of every top directory
+            # instead of listing every directory found by the walk again.
+            async for top in self.glob(uri.parent.parent, dironly=True):
+                async for x in self._rglob1(top, basename, dironly):
+                    yield x
+            return
         glob_in_dir: Callable[[URL, str, bool], AsyncIterator[URL]]
         if not _has_magic(basename):
             glob_in_dir = self._glob0
@@ -185,6 +534,22 @@ class Storage(metaclass=NoPublicConstructor):
             if (allow_hidden or not _ishidden(name)) and match(name):
                 yield parent / name
 
+    async def _rglob1(
+        self, top: URL, pattern: str, dironly: bool
+    ) -> AsyncIterator[URL]:
+        # Equivalent to _glob1() in *top* and in every directory found in it
+        # by _glob2().
+        allow_hidden = _ishidden(pattern)
+        match = re.compile(fnmatch.translate(pattern)).fullmatch
+        async for parent, stat in self.walk(top, prune=_prune_hidden):
+            name = stat.path
+            if (
+                (not dironly or stat.is_dir())
+                and (allow_hidden or not _ishidden(name))
+                and match(name)
+            ):
+                yield parent / name
+
     async def _glob0(
         self, parent: URL, basename: str, dironly: bool
     ) -> AsyncIterator[URL]:
@@ -201,14 +566,10 @@ class Storage(metaclass=NoPublicConstructor):
                 yield stat
 
     async def _rlistdir(self, uri: URL, dironly: bool) -> AsyncIterator[URL]:
-        async for stat in self._iterdir(uri, dironly):
+        async for parent, stat in self.walk(uri, prune=_prune_hidden):
             name = stat.path
-            if not _ishidden(name):
-                x = uri / name
-                yield x
-                if stat.is_dir():
-                    async for y in self._rlistdir(x, dironly):
-                        yield y
+            if not _ishidden(name) and (not dironly or stat.is_dir()):
+                yield parent / name
 
     async def mkdir(
         self, uri: URL, *, parents: bool = False, exist_ok: bool = False
@@ -240,6 +601,7 @@ class Storage(metaclass=NoPublicConstructor):
 
         async with self._core.request("PUT", url, auth=auth) as resp:
             resp  # resp.status == 201
+        self._invalidate(uri)
 
     async def create(self, uri: URL, data: AsyncIterator[bytes]) -> None:
         path = self._uri_to_path(uri)
@@ -249,13 +611,66 @@ class Storage(metaclass=NoPublicConstructor):
         timeout = attr.evolve(self._core.timeout, sock_read=None)
         auth = await self._config._api_auth()
 
+        try:
+            async with self._core.request(
+                "PUT", url, data=data, timeout=timeout, auth=auth
+            ) as resp:
+                resp  # resp.status == 201
+        finally:
+            # A failed upload can leave a partially written file
+            self._invalidate(uri)
+
+    async def _init_upload(self, uri: URL, size: int, part_size: int) -> str:
+        path = self._uri_to_path(uri)
+        assert path, "Creation in root is not allowed"
+        url = self._config.storage_url / path
+        url = url.with_query(op="INIT_UPLOAD", size=size, part_size=part_size)
+        auth = await self._config._api_auth()
+
+        async with self._core.request("POST", url, auth=auth) as resp:
+            res = await resp.json()
+            return res["upload_id"]
+
+    async def _upload_part(
+        self, uri: URL, upload_id: str, part: int, data: AsyncIterator[bytes]
+    ) -> None:
+        url = self._config.storage_url / self._uri_to_path(uri)
+        url = url.with_query(op="UPLOAD_PART", upload_id=upload_id, part=part)
+        timeout = attr.evolve(self._core.timeout, sock_read=None)
+        auth = await self._config._api_auth()
+
         async with self._core.request(
             "PUT", url, data=data, timeout=timeout, auth=auth
         ) as resp:
             resp  # resp.status == 201
 
-    async def stat(self, uri: URL) -> FileStatus:
+    async def _complete_upload(self, uri: URL, upload_id: str) -> None:
         url = self._config.storage_url / self._uri_to_path(uri)
+        url = url.with_query(op="COMPLETE_UPLOAD", upload_id=upload_id)
+        auth = await self._config._api_auth()
+
+        async with self._core.request("POST", url, auth=auth) as resp:
+            resp  # resp.status == 201
+        self._invalidate(uri)
+
+    async def stat(self, uri: URL) -> FileStatus:
+        path = self._uri_to_path(uri)
+        if self._cache is None:
+            return await self._stat(path)
+        found, status = self._cache.get("stat", path)
+        if not found:
+            try:
+                status = await self._stat(path)
+            except ResourceNotFound as exc:
+                # Missing files are cached too, cp checks the destination first
+                status = str(exc)
+            self._cache.put("stat", path, status)
+        if isinstance(status, str):
+            raise ResourceNotFound(status)
+        return status
+
+    async def _stat(self, path: str) -> FileStatus:
+        url = self._config.storage_url / path
         url = url.with_query(op="GETFILESTATUS")
         auth = await self._config._api_auth()
 
@@ -265,15 +680,43 @@ class Storage(metaclass=NoPublicConstructor):
             res = await resp.json()
             return _file_status_from_api(res["FileStatus"])
 
-    async def open(self, uri: URL) -> AsyncIterator[bytes]:
+    async def open(
+        self, uri: URL, offset: int = 0, size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        if size == 0:
+            return
+        async with self._open(uri, offset, size) as resp:
+            stream: AsyncIterator[bytes] = resp.content.iter_any()
+            if (
+                offset or size is not None
+            ) and resp.status != HTTPStatus.PARTIAL_CONTENT:
+                # The server ignored Range header and sent the whole file
+                stream = _slice_stream(stream, offset, size)
+            async for data in stream:
+                yield data
+
+    @asynccontextmanager
+    async def _open(
+        self, uri: URL, offset: int = 0, size: Optional[int] = None
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
         url = self._config.storage_url / self._uri_to_path(uri)
         url = url.with_query(op="OPEN")
         timeout = attr.evolve(self._core.timeout, sock_read=None)
         auth = await self._config._api_auth()
+        headers = {}
+        if offset or size is not None:
+            headers["Range"] = _format_range(offset, size)
 
-        async with self._core.request("GET", url, timeout=timeout, auth=auth) as resp:
-            async for data in resp.content.iter_any():
-                yield data
+        async with self._core.request(
+            "GET", url, headers=headers, timeout=timeout, auth=auth
+        ) as resp:
+            yield resp
+
+    async def _supports_ranges(self, uri: URL) -> bool:
+        if self._ranges_supported is None:
+            async with self._open(uri, 0, 1) as resp:
+                self._ranges_supported = resp.status == HTTPStatus.PARTIAL_CONTENT
+        return self._ranges_supported
 
     async def rm(self, uri: URL, *, recursive: bool = False) -> None:
         path = self._uri_to_path(uri)
@@ -301,6 +744,7 @@ class Storage(metaclass=NoPublicConstructor):
 
         async with self._core.request("DELETE", url, auth=auth) as resp:
             resp  # resp.status == 204
+        self._invalidate(uri, recursive=True)
 
     async def mv(self, src: URL, dst: URL) -> None:
         url = self._config.storage_url / self._uri_to_path(src)
@@ -309,6 +753,67 @@ class Storage(metaclass=NoPublicConstructor):
 
         async with self._core.request("POST", url, auth=auth) as resp:
             resp  # resp.status == 204
+        self._invalidate(src, recursive=True)
+        self._invalidate(dst, recursive=True)
+
+    # bulk operations, results are yielded in the order of arguments
+
+    async def rm_many(
+        self, uris: Iterable[URL], *, recursive: bool = False, workers: int = WORKERS
+    ) -> AsyncIterator[Tuple[URL, Optional[Exception]]]:
+        async for uri, error in _run_ordered(
+            lambda uri: self.rm(uri, recursive=recursive), uris, workers
+        ):
+            yield uri, error
+
+    async def mkdir_many(
+        self,
+        uris: Iterable[URL],
+        *,
+        parents: bool = False,
+        exist_ok: bool = False,
+        workers: int = WORKERS,
+    ) -> AsyncIterator[Tuple[URL, Optional[Exception]]]:
+        loop = asyncio.get_event_loop()
+        # Without parents a directory can be created only after its parent
+        # mentioned earlier in the arguments.
+        created: Dict[str, "asyncio.Future[None]"] = {}
+
+        def mkdir(uri: URL) -> Awaitable[None]:
+            path = self._uri_to_path(uri).rstrip("/")
+            ancestors = [
+                created[parent]
+                for parent in _parent_paths(path)
+                if not parents and parent in created
+            ]
+            done = created[path] = loop.create_future()
+            return self._mkdir_after(uri, ancestors, done, parents, exist_ok)
+
+        async for uri, error in _run_ordered(mkdir, uris, workers):
+            yield uri, error
+
+    async def _mkdir_after(
+        self,
+        uri: URL,
+        ancestors: Sequence["asyncio.Future[None]"],
+        done: "asyncio.Future[None]",
+        parents: bool,
+        exist_ok: bool,
+    ) -> None:
+        try:
+            if ancestors:
+                await asyncio.wait(ancestors)
+            await self.mkdir(uri, parents=parents, exist_ok=exist_ok)
+        finally:
+            done.set_result(None)
+
+    async def mv_many(
+        self, pairs: Iterable[Tuple[URL, URL]], *, workers: int = WORKERS
+    ) -> AsyncIterator[Tuple[URL, URL, Optional[Exception]]]:
+        async for (src, dst), error in _run_ordered(
+            lambda pair: self.mv(*pair), pairs, workers
+        ):
+            yield src, dst, error
 
     # high-level helpers
 
@@ -336,8 +841,11 @@ class Storage(metaclass=NoPublicConstructor):
         dst: URL,
         *,
         update: bool = False,
+        checksum: bool = False,
+        part_size: Optional[int] = None,
         progress: Optional[AbstractFileProgress] = None,
     ) -> None:
+        _check_part_size(part_size)
         src = normalize_local_path_uri(src)
         dst = normalize_storage_path_uri(
             dst, self._config.username, self._config.cluster_name
@@ -355,6 +863,7 @@ class Storage(metaclass=NoPublicConstructor):
                 raise
             # Ignore stat errors for device files like NUL or CON on Windows.
             # See https://bugs.python.org/issue37074
+        update_stat: Optional[FileStatus] = None
         try:
             dst_stat = await self.stat(dst)
             if dst_stat.is_dir():
@@ -373,7 +882,9 @@ class Storage(metaclass=NoPublicConstructor):
                     errno.ENOTDIR, "Not a directory", str(dst.parent)
                 )
         else:
-            if update:
+            if update and checksum:
+                update_stat = dst_stat
+            elif update:
                 try:
                     src_stat = path.stat()
                 except OSError:
@@ -385,17 +896,165 @@ class Storage(metaclass=NoPublicConstructor):
                         return
 
         queued = QueuedProgress(progress)
-        await run_progress(queued, self._upload_file(path, dst, progress=queued))
+        await run_progress(
+            queued,
+            self._upload_file(
+                path,
+                dst,
+                part_size=part_size,
+                checksum=checksum,
+                dst_stat=update_stat,
+                progress=queued,
+            ),
+        )
 
     async def _upload_file(
-        self, src_path: Path, dst: URL, *, progress: "QueuedProgress",
+        self,
+        src_path: Path,
+        dst: URL,
+        *,
+        part_size: Optional[int] = None,
+        checksum: bool = False,
+        dst_stat: Optional[FileStatus] = None,
+        progress: "QueuedProgress",
     ) -> None:
-        for retry in retries(f"Fail to upload {dst}"):
-            async with retry:
-                await self.create(
-                    dst, self._iterate_file(src_path, dst, progress=progress),
+        if checksum:
+            src_stat = src_path.stat()
+            checksum = S_ISREG(src_stat.st_mode)
+        if (
+            checksum
+            and dst_stat is not None
+            and not await self._is_local_changed(src_path, src_stat, dst, dst_stat)
+        ):
+            return
+        if part_size is not None and _is_larger(src_path, part_size):
+            await self._upload_parts(src_path, dst, part_size, progress=progress)
+        else:
+            for retry in retries(f"Fail to upload {dst}"):
+                async with retry:
+                    await self.create(
+                        dst, self._iterate_file(src_path, dst, progress=progress),
+                    )
+        if checksum:
+            await self._record_upload(src_path, src_stat, dst)
+
+    async def _upload_parts(
+        self, src_path: Path, dst: URL, part_size: int, *, progress: "QueuedProgress",
+    ) -> None:
+        src_url = URL(src_path.as_uri())
+        async with self._file_sem:
+            with src_path.open("rb") as stream:
+                src_stat = os.stat(stream.fileno())
+                size = src_stat.st_size
+                await progress.start(StorageProgressStart(src_url, dst, size))
+                with self._config._open_db() as db:
+                    upload_id, done = _load_upload_journal(
+                        db, src_path, dst, src_stat, part_size
+                    )
+                if upload_id is not None:
+                    log.info(f"Resume uploading {dst}, {len(done)} parts done")
+                    try:
+                        await self._upload_parts_from(
+                            stream,
+                            src_path,
+                            dst,
+                            src_stat,
+                            part_size,
+                            upload_id,
+                            done,
+                            progress=progress,
+                        )
+                    except ResourceNotFound:
+                        # The server has forgotten the upload, start it again
+                        log.info(f"Upload of {dst} is expired, restart uploading")
+                        upload_id = None
+                if upload_id is None:
+                    for retry in retries(f"Fail to upload {dst}"):
+                        async with retry:
+                            upload_id = await self._init_upload(dst, size, part_size)
+                    assert upload_id is not None
+                    await self._upload_parts_from(
+                        stream,
+                        src_path,
+                        dst,
+                        src_stat,
+                        part_size,
+                        upload_id,
+                        set(),
+                        progress=progress,
+                    )
+                for retry in retries(f"Fail to upload {dst}"):
+                    async with retry:
+                        await self._complete_upload(dst, upload_id)
+                with self._config._open_db() as db:
+                    _drop_upload_journal(db, src_path, dst)
+                await progress.complete(StorageProgressComplete(src_url, dst, size))
+
+    async def _upload_parts_from(
+        self,
+        stream: BinaryIO,
+        src_path: Path,
+        dst: URL,
+        src_stat: os.stat_result,
+        part_size: int,
+        upload_id: str,
+        done: Set[int],
+        *,
+        progress: "QueuedProgress",
+    ) -> None:
+        size = src_stat.st_size
+        for part, offset in enumerate(range(0, size, part_size)):
+            if part in done:
+                continue
+            length = min(part_size, size - offset)
+            for retry in retries(f"Fail to upload {dst}"):
+                async with retry:
+                    await self._upload_part(
+                        dst,
+                        upload_id,
+                        part,
+                        self._iterate_part(
+                            stream,
+                            src_path,
+                            dst,
+                            offset,
+                            length,
+                            size,
+                            progress=progress,
+                        ),
+                    )
+            done.add(part)
+            with self._config._open_db() as db:
+                _save_upload_journal(
+                    db, src_path, dst, src_stat, part_size, upload_id, done
                 )
 
+    async def _iterate_part(
+        self,
+        stream: BinaryIO,
+        src_path: Path,
+        dst: URL,
+        offset: int,
+        length: int,
+        size: int,
+        *,
+        progress: "QueuedProgress",
+    ) -> AsyncIterator[bytes]:
+        loop = asyncio.get_event_loop()
+        src_url = URL(src_path.as_uri())
+        stream.seek(offset)
+        pos = offset
+        end = offset + length
+        while pos < end:
+            chunk = await loop.run_in_executor(
+                None, stream.read, min(READ_SIZE, end - pos)
+            )
+            if not chunk:
+                break
+            pos += len(chunk)
+            await progress.step(StorageProgressStep(src_url, dst, pos, size))
+            yield chunk
+
     async def upload_dir(
         self,
         src: URL,
@@ -404,8 +1063,16 @@ class Storage(metaclass=NoPublicConstructor):
         update: bool = False,
         filter: Optional[Callable[[str], Awaitable[bool]]] = None,
         ignore_file_names: Union[Sequence[str], AbstractSet[str]] = (),
+        checksum: bool = False,
+        part_size: Optional[int] = None,
+        workers: int = WORKERS,
+        queue_size: int = QUEUE_SIZE,
+        schedule: str = "size-desc",
         progress: Optional[AbstractRecursiveFileProgress] = None,
     ) -> None:
+        _check_part_size(part_size)
+        _check_workers(workers, queue_size)
+        _check_schedule(schedule)
         if filter is None:
             filter = _always
         src = normalize_local_path_uri(src)
@@ -418,22 +1085,34 @@ class Storage(metaclass=NoPublicConstructor):
         if not path.is_dir():
             raise NotADirectoryError(errno.ENOTDIR, "Not a directory", str(path))
         queued = QueuedProgress(progress)
+        scheduler = _TransferScheduler(
+            queued, workers=workers, queue_size=queue_size, schedule=schedule
+        )
         await run_progress(
             queued,
-            self._upload_dir(
-                src,
-                path,
-                dst,
-                "",
-                update=update,
-                filter=filter,
-                ignore_file_names=ignore_file_names,
-                progress=queued,
+            scheduler.run(
+                functools.partial(
+                    self._upload_dir,
+                    scheduler,
+                    None,
+                    src,
+                    path,
+                    dst,
+                    "",
+                    update=update,
+                    filter=filter,
+                    ignore_file_names=ignore_file_names,
+                    checksum=checksum,
+                    part_size=part_size,
+                    progress=queued,
+                )
             ),
         )
 
     async def _upload_dir(
         self,
+        scheduler: "_TransferScheduler",
+        parent: Optional["_DirNode"],
         src: URL,
         src_path: Path,
         dst: URL,
@@ -442,9 +1121,10 @@ class Storage(metaclass=NoPublicConstructor):
         update: bool,
         filter: Callable[[str], Awaitable[bool]],
         ignore_file_names: Union[Sequence[str], AbstractSet[str]],
+        checksum: bool = False,
+        part_size: Optional[int] = None,
         progress: "QueuedProgress",
     ) -> None:
-        tasks = []
         try:
             exists = False
             if update:
@@ -467,6 +1147,7 @@ class Storage(metaclass=NoPublicConstructor):
             raise NotADirectoryError(errno.ENOTDIR, "Not a directory", str(dst))
 
         await progress.enter(StorageProgressEnterDir(src, dst))
+        node = _DirNode(parent, src, dst)
         loop = asyncio.get_event_loop()
         async with self._file_sem:
             folder = await loop.run_in_executor(None, lambda: list(src_path.iterdir()))
@@ -488,18 +1169,34 @@ class Storage(metaclass=NoPublicConstructor):
                 log.debug(f"Skip {child_rel_path}")
                 continue
             if child.is_file():
+                child_stat = child.stat()
                 if (
                     update
+                    and not checksum
                     and name in dst_files
-                    and not self._is_local_modified(child.stat(), dst_files[name])
+                    and not self._is_local_modified(child_stat, dst_files[name])
                 ):
                     continue
-                tasks.append(
-                    self._upload_file(src_path / name, dst / name, progress=progress)
+                await scheduler.add_file(
+                    node,
+                    child_stat.st_size,
+                    functools.partial(
+                        self._upload_file,
+                        src_path / name,
+                        dst / name,
+                        part_size=part_size,
+                        checksum=checksum,
+                        dst_stat=dst_files.get(name) if update else None,
+                        progress=progress,
+                    ),
                 )
             elif child.is_dir():
-                tasks.append(
-                    self._upload_dir(
+                scheduler.add_dir(
+                    node,
+                    functools.partial(
+                        self._upload_dir,
+                        scheduler,
+                        node,
                         src / name,
                         src_path / name,
                         dst / name,
@@ -507,8 +1204,10 @@ class Storage(metaclass=NoPublicConstructor):
                         update=update,
                         filter=filter,
                         ignore_file_names=ignore_file_names,
+                        checksum=checksum,
+                        part_size=part_size,
                         progress=progress,
-                    )
+                    ),
                 )
             else:
                 # This case is for uploading non-regular file,
@@ -521,8 +1220,7 @@ class Storage(metaclass=NoPublicConstructor):
                         f"Cannot upload {child}, not regular file/directory",
                     ),
                 )  # pragma: no cover
-        await run_concurrently(tasks)
-        await progress.leave(StorageProgressLeaveDir(src, dst))
+        await scheduler.done(node)
 
     async def download_file(
         self,
@@ -530,8 +1228,12 @@ class Storage(metaclass=NoPublicConstructor):
         dst: URL,
         *,
         update: bool = False,
+        checksum: bool = False,
+        segments: int = 1,
+        segment_size: int = SEGMENT_SIZE,
         progress: Optional[AbstractFileProgress] = None,
     ) -> None:
+        _check_segments(segments, segment_size)
         src = normalize_storage_path_uri(
             src, self._config.username, self._config.cluster_name
         )
@@ -540,19 +1242,33 @@ class Storage(metaclass=NoPublicConstructor):
         src_stat = await self.stat(src)
         if not src_stat.is_file():
             raise IsADirectoryError(errno.EISDIR, "Is a directory", str(src))
+        update_stat: Optional[os.stat_result] = None
         if update:
             try:
                 dst_stat = path.stat()
             except OSError:
                 pass
             else:
-                if S_ISREG(dst_stat.st_mode) and not self._is_remote_modified(
-                    dst_stat, src_stat
-                ):
+                if not S_ISREG(dst_stat.st_mode):
+                    pass
+                elif checksum:
+                    update_stat = dst_stat
+                elif not self._is_remote_modified(dst_stat, src_stat):
                     return
         queued = QueuedProgress(progress)
         await run_progress(
-            queued, self._download_file(src, dst, path, src_stat.size, progress=queued),
+            queued,
+            self._download_file(
+                src,
+                dst,
+                path,
+                src_stat,
+                segments=segments,
+                segment_size=segment_size,
+                checksum=checksum,
+                dst_stat=update_stat,
+                progress=queued,
+            ),
         )
 
     async def _download_file(
@@ -560,24 +1276,118 @@ class Storage(metaclass=NoPublicConstructor):
         src: URL,
         dst: URL,
         dst_path: Path,
-        size: int,
+        src_stat: FileStatus,
         *,
+        segments: int = 1,
+        segment_size: int = SEGMENT_SIZE,
+        checksum: bool = False,
+        dst_stat: Optional[os.stat_result] = None,
         progress: "QueuedProgress",
     ) -> None:
-        loop = asyncio.get_event_loop()
+        if (
+            checksum
+            and dst_stat is not None
+            and not await self._is_remote_changed(src, src_stat, dst_path, dst_stat)
+        ):
+            return
+        size = src_stat.size
         async with self._file_sem:
             await progress.start(StorageProgressStart(src, dst, size))
-            for retry in retries(f"Fail to download {src}"):
+            ranges = _split_ranges(size, segments, segment_size)
+            if len(ranges) > 1 and await self._supports_ranges(src):
+                await self._download_segments(
+                    src, dst, dst_path, size, ranges, progress=progress
+                )
+            else:
+                await self._download_stream(
+                    src, dst, dst_path, src_stat, progress=progress
+                )
+            await progress.complete(StorageProgressComplete(src, dst, size))
+        if checksum:
+            await self._record_download(src, src_stat, dst_path)
+
+    async def _download_stream(
+        self,
+        src: URL,
+        dst: URL,
+        dst_path: Path,
+        src_stat: FileStatus,
+        *,
+        progress: "QueuedProgress",
+    ) -> None:
+        loop = asyncio.get_event_loop()
+        size = src_stat.size
+        journal = size >= JOURNAL_MIN_SIZE and _is_regular_or_absent(dst_path)
+        pos = 0
+        if journal:
+            with self._config._open_db() as db:
+                pos = _resume_offset(db, src, dst_path, src_stat)
+                _save_download_journal(db, src, dst_path, src_stat)
+        with dst_path.open("r+b" if pos else "wb") as stream:
+            if pos:
+                log.info(f"Resume downloading {src} from {pos} byte")
+                stream.seek(pos)
+                stream.truncate()
+                await progress.step(StorageProgressStep(src, dst, pos, size))
+            for attempt, retry in enumerate(retries(f"Fail to download {src}")):
                 async with retry:
-                    with dst_path.open("wb") as stream:
-                        pos = 0
-                        async for chunk in self.open(src):
+                    if attempt and pos:
+                        new_stat = await self.stat(src)
+                        if _is_changed(src_stat, new_stat):
+                            if not stream.seekable():
+                                raise OSError(errno.EIO, "File was modified", str(src))
+                            log.info(f"{src} was modified, restart downloading")
+                            src_stat = new_stat
+                            size = src_stat.size
+                            pos = 0
+                            stream.seek(0)
+                            stream.truncate()
+                    if pos and pos >= size:
+                        break
+                    async for chunk in self.open(src, pos):
+                        await loop.run_in_executor(None, stream.write, chunk)
+                        pos += len(chunk)
+                        await progress.step(StorageProgressStep(src, dst, pos, size))
+        if journal:
+            with self._config._open_db() as db:
+                _drop_download_journal(db, src, dst_path)
+
+    async def _download_segments(
+        self,
+        src: URL,
+        dst: URL,
+        dst_path: Path,
+        size: int,
+        ranges: Sequence[Tuple[int, int]],
+        *,
+        progress: "QueuedProgress",
+    ) -> None:
+        loop = asyncio.get_event_loop()
+        pos = 0
+
+        async def download_range(offset: int, length: int) -> None:
+            nonlocal pos
+            written = 0
+            with dst_path.open("r+b") as stream:
+                for retry in retries(f"Fail to download {src}"):
+                    async with retry:
+                        stream.seek(offset + written)
+                        async for chunk in self.open(
+                            src, offset + written, length - written
+                        ):
+                            await loop.run_in_executor(None, stream.write, chunk)
+                            written += len(chunk)
                             pos += len(chunk)
                             await progress.step(
                                 StorageProgressStep(src, dst, pos, size)
                             )
-                            await loop.run_in_executor(None, stream.write, chunk)
-            await progress.complete(StorageProgressComplete(src, dst, size))
+
+        # Preallocate the file, every segment is written at its own offset
+        with dst_path.open("wb") as stream:
+            stream.truncate(size)
+        await run_concurrently(
+            download_range(offset, length) for offset, length in ranges
+        )
 
     async def download_dir(
         self,
@@ -586,8 +1396,17 @@ class Storage(metaclass=NoPublicConstructor):
         *,
         update: bool = False,
         filter: Optional[Callable[[str], Awaitable[bool]]] = None,
+        checksum: bool = False,
+        segments: int = 1,
+        segment_size: int = SEGMENT_SIZE,
+        workers: int = WORKERS,
+        queue_size: int = QUEUE_SIZE,
+        schedule: str = "size-desc",
         progress: Optional[AbstractRecursiveFileProgress] = None,
     ) -> None:
+        _check_segments(segments, segment_size)
+        _check_workers(workers, queue_size)
+        _check_schedule(schedule)
         if filter is None:
             filter = _always
         src = normalize_storage_path_uri(
@@ -596,15 +1415,34 @@ class Storage(metaclass=NoPublicConstructor):
         dst = normalize_local_path_uri(dst)
         path = _extract_path(dst)
         queued = QueuedProgress(progress)
+        scheduler = _TransferScheduler(
+            queued, workers=workers, queue_size=queue_size, schedule=schedule
+        )
         await run_progress(
             queued,
-            self._download_dir(
-                src, dst, path, "", update=update, filter=filter, progress=queued
+            scheduler.run(
+                functools.partial(
+                    self._download_dir,
+                    scheduler,
+                    None,
+                    src,
+                    dst,
+                    path,
+                    "",
+                    update=update,
+                    filter=filter,
+                    checksum=checksum,
+                    segments=segments,
+                    segment_size=segment_size,
+                    progress=queued,
+                )
             ),
         )
 
     async def _download_dir(
         self,
+        scheduler: "_TransferScheduler",
+        parent: Optional["_DirNode"],
         src: URL,
         dst: URL,
         dst_path: Path,
@@ -612,11 +1450,14 @@ class Storage(metaclass=NoPublicConstructor):
         *,
         update: bool,
         filter: Callable[[str], Awaitable[bool]],
+        checksum: bool = False,
+        segments: int = 1,
+        segment_size: int = SEGMENT_SIZE,
         progress: "QueuedProgress",
     ) -> None:
         dst_path.mkdir(parents=True, exist_ok=True)
         await progress.enter(StorageProgressEnterDir(src, dst))
-        tasks = []
+        node = _DirNode(parent, src, dst)
         if update:
             loop = asyncio.get_event_loop()
             async with self._file_sem:
@@ -640,32 +1481,45 @@ class Storage(metaclass=NoPublicConstructor):
                 log.debug(f"Skip {child_rel_path}")
                 continue
             if child.is_file():
-                if (
-                    update
-                    and name in dst_files
-                    and not self._is_remote_modified(dst_files[name].stat(), child)
-                ):
-                    continue
-                tasks.append(
-                    self._download_file(
+                dst_stat = None
+                if update and name in dst_files:
+                    dst_stat = dst_files[name].stat()
+                    if not checksum and not self._is_remote_modified(dst_stat, child):
+                        continue
+                await scheduler.add_file(
+                    node,
+                    child.size,
+                    functools.partial(
+                        self._download_file,
                         src / name,
                         dst / name,
                         dst_path / name,
-                        child.size,
+                        child,
+                        segments=segments,
+                        segment_size=segment_size,
+                        checksum=checksum,
+                        dst_stat=dst_stat,
                         progress=progress,
-                    )
+                    ),
                 )
             elif child.is_dir():
-                tasks.append(
-                    self._download_dir(
+                scheduler.add_dir(
+                    node,
+                    functools.partial(
+                        self._download_dir,
+                        scheduler,
+                        node,
                         src / name,
                         dst / name,
                         dst_path / name,
                         child_rel_path,
                         update=update,
                         filter=filter,
+                        checksum=checksum,
+                        segments=segments,
+                        segment_size=segment_size,
                         progress=progress,
-                    )
+                    ),
                 )
             else:
                 await progress.fail(
@@ -675,8 +1529,7 @@ class Storage(metaclass=NoPublicConstructor):
                         f"Cannot download {child}, not regular file/directory",
                     ),
                 )  # pragma: no cover
-        await run_concurrently(tasks)
-        await progress.leave(StorageProgressLeaveDir(src, dst))
+        await scheduler.done(node)
 
 
 _magic_check = re.compile("(?:[*?[])")
@@ -690,10 +1543,402 @@ def _ishidden(name: str) -> bool:
     return name.startswith(".")
 
 
+async def _prune_hidden(uri: URL, stat: FileStatus) -> bool:
+    return _ishidden(stat.name)
+
+
 def _isrecursive(pattern: str) -> bool:
     return pattern == "**"
 
 
+def _check_segments(segments: int, segment_size: int) -> None:
+    if segments < 1:
+        raise ValueError(f"Invalid number of segments: {segments}")
+    if segment_size < 1:
+        raise ValueError(f"Invalid segment size: {segment_size}")
+
+
+def _check_workers(workers: int, queue_size: int) -> None:
+    if workers < 1:
+        raise ValueError(f"Invalid number of workers: {workers}")
+    if queue_size < 1:
+        raise ValueError(f"Invalid queue size: {queue_size}")
+
+
+def _check_schedule(schedule: str) -> None:
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Invalid schedule: {schedule}")
+
+
+def _check_part_size(part_size: Optional[int]) -> None:
+    if part_size is not None and part_size < 1:
+        raise ValueError(f"Invalid part size: {part_size}")
+
+
+def _is_larger(path: Path, size: int) -> bool:
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    return S_ISREG(st.st_mode) and st.st_size > size
+
+
+def _split_ranges(size: int, segments: int, segment_size: int) -> List[Tuple[int, int]]:
+    count = min(segments, size // segment_size)
+    if count <= 1:
+        return [(0, size)]
+    step = -(-size // count)
+    return [(offset, min(step, size - offset)) for offset in range(0, size, step)]
+
+
+def _format_range(offset: int, size: Optional[int]) -> str:
+    if size is None:
+        return f"bytes={offset}-"
+    return f"bytes={offset}-{offset + size - 1}"
+
+
+async def _slice_stream(
+    stream: AsyncIterator[bytes], offset: int, size: Optional[int]
+) -> AsyncIterator[bytes]:
+    end = None if size is None else offset + size
+    pos = 0
+    async for chunk in stream:
+        start = pos
+        pos += len(chunk)
+        if pos <= offset:
+            continue
+        lo = max(offset - start, 0)
+        hi = len(chunk) if end is None else min(end - start, len(chunk))
+        if lo < hi:
+            yield chunk[lo:hi]
+        if end is not None and pos >= end:
+            break
+
+
+def _is_changed(old: FileStatus, new: FileStatus) -> bool:
+    return (
+        old.size != new.size
+        or old.modification_time != new.modification_time
+        or not new.is_file()
+    )
+
+
+def _is_regular_or_absent(path: Path) -> bool:
+    try:
+        return S_ISREG(path.stat().st_mode)
+    except OSError:
+        return True
+
+
+def _ensure_schema(db: sqlite3.Connection) -> None:
+    cur = db.cursor()
+    ok = True
+    found = set()
+    cur.execute("SELECT type, name, sql from sqlite_master")
+    for type, name, sql in cur:
+        if type not in ("table", "index"):
+            continue
+        if name in SCHEMA:
+            if SCHEMA[name] != sql:
+                ok = False
+                break
+            else:
+                found.add(name)
+
+    if not ok or found < SCHEMA.keys():
+        for sql in reversed(list(DROP.values())):
+            cur.execute(sql)
+        for sql in SCHEMA.values():
+            cur.execute(sql)
+
+
+def _resume_offset(
+    db: sqlite3.Connection, src: URL, dst_path: Path, src_stat: FileStatus
+) -> int:
+    # A partially downloaded file can be continued only if it was left
+    # by a previous download of the same unchanged source file.
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT size, modification_time FROM download_journal
+        WHERE src = ? AND dst = ?
+        ORDER BY timestamp DESC
+        LIMIT 1""",
+        (str(src), str(dst_path)),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return 0
+    if row["size"] != src_stat.size:
+        return 0
+    if row["modification_time"] != src_stat.modification_time:
+        return 0
+    try:
+        dst_stat = dst_path.stat()
+    except OSError:
+        return 0
+    if not S_ISREG(dst_stat.st_mode) or dst_stat.st_size > src_stat.size:
+        return 0
+    return dst_stat.st_size
+
+
+def _save_download_journal(
+    db: sqlite3.Connection,
+    src: URL,
+    dst_path: Path,
+    src_stat: FileStatus,
+    *,
+    now: Optional[float] = None,
+) -> None:
+    if now is None:
+        now = time.time()
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.execute(
+        "DELETE FROM download_journal WHERE (src = ? AND dst = ?) OR timestamp < ?",
+        (str(src), str(dst_path), now - JOURNAL_MAXAGE),
+    )
+    cur.execute(
+        """
+        INSERT INTO download_journal (src, dst, size, modification_time, timestamp)
+        VALUES (?, ?, ?, ?, ?)""",
+        (str(src), str(dst_path), src_stat.size, src_stat.modification_time, now),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _drop_download_journal(db: sqlite3.Connection, src: URL, dst_path: Path) -> None:
+    _ensure_schema(db)
+    db.execute(
+        "DELETE FROM download_journal WHERE src = ? AND dst = ?",
+        (str(src), str(dst_path)),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _is_same_file(a: os.stat_result, b: os.stat_result) -> bool:
+    return (
+        a.st_size == b.st_size
+        and a.st_mtime_ns == b.st_mtime_ns
+        and a.st_ino == b.st_ino
+    )
+
+
+def _calc_file_hash(path: Path) -> str:
+    content_hash = hashlib.sha256()
+    with path.open("rb") as stream:
+        chunk = stream.read(READ_SIZE)
+        while chunk:
+            content_hash.update(chunk)
+            chunk = stream.read(READ_SIZE)
+    return content_hash.hexdigest()
+
+
+def _load_file_hash(
+    db: sqlite3.Connection, path: Path, stat: os.stat_result
+) -> Optional[str]:
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT hash FROM file_hashes
+        WHERE path = ? AND size = ? AND modification_time = ? AND inode = ?""",
+        (str(path), stat.st_size, stat.st_mtime_ns, stat.st_ino),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return cast(str, row["hash"])
+
+
+def _save_file_hash(
+    db: sqlite3.Connection,
+    path: Path,
+    stat: os.stat_result,
+    content_hash: str,
+    *,
+    now: Optional[float] = None,
+) -> None:
+    if now is None:
+        now = time.time()
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.execute("DELETE FROM file_hashes WHERE path = ?", (str(path),))
+    cur.execute("DELETE FROM file_hashes WHERE timestamp < ?", (now - MANIFEST_MAXAGE,))
+    cur.execute(
+        """
+        INSERT INTO file_hashes
+        (path, size, modification_time, inode, hash, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)""",
+        (str(path), stat.st_size, stat.st_mtime_ns, stat.st_ino, content_hash, now),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _load_remote_hash(
+    db: sqlite3.Connection, uri: URL, stat: FileStatus
+) -> Optional[str]:
+    # The hash is known only if the remote file was not modified
+    # since it was copied in checksum mode.
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT hash FROM remote_hashes
+        WHERE uri = ? AND size = ? AND modification_time = ?""",
+        (str(uri), stat.size, stat.modification_time),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return cast(str, row["hash"])
+
+
+def _save_remote_hash(
+    db: sqlite3.Connection,
+    uri: URL,
+    stat: FileStatus,
+    content_hash: str,
+    *,
+    now: Optional[float] = None,
+) -> None:
+    if now is None:
+        now = time.time()
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.execute("DELETE FROM remote_hashes WHERE uri = ?", (str(uri),))
+    cur.execute(
+        "DELETE FROM remote_hashes WHERE timestamp < ?", (now - MANIFEST_MAXAGE,)
+    )
+    cur.execute(
+        """
+        INSERT INTO remote_hashes (uri, size, modification_time, hash, timestamp)
+        VALUES (?, ?, ?, ?, ?)""",
+        (str(uri), stat.size, stat.modification_time, content_hash, now),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _load_disk_usage(
+    db: sqlite3.Connection, uri: str, modification_time: int
+) -> Optional[Tuple[int, int]]:
+    # A subtotal is valid while the directory is not modified.
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT size, files FROM disk_usage
+        WHERE uri = ? AND modification_time = ?""",
+        (uri, modification_time),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return row["size"], row["files"]
+
+
+def _save_disk_usage(
+    db: sqlite3.Connection,
+    uri: str,
+    modification_time: int,
+    size: int,
+    files: int,
+    *,
+    now: Optional[float] = None,
+) -> None:
+    if now is None:
+        now = time.time()
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.execute("DELETE FROM disk_usage WHERE uri = ?", (uri,))
+    cur.execute("DELETE FROM disk_usage WHERE timestamp < ?", (now - MANIFEST_MAXAGE,))
+    cur.execute(
+        """
+        INSERT INTO disk_usage (uri, modification_time, size, files, timestamp)
+        VALUES (?, ?, ?, ?, ?)""",
+        (uri, modification_time, size, files, now),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _load_upload_journal(
+    db: sqlite3.Connection,
+    src_path: Path,
+    dst: URL,
+    src_stat: os.stat_result,
+    part_size: int,
+) -> Tuple[Optional[str], Set[int]]:
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT size, modification_time, part_size, upload_id, parts
+        FROM upload_journal
+        WHERE src = ? AND dst = ?""",
+        (str(src_path), str(dst)),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None, set()
+    if (
+        row["size"] != src_stat.st_size
+        or row["modification_time"] != src_stat.st_mtime
+        or row["part_size"] != part_size
+    ):
+        return None, set()
+    return row["upload_id"], set(json.loads(row["parts"]))
+
+
+def _save_upload_journal(
+    db: sqlite3.Connection,
+    src_path: Path,
+    dst: URL,
+    src_stat: os.stat_result,
+    part_size: int,
+    upload_id: str,
+    parts: AbstractSet[int],
+    *,
+    now: Optional[float] = None,
+) -> None:
+    if now is None:
+        now = time.time()
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.execute(
+        "DELETE FROM upload_journal WHERE (src = ? AND dst = ?) OR timestamp < ?",
+        (str(src_path), str(dst), now - JOURNAL_MAXAGE),
+    )
+    cur.execute(
+        """
+        INSERT INTO upload_journal
+        (src, dst, size, modification_time, part_size, upload_id, parts, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            str(src_path),
+            str(dst),
+            src_stat.st_size,
+            src_stat.st_mtime,
+            part_size,
+            upload_id,
+            json.dumps(sorted(parts)),
+            now,
+        ),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _drop_upload_journal(db: sqlite3.Connection, src_path: Path, dst: URL) -> None:
+    _ensure_schema(db)
+    db.execute(
+        "DELETE FROM upload_journal WHERE src = ? AND dst = ?",
+        (str(src_path), str(dst)),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
 def _file_status_from_api(values: Dict[str, Any]) -> FileStatus:
     return FileStatus(
         path=values["path"],
@@ -704,6 +1949,139 @@ def _file_status_from_api(values: Dict[str, Any]) -> FileStatus:
     )
 
 
+def _file_status_to_api(status: FileStatus) -> Dict[str, Any]:
+    return {
+        "path": status.path,
+        "type": status.type.value,
+        "length": status.size,
+        "modificationTime": status.modification_time,
+        "permission": status.permission.value,
+    }
+
+
+class _MetadataCache:
+    """Cache of stat and ls results for remote paths.
+
+    Entries are kept in memory and, if persistent, in the config database
+    so that short consecutive CLI runs share them.
+    """
+
+    def __init__(self, config: Config, ttl: float, persistent: bool) -> None:
+        self._config = config
+        self._ttl = ttl
+        self._persistent = persistent
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+
+    def _uri(self, path: str) -> str:
+        return f"{self._config.storage_url}/{path}"
+
+    def get(self, op: str, path: str) -> Tuple[bool, Any]:
+        path = path.rstrip("/")
+        now = time.time()
+        entry = self._entries.get((op, path))
+        if entry is None and self._persistent:
+            with self._config._open_db() as db:
+                entry = _load_metadata(db, self._uri(path), op, now - self._ttl)
+            if entry is not None:
+                self._entries[(op, path)] = entry
+        if entry is None or entry[0] < now - self._ttl:
+            return False, None
+        return True, entry[1]
+
+    def put(self, op: str, path: str, value: Any) -> None:
+        path = path.rstrip("/")
+        now = time.time()
+        self._entries[(op, path)] = (now, value)
+        if self._persistent:
+            with self._config._open_db() as db:
+                _save_metadata(db, self._uri(path), op, value, now, now - self._ttl)
+
+    def invalidate(self, path: str, *, recursive: bool = False) -> None:
+        # Modification of a path changes listings and modification times
+        # of all its parents.
+        path = path.rstrip("/")
+        parts = path.split("/")
+        paths = {"/".join(parts[:i]) for i in range(len(parts) + 1)}
+        for key in list(self._entries):
+            if key[1] in paths or (recursive and key[1].startswith(path + "/")):
+                del self._entries[key]
+        if self._persistent:
+            with self._config._open_db() as db:
+                _drop_metadata(
+                    db,
+                    [self._uri(p) for p in paths],
+                    self._uri(path) + "/" if recursive else None,
+                )
+
+
+def _load_metadata(
+    db: sqlite3.Connection, uri: str, op: str, min_timestamp: float
+) -> Optional[Tuple[float, Any]]:
+    _ensure_schema(db)
+    cur = db.execute(
+        """
+        SELECT data, timestamp FROM metadata_cache
+        WHERE uri = ? AND op = ? AND timestamp >= ?""",
+        (uri, op, min_timestamp),
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    data = json.loads(row["data"])
+    value: Any
+    if op == "ls":
+        value = [_file_status_from_api(item) for item in data]
+    elif isinstance(data, dict):
+        value = _file_status_from_api(data)
+    else:
+        # The error message for a missing file
+        value = data
+    return row["timestamp"], value
+
+
+def _save_metadata(
+    db: sqlite3.Connection,
+    uri: str,
+    op: str,
+    value: Any,
+    now: float,
+    min_timestamp: float,
+) -> None:
+    if isinstance(value, list):
+        data = json.dumps([_file_status_to_api(item) for item in value])
+    elif isinstance(value, FileStatus):
+        data = json.dumps(_file_status_to_api(value))
+    else:
+        data = json.dumps(value)
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.execute("DELETE FROM metadata_cache WHERE uri = ? AND op = ?", (uri, op))
+    cur.execute("DELETE FROM metadata_cache WHERE timestamp < ?", (min_timestamp,))
+    cur.execute(
+        """
+        INSERT INTO metadata_cache (uri, op, data, timestamp)
+        VALUES (?, ?, ?, ?)""",
+        (uri, op, data, now),
+    )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
+def _drop_metadata(
+    db: sqlite3.Connection, uris: Iterable[str], prefix: Optional[str]
+) -> None:
+    _ensure_schema(db)
+    cur = db.cursor()
+    cur.executemany("DELETE FROM metadata_cache WHERE uri = ?", [(u,) for u in uris])
+    if prefix is not None:
+        cur.execute(
+            "DELETE FROM metadata_cache WHERE substr(uri, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+    with contextlib.suppress(sqlite3.OperationalError):
+        db.commit()
+
+
 ProgressQueueItem = Optional[Tuple[Callable[[Any], None], Any]]
 
 
@@ -789,5 +2167,150 @@ async def run_concurrently(coros: Iterable[Awaitable[Any]]) -> None:
         raise  # pragma: no cover
 
 
+def _parent_paths(path: str) -> Iterator[str]:
+    while "/" in path:
+        path = path.rpartition("/")[0]
+        yield path
+
+
+TransferJob = Callable[[], Awaitable[None]]
+_QueueItem = Tuple[float, int, Optional[TransferJob], Optional["_DirNode"]]
+
+
+class _DirNode:
+    # A directory being copied.  It is left when its listing is processed
+    # and all files and subdirectories scheduled from it are transferred.
+    __slots__ = ("parent", "src", "dst", "pending")
+
+    def __init__(self, parent: Optional["_DirNode"], src: URL, dst: URL) -> None:
+        self.parent = parent
+        self.src = src
+        self.dst = dst
+        self.pending = 1
+
+
+class _UsageNode:
+    __slots__ = (
+        "parent",
+        "uri",
+        "depth",
+        "modification_time",
+        "size",
+        "files",
+        "pending",
+    )
+
+    def __init__(
+        self,
+        parent: Optional["_UsageNode"],
+        uri: URL,
+        depth: int,
+        modification_time: Optional[int],
+    ) -> None:
+        self.parent = parent
+        self.uri = uri
+        self.depth = depth
+        self.modification_time = modification_time
+        self.size = 0
+        self.files = 0
+        # The own listing and not finished subdirectories
+        self.pending = 1
+
+
+class _TransferScheduler:
+    """Producer/consumer engine for recursive copies.
+
+    A few directory walkers list directories and feed file transfers
+    into a bounded queue, a fixed pool of workers drains it.  Walkers
+    block when the queue is full, so the memory footprint depends on the
+    queue size and the width of the tree, not on the number of files.
+
+    Queued files are ordered by the schedule: "size-desc" starts the
+    largest files first to avoid a long tail at the end of the copy,
+    "small-first" minimizes the time to the first copied files and
+    "fifo" keeps the directory order.
+    """
+
+    def __init__(
+        self,
+        progress: QueuedProgress,
+        *,
+        workers: int,
+        queue_size: int,
+        schedule: str = "size-desc",
+    ) -> None:
+        self._progress = progress
+        self._workers = workers
+        self._schedule = schedule
+        self._files: "asyncio.PriorityQueue[_QueueItem]" = asyncio.PriorityQueue(
+            queue_size
+        )
+        # Sequence numbers keep the queue stable for files of equal priority
+        self._counter = itertools.count()
+        # LIFO keeps the traversal depth-first and the frontier small
+        self._dirs: "asyncio.LifoQueue[Optional[TransferJob]]" = asyncio.LifoQueue()
+        self._walking = 0
+
+    def add_dir(self, parent: Optional[_DirNode], job: TransferJob) -> None:
+        if parent is not None:
+            parent.pending += 1
+        self._dirs.put_nowait(job)
+
+    async def add_file(self, parent: _DirNode, size: int, job: TransferJob) -> None:
+        parent.pending += 1
+        if self._schedule == "size-desc":
+            priority = -size
+        elif self._schedule == "small-first":
+            priority = size
+        else:
+            priority = 0
+        await self._files.put((priority, next(self._counter), job, parent))
+
+    async def done(self, node: _DirNode) -> None:
+        # Called when the directory listing is processed and when every
+        # scheduled child is transferred, the last call leaves the directory
+        current: Optional[_DirNode] = node
+        while current is not None:
+            current.pending -= 1
+            if current.pending:
+                return
+            await self._progress.leave(
+                StorageProgressLeaveDir(current.src, current.dst)
+            )
+            current = current.parent
+
+    async def run(self, job: TransferJob) -> None:
+        self.add_dir(None, job)
+
+        async def walk() -> None:
+            await run_concurrently(self._walk() for i in range(WALKERS))
+            for i in range(self._workers):
+                await self._files.put((math.inf, next(self._counter), None, None))
+
+        await run_concurrently([walk(), *(self._work() for i in range(self._workers))])
+
+    async def _walk(self) -> None:
+        while True:
+            job = await self._dirs.get()
+            if job is None:
+                return
+            self._walking += 1
+            await job()
+            self._walking -= 1
+            if not self._walking and self._dirs.empty():
+                # Nothing left to list, stop all walkers
+                for i in range(WALKERS):
+                    self._dirs.put_nowait(None)
+
+    async def _work(self) -> None:
+        while True:
+            priority, seq, job, parent = await self._files.get()
+            if job is None:
+                return
+            assert parent is not None
+            await job()
+            await self.done(parent)
+
+
 async def _always(path: str) -> bool:
     return True
@@ -1,6 +1,9 @@
 import asyncio
+import itertools
 import logging
 import sys
+import time
+from collections import deque
 from types import TracebackType
 from typing import (
     Any,
@@ -8,10 +11,13 @@ from typing import (
     Awaitable,
     Callable,
     Coroutine,
+    Deque,
     Generator,
     Generic,
+    Iterable,
     Iterator,
     Optional,
+    Tuple,
     Type,
     TypeVar,
 )
@@ -112,3 +118,59 @@ def retries(
 
 def flat(sql: str) -> str:
     return " ".join(line.strip() for line in sql.splitlines() if line.strip())
+
+
+async def _run_ordered(
+    func: Callable[[_T], Awaitable[Any]], items: Iterable[_T], workers: int
+) -> AsyncIterator[Tuple[_T, Optional[Exception]]]:
+    # Run up to *workers* calls concurrently, yield every item with its
+    # error in the order of *items* as soon as the call is finished.
+    if workers < 1:
+        raise ValueError(f"Invalid number of workers: {workers}")
+    it = iter(items)
+    pending: Deque[Tuple[_T, "asyncio.Future[Any]"]] = deque()
+    try:
+        while True:
+            for item in itertools.islice(it, workers - len(pending)):
+                pending.append((item, asyncio.ensure_future(func(item))))
+            if not pending:
+                return
+            item, task = pending.popleft()
+            error: Optional[Exception] = None
+            try:
+                await task
+            except Exception as exc:
+                error = exc
+            yield item, error
+    finally:
+        for item, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for item, task in pending), return_exceptions=True)
+
+
+class _TokenBucket:
+    # Limits the rate of acquisitions to *rate* per second, allowing bursts
+    # of up to *burst* acquisitions after an idle period.
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}")
+        if burst < 1:
+            raise ValueError(f"Invalid burst: {burst}")
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
@@ -2,13 +2,28 @@
 
 import asyncio
 import codecs
+import contextlib
 import enum
 import functools
 import logging
 import signal
 import sys
 import threading
-from typing import Any, Awaitable, Callable, List, Optional, Sequence
+from collections import deque
+from typing import (
+    IO,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import click
 from prompt_toolkit.formatted_text import HTML, merge_formatted_text
@@ -21,11 +36,19 @@ from prompt_toolkit.output import Output, create_output
 from prompt_toolkit.shortcuts import PromptSession
 from typing_extensions import NoReturn
 
-from neuromation.api import IllegalArgumentError, JobDescription, JobStatus, StdStream
+from neuromation.api import (
+    ExecResult,
+    IllegalArgumentError,
+    JobDescription,
+    JobStatus,
+    StdStream,
+)
 
 from .const import EX_IOERR, EX_PLATFORMERROR
+from .formatters.ftable import table
 from .formatters.jobs import ExecStopProgress, JobStopProgress
 from .root import Root
+from .utils import wait_job
 
 
 log = logging.getLogger(__name__)
@@ -48,6 +71,21 @@ ATTACH_STARTED_AFTER_LOGS = click.style(
     "========= Job's output, may overlap with logs =========", dim=True
 )
 
+# Log output is flushed when so many bytes are pending or in so many seconds
+LOG_FLUSH_SIZE = 1024 * 1024
+LOG_FLUSH_DELAY = 0.1
+
+# The log of a running job is caught up for --tail if no data arrives in
+# so many seconds
+LOG_TAIL_IDLE = 0.5
+
+# Logs of several jobs are buffered up to so many lines per job, and at most
+# so many lines of a job are printed before switching to the next one
+LOG_MUX_QUEUE_SIZE = 1000
+LOG_MUX_BATCH = 100
+
+LOG_PREFIX_COLORS = ("cyan", "magenta", "yellow", "green", "blue", "red")
+
 
 class InterruptAction(enum.Enum):
     NOTHING = enum.auto()
@@ -70,28 +108,225 @@ class AttachHelper:
         self.action = InterruptAction.NOTHING
 
 
-async def process_logs(root: Root, job: str, helper: Optional[AttachHelper]) -> None:
+async def process_logs(
+    root: Root,
+    job: str,
+    helper: Optional[AttachHelper],
+    *,
+    tail: Optional[int] = None,
+    output: Optional[BinaryIO] = None,
+) -> None:
+    chunks = root.client.jobs.monitor(job)
+    if tail is not None:
+        chunks = _tail_log(chunks, tail)
+    if helper is None:
+        if output is not None:
+            writer = LogWriter(output, decode=False)
+        else:
+            writer = LogWriter(sys.stdout, decode=True)
+        try:
+            async for chunk in chunks:
+                writer.write(chunk)
+        finally:
+            writer.close()
+        return
+
     codec_info = codecs.lookup("utf8")
     decoder = codec_info.incrementaldecoder("replace")
-    async for chunk in root.client.jobs.monitor(job):
+    async for chunk in chunks:
         if not chunk:
             txt = decoder.decode(b"", final=True)
             if not txt:
                 break
         else:
             txt = decoder.decode(chunk)
-        if helper is not None:
-            if helper.attach_ready:
-                return
-            async with helper.write_sem:
-                helper.log_printed = True
-                sys.stdout.write(txt)
-                sys.stdout.flush()
-        else:
+        if helper.attach_ready:
+            return
+        async with helper.write_sem:
+            helper.log_printed = True
             sys.stdout.write(txt)
             sys.stdout.flush()
 
 
+async def process_logs_many(
+    root: Root, jobs: Sequence[Tuple[str, str]], *, tail: Optional[int] = None
+) -> bool:
+    """Print logs of several jobs line by line, each line prefixed with its job.
+
+    *jobs* is a sequence of (job id, label) pairs.  Every log is read by its own
+    task into a bounded queue, so reading of a log stops while its queue is
+    full, and queues are printed in turn by at most LOG_MUX_BATCH lines, so a
+    chatty job cannot hold back others.  Returns False if some log failed.
+    """
+    queues: List["asyncio.Queue[bytes]"] = [
+        asyncio.Queue(LOG_MUX_QUEUE_SIZE) for _ in jobs
+    ]
+    ready = asyncio.Event()
+    tasks = []
+    prefixes = []
+    for i, (job, label) in enumerate(jobs):
+        task = asyncio.ensure_future(_read_log_lines(root, job, tail, queues[i], ready))
+        task.add_done_callback(lambda task: ready.set())
+        tasks.append(task)
+        prefix = f"[{label}] "
+        if root.color:
+            prefix = click.style(
+                prefix, fg=LOG_PREFIX_COLORS[i % len(LOG_PREFIX_COLORS)]
+            )
+        prefixes.append(prefix.encode())
+
+    writer = LogWriter(sys.stdout, decode=True)
+    active = set(range(len(jobs)))
+    ok = True
+    try:
+        while active:
+            ready.clear()
+            pending = False
+            for i in sorted(active):
+                queue = queues[i]
+                lines: List[bytes] = []
+                while not queue.empty() and len(lines) < LOG_MUX_BATCH:
+                    lines.append(prefixes[i] + queue.get_nowait() + b"\n")
+                if lines:
+                    writer.write(b"".join(lines))
+                if not queue.empty():
+                    pending = True
+                elif tasks[i].done():
+                    active.discard(i)
+                    error = tasks[i].exception()
+                    if error is not None:
+                        ok = False
+                        click.secho(
+                            f"Cannot get logs of job {jobs[i][1]}: {error}",
+                            err=True,
+                            fg="red",
+                        )
+            if pending:
+                # Let readers refill the drained queues
+                await asyncio.sleep(0)
+            elif active:
+                await ready.wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+    return ok
+
+
+async def _read_log_lines(
+    root: Root,
+    job: str,
+    tail: Optional[int],
+    queue: "asyncio.Queue[bytes]",
+    ready: asyncio.Event,
+) -> None:
+    chunks = root.client.jobs.monitor(job)
+    if tail is not None:
+        chunks = _tail_log(chunks, tail)
+    partial = b""
+    async for chunk in chunks:
+        *complete, partial = (partial + chunk).split(b"\n")
+        for line in complete:
+            await queue.put(line)
+            ready.set()
+    if partial:
+        # The log of a finished job may end without a newline
+        await queue.put(partial)
+
+
+class LogWriter:
+    """Write log chunks to a stream, coalescing flushes.
+
+    The stream is flushed when LOG_FLUSH_SIZE bytes are pending or
+    LOG_FLUSH_DELAY seconds after the first pending write.  Chunks are
+    decoded for a text stream and are written as is to a binary one.  The
+    delayed flush is postponed while *lock* is held by another writer, e.g. an
+    interruption dialog.
+    """
+
+    def __init__(
+        self,
+        stream: IO[Any],
+        *,
+        decode: bool,
+        lock: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        self._stream = stream
+        self._lock = lock
+        self._decoder = (
+            codecs.getincrementaldecoder("utf8")("replace") if decode else None
+        )
+        self._pending = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def write(self, chunk: Union[bytes, memoryview]) -> None:
+        if self._decoder is not None:
+            self._stream.write(self._decoder.decode(chunk))
+        else:
+            self._stream.write(chunk)
+        self._pending += len(chunk)
+        if self._pending >= LOG_FLUSH_SIZE:
+            self.flush()
+        elif self._handle is None:
+            loop = asyncio.get_event_loop()
+            self._handle = loop.call_later(LOG_FLUSH_DELAY, self._delayed_flush)
+
+    def _delayed_flush(self) -> None:
+        if self._lock is not None and self._lock.locked():
+            loop = asyncio.get_event_loop()
+            self._handle = loop.call_later(LOG_FLUSH_DELAY, self._delayed_flush)
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stream.flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._decoder is not None:
+            self._stream.write(self._decoder.decode(b"", final=True))
+        self.flush()
+
+
+async def _tail_log(chunks: AsyncIterator[bytes], lines: int) -> AsyncIterator[bytes]:
+    # Keep the last *lines* lines until the log is caught up, i.e. it is ended
+    # or no data arrives for LOG_TAIL_IDLE seconds, and pass the rest as is.
+    last: Deque[bytes] = deque(maxlen=lines + 1)
+    partial = b""
+    next_chunk = asyncio.ensure_future(chunks.__anext__())
+    try:
+        while True:
+            done, pending = await asyncio.wait([next_chunk], timeout=LOG_TAIL_IDLE)
+            if not done:
+                break
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            next_chunk = asyncio.ensure_future(chunks.__anext__())
+            *complete, partial = (partial + chunk).split(b"\n")
+            last.extend(line + b"\n" for line in complete)
+        kept = list(last)
+        if partial:
+            kept.append(partial)
+        if lines:
+            yield b"".join(kept[-lines:])
+        while True:
+            try:
+                yield await next_chunk
+            except StopAsyncIteration:
+                return
+            next_chunk = asyncio.ensure_future(chunks.__anext__())
+    finally:
+        next_chunk.cancel()
+        with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+            await next_chunk
+
+
 async def process_exec(root: Root, job: str, cmd: str, tty: bool) -> NoReturn:
     exec_id = await root.client.jobs.exec_create(job, cmd, tty=tty)
     try:
@@ -112,6 +347,60 @@ async def process_exec(root: Root, job: str, cmd: str, tty: bool) -> NoReturn:
     sys.exit(info.exit_code)
 
 
+async def process_exec_many(
+    root: Root,
+    jobs: Sequence[Tuple[str, str]],
+    cmd: str,
+    *,
+    prefix: bool,
+    concurrency: int,
+) -> NoReturn:
+    # *jobs* are (job id, label) pairs.  The output of every job is printed
+    # as soon as its command and all preceding ones are finished, grouped
+    # under a header or with every line prefixed, followed by exit codes.
+    labels = dict(jobs)
+    colors = {
+        id: LOG_PREFIX_COLORS[i % len(LOG_PREFIX_COLORS)] for i, id in enumerate(labels)
+    }
+    rows = [["JOB", "EXIT CODE"]]
+    failed = False
+    async for id, result, error in root.client.jobs.exec_many(
+        labels, cmd, concurrency=concurrency
+    ):
+        label = labels[id]
+        if error is not None:
+            failed = True
+            rows.append([label, f"error: {error}"])
+            continue
+        assert result is not None
+        if prefix:
+            head = f"[{label}] "
+            if root.color:
+                head = click.style(head, fg=colors[id])
+        else:
+            head = ""
+            click.echo(click.style(f"===== {label} =====", dim=True))
+        _print_exec_output(result, head)
+        if result.exit_code:
+            failed = True
+        rows.append([label, str(result.exit_code)])
+    for line in table(rows):
+        click.echo(line, err=True)
+    sys.exit(1 if failed else 0)
+
+
+def _print_exec_output(result: ExecResult, head: str) -> None:
+    for data, err in ((result.stdout, False), (result.stderr, True)):
+        txt = data.decode("utf8", "replace")
+        if not txt:
+            continue
+        if head:
+            txt = "".join(head + line for line in txt.splitlines(keepends=True))
+        if not txt.endswith("\n"):
+            txt += "\n"
+        click.echo(txt, nl=False, err=err)
+
+
 async def _exec_tty(root: Root, job: str, exec_id: str) -> None:
     loop = asyncio.get_event_loop()
     helper = AttachHelper(quiet=True)
@@ -206,10 +495,15 @@ async def process_attach(
         root.soft_reset_tty()
 
     job = await root.client.jobs.status(job.id)
-    while job.status == JobStatus.RUNNING:
-        await asyncio.sleep(0.2)
-        job = await root.client.jobs.status(job.id)
-        if not progress.step(job):
+    if job.status == JobStatus.RUNNING:
+        job = await wait_job(
+            root.client,
+            job,
+            until={JobStatus.SUCCEEDED, JobStatus.FAILED},
+            step=progress.step,
+        )
+        if job.status == JobStatus.RUNNING:
+            # Timeout
             sys.exit(EX_IOERR)
     if job.status == JobStatus.FAILED:
         sys.exit(job.history.exit_code or EX_PLATFORMERROR)
@@ -465,42 +759,38 @@ async def _process_stdin_non_tty(root: Root, stream: StdStream) -> None:
 async def _process_stdout_non_tty(
     root: Root, stream: StdStream, helper: AttachHelper
 ) -> None:
-    codec_info = codecs.lookup("utf8")
-    decoders = {
-        1: codec_info.incrementaldecoder("replace"),
-        2: codec_info.incrementaldecoder("replace"),
+    # Output is decoded for a terminal only and is written as is otherwise,
+    # flushes are coalesced by LogWriter and are held off by the interruption
+    # dialog.
+    writers = {
+        fileno: LogWriter(f, decode=True, lock=helper.write_sem)
+        if f.isatty()
+        else LogWriter(f.buffer, decode=False, lock=helper.write_sem)
+        for fileno, f in ((1, sys.stdout), (2, sys.stderr))
     }
-    streams = {1: sys.stdout, 2: sys.stderr}
-
-    async def _write(fileno: int, txt: str) -> None:
-        f = streams[fileno]
-        async with helper.write_sem:
-            if not helper.quiet and not helper.attach_ready:
-                # Print header to stdout only,
-                # logs are printed to stdout and never to
-                # stderr (but logs printing is stopped by
-                # helper.attach_ready = True regardless
-                # what stream had receive text in attached mode.
-                if helper.log_printed:
-                    s = ATTACH_STARTED_AFTER_LOGS
-                    if root.tty:
-                        s = click.style("√ ", fg="green") + s
-                    click.echo(s)
-            helper.attach_ready = True
-            f.write(txt)
-            f.flush()
 
-    while True:
-        chunk = await stream.read_out()
-        if chunk is None:
-            for fileno in (1, 2):
-                txt = decoders[fileno].decode(b"", final=True)
-                if txt:
-                    await _write(fileno, txt)
-            break
-        else:
-            txt = decoders[chunk.fileno].decode(chunk.data)
-            await _write(chunk.fileno, txt)
+    try:
+        while True:
+            chunk = await stream.read_out()
+            if chunk is None:
+                break
+            async with helper.write_sem:
+                if not helper.quiet and not helper.attach_ready:
+                    # Print header to stdout only,
+                    # logs are printed to stdout and never to
+                    # stderr (but logs printing is stopped by
+                    # helper.attach_ready = True regardless
+                    # what stream had receive text in attached mode.
+                    if helper.log_printed:
+                        s = ATTACH_STARTED_AFTER_LOGS
+                        if root.tty:
+                            s = click.style("√ ", fg="green") + s
+                        click.echo(s)
+                helper.attach_ready = True
+                writers[chunk.fileno].write(chunk.data)
+    finally:
+        for writer in writers.values():
+            writer.close()
 
 
 def _create_interruption_dialog() -> PromptSession[InterruptAction]:
@@ -1,14 +1,17 @@
 from dataclasses import dataclass
 from enum import Enum
-from itertools import zip_longest
-from typing import Any, Iterator, List, Optional, Sequence
+from itertools import chain, islice, zip_longest
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
 
 from ..text_helper import StyledTextHelper
 
 
-__all__ = ["table"]
+__all__ = ["table", "table_stream"]
 __version__ = "0.1"
 
+# Rows used to calculate column widths by table_stream()
+PROBE_ROWS = 100
+
 
 @dataclass(frozen=True)
 class ColumnWidth:
@@ -48,7 +51,42 @@ def table(
     if not rows:
         return
 
-    # Columns widths calculation
+    calc_widths = _calc_widths(rows, widths)
+    max_empty_columns = _calc_max_empty_columns(calc_widths, max_width)
+
+    for row in rows:
+        for line in _row(row, calc_widths, aligns, max_width, max_empty_columns):
+            yield line
+
+
+def table_stream(
+    rows: Iterable[Sequence[str]],
+    widths: Sequence[ColumnWidth] = (),
+    aligns: Sequence[Align] = (),
+    max_width: Optional[int] = None,
+    probe: int = PROBE_ROWS,
+) -> Iterator[str]:
+    """Format rows lazily, keeping at most *probe* rows in memory.
+
+    Column widths are calculated from the first *probe* rows only (and the
+    column spec), later rows are wrapped to fit them.
+    """
+    rows_it = iter(rows)
+    head = list(islice(rows_it, probe))
+    if not head:
+        return
+
+    calc_widths = _calc_widths(head, widths)
+    max_empty_columns = _calc_max_empty_columns(calc_widths, max_width)
+
+    for row in chain(head, rows_it):
+        for line in _row(row, calc_widths, aligns, max_width, max_empty_columns):
+            yield line
+
+
+def _calc_widths(
+    rows: Sequence[Sequence[str]], widths: Sequence[ColumnWidth]
+) -> List[int]:
     if len(widths) < len(rows[0]):
         widths = tuple(widths) + tuple([ColumnWidth()]) * (len(rows[0]) - len(widths))
     calc_widths: List[int] = []
@@ -65,9 +103,14 @@ def table(
             calc_widths.append(width_max)
         elif width_min:
             calc_widths.append(width_min)
+    return calc_widths
 
+
+def _calc_max_empty_columns(
+    calc_widths: Sequence[int], max_width: Optional[int]
+) -> int:
     # How many empty columns can be displayed
-    max_empty_columns = len(rows[0])
+    max_empty_columns = len(calc_widths)
     if max_width:
         sum_width = 0
         for i, column_width in enumerate(calc_widths):
@@ -76,10 +119,7 @@ def table(
                 max_empty_columns = i
                 break
             sum_width += 2
-
-    for row in rows:
-        for line in _row(row, calc_widths, aligns, max_width, max_empty_columns):
-            yield line
+    return max_empty_columns
 
 
 def _row(
@@ -4,7 +4,7 @@ import itertools
 import sys
 import time
 from dataclasses import dataclass
-from typing import Iterable, Iterator, List
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 import humanize
 from click import secho, style, unstyle
@@ -18,9 +18,10 @@ from neuromation.api import (
 )
 from neuromation.cli.parse_utils import JobColumnInfo
 from neuromation.cli.printer import StreamPrinter, TTYPrinter
+from neuromation.cli.telemetry import COLUMNS, Percentiles
 from neuromation.cli.utils import format_size
 
-from .ftable import table
+from .ftable import table, table_stream
 from .utils import ImageFormatter, URIFormatter, image_formatter
 
 
@@ -202,6 +203,66 @@ class JobTelemetryFormatter:
         )
 
 
+class JobsTelemetryFormatter:
+    """Format the latest telemetry of several jobs as a table."""
+
+    def __call__(
+        self, samples: Sequence[Tuple[str, Optional[JobTelemetry]]]
+    ) -> Iterator[str]:
+        rows = [
+            ["JOB", "CPU", "MEMORY (MB)", "GPU (%)", "GPU_MEMORY (MB)", "TIMESTAMP"]
+        ]
+        for job, info in samples:
+            if info is None:
+                rows.append([job, "-", "-", "-", "-", "-"])
+                continue
+            rows.append(
+                [
+                    job,
+                    f"{info.cpu:.3f}",
+                    f"{info.memory:.3f}",
+                    f"{info.gpu_duty_cycle}" if info.gpu_duty_cycle else "0",
+                    f"{info.gpu_memory:.3f}" if info.gpu_memory else "0",
+                    time.ctime(info.timestamp),
+                ]
+            )
+        return table(rows)
+
+
+class TelemetrySummaryFormatter:
+    """Format p50/p95/max of recorded telemetry of jobs as a table."""
+
+    titles = {
+        "cpu": "CPU",
+        "memory": "MEMORY (MB)",
+        "gpu_duty_cycle": "GPU (%)",
+        "gpu_memory": "GPU_MEMORY (MB)",
+    }
+
+    def __call__(
+        self, summary: Sequence[Tuple[str, int, Mapping[str, Optional[Percentiles]]]]
+    ) -> Iterator[str]:
+        metrics = [name for name in COLUMNS if name in self.titles]
+        rows = [
+            ["JOB", "SAMPLES"]
+            + [
+                f"{self.titles[name]} {p}"
+                for name in metrics
+                for p in ("P50", "P95", "MAX")
+            ]
+        ]
+        for job, count, stats in summary:
+            row = [job, str(count)]
+            for name in metrics:
+                values = stats.get(name)
+                if values is None:
+                    row.extend(["-"] * 3)
+                else:
+                    row.extend(f"{value:.3f}" for value in values)
+            rows.append(row)
+        return table(rows)
+
+
 class BaseJobsFormatter:
     @abc.abstractmethod
     def __call__(
@@ -277,15 +338,16 @@ class TabularJobsFormatter(BaseJobsFormatter):
         self._image_formatter = image_formatter
 
     def __call__(self, jobs: Iterable[JobDescription]) -> Iterator[str]:
-        rows: List[List[str]] = []
-        rows.append([column.title for column in self._columns])
-        for job in jobs:
-            rows.append(
+        rows = itertools.chain(
+            [[column.title for column in self._columns]],
+            (
                 TabularJobRow.from_job(
                     job, self._username, image_formatter=self._image_formatter
                 ).to_list(self._columns)
-            )
-        for line in table(
+                for job in jobs
+            ),
+        )
+        for line in table_stream(
             rows,
             widths=[column.width for column in self._columns],
             aligns=[column.align for column in self._columns],
@@ -294,6 +356,29 @@ class TabularJobsFormatter(BaseJobsFormatter):
             yield line
 
 
+class JobsWatchPrinter:
+    """Redraw the jobs table in place, only changed lines are printed.
+
+    The table is cut to *height* lines since the cursor cannot be moved to
+    lines scrolled out of the terminal.
+    """
+
+    def __init__(self, height: int) -> None:
+        self._printer = TTYPrinter()
+        self._height = max(height - 1, 1)
+        self._lines: List[str] = []
+
+    def __call__(self, lines: Iterable[str]) -> None:
+        new = list(itertools.islice(lines, self._height))
+        for lineno, line in enumerate(new):
+            if lineno >= len(self._lines) or self._lines[lineno] != line:
+                self._printer.print(line, lineno)
+        for lineno in range(len(new), len(self._lines)):
+            if self._lines[lineno]:
+                self._printer.print("", lineno)
+        self._lines = new
+
+
 class ResourcesFormatter:
     def __call__(self, resources: Resources) -> str:
         lines = []
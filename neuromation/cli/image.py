@@ -1,5 +1,6 @@
 import contextlib
 import logging
+from pathlib import Path
 from typing import Optional
 
 import click
@@ -42,8 +43,20 @@ def image() -> None:
 @command()
 @argument("local_image")
 @argument("remote_image", required=False)
+@option(
+    "--oci-layout",
+    type=click.Path(exists=True, file_okay=False),
+    metavar="DIR",
+    help="Push the image from an OCI image layout in DIR directly to "
+    "the registry, without Docker. LOCAL_IMAGE is omitted then.",
+)
 @deprecated_quiet_option
-async def push(root: Root, local_image: str, remote_image: Optional[str]) -> None:
+async def push(
+    root: Root,
+    local_image: str,
+    remote_image: Optional[str],
+    oci_layout: Optional[str],
+) -> None:
     """
     Push an image to platform registry.
 
@@ -56,10 +69,24 @@ async def push(root: Root, local_image: str, remote_image: Optional[str]) -> Non
     neuro push myimage
     neuro push alpine:latest image:my-alpine:production
     neuro push alpine image://myfriend/alpine:shared
+    neuro push --oci-layout ./my-alpine image:my-alpine:production
 
     """
 
     progress = DockerImageProgress.create(tty=root.tty, quiet=root.quiet)
+    if oci_layout is not None:
+        # The only argument is the remote image
+        if remote_image is not None:
+            raise click.UsageError("Option --oci-layout accepts a remote image only.")
+        with contextlib.closing(progress):
+            result = await root.client.images.push_layout(
+                Path(oci_layout),
+                root.client.parse.remote_image(local_image),
+                progress=progress,
+            )
+        click.echo(result)
+        return
+
     local_obj = root.client.parse.local_image(local_image)
     if remote_image is not None:
         remote_obj: Optional[RemoteImage] = root.client.parse.remote_image(remote_image)
@@ -75,8 +102,20 @@ async def push(root: Root, local_image: str, remote_image: Optional[str]) -> Non
 @command()
 @argument("remote_image")
 @argument("local_image", required=False)
+@option(
+    "--oci-layout",
+    type=click.Path(file_okay=False),
+    metavar="DIR",
+    help="Pull the image directly from the registry, without Docker, "
+    "into an OCI image layout in DIR.",
+)
 @deprecated_quiet_option
-async def pull(root: Root, remote_image: str, local_image: Optional[str]) -> None:
+async def pull(
+    root: Root,
+    remote_image: str,
+    local_image: Optional[str],
+    oci_layout: Optional[str],
+) -> None:
     """
     Pull an image from platform registry.
 
@@ -88,11 +127,24 @@ async def pull(root: Root, remote_image: str, local_image: Optional[str]) -> Non
     neuro pull image:myimage
     neuro pull image://myfriend/alpine:shared
     neuro pull image://username/my-alpine:production alpine:from-registry
+    neuro pull --oci-layout ./my-alpine image:my-alpine:production
 
     """
 
     progress = DockerImageProgress.create(tty=root.tty, quiet=root.quiet)
     remote_obj = root.client.parse.remote_image(remote_image)
+    if oci_layout is not None:
+        if local_image is not None:
+            raise click.UsageError(
+                "Option --oci-layout cannot be used with LOCAL_IMAGE."
+            )
+        with contextlib.closing(progress):
+            await root.client.images.pull_layout(
+                remote_obj, Path(oci_layout), progress=progress
+            )
+        click.echo(oci_layout)
+        return
+
     if local_image is not None:
         local_obj: Optional[LocalImage] = root.client.parse.local_image(local_image)
     else:
@@ -7,11 +7,24 @@ import shlex
 import sys
 import uuid
 import webbrowser
-from datetime import datetime, timedelta
-from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import (
+    IO,
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import async_timeout
 import click
+import yaml
 from dateutil.parser import isoparse
 from yarl import URL
 
@@ -23,10 +36,12 @@ from neuromation.api import (
     JobDescription,
     JobRestartPolicy,
     JobStatus,
+    JobTelemetry,
     RemoteImage,
     Resources,
     Volume,
 )
+from neuromation.api.jobs import EXEC_CONCURRENCY, RUN_CONCURRENCY
 from neuromation.cli.formatters.images import DockerImageProgress
 from neuromation.cli.formatters.utils import (
     URIFormatter,
@@ -34,7 +49,13 @@ from neuromation.cli.formatters.utils import (
     uri_formatter,
 )
 
-from .ael import process_attach, process_exec, process_logs
+from .ael import (
+    process_attach,
+    process_exec,
+    process_exec_many,
+    process_logs,
+    process_logs_many,
+)
 from .click_types import (
     JOB,
     JOB_COLUMNS,
@@ -52,16 +73,22 @@ from .defaults import (
     JOB_GPU_NUMBER,
     JOB_MEMORY_AMOUNT,
 )
+from .formatters.ftable import table
 from .formatters.jobs import (
     BaseJobsFormatter,
     JobStartProgress,
     JobStatusFormatter,
+    JobsTelemetryFormatter,
+    JobsWatchPrinter,
     JobTelemetryFormatter,
     SimpleJobsFormatter,
     TabularJobsFormatter,
+    TelemetrySummaryFormatter,
+    format_job_status,
 )
 from .parse_utils import JobColumnInfo, get_default_columns, parse_columns
 from .root import Root
+from .telemetry import TelemetryRecorder, percentiles, read_telemetry
 from .utils import (
     NEURO_STEAL_CONFIG,
     AsyncExitStack,
@@ -72,8 +99,11 @@ from .utils import (
     group,
     option,
     pager_maybe,
+    pager_maybe_stream,
     resolve_job,
+    resolve_jobs,
     volume_to_verbose_str,
+    wait_job,
 )
 
 
@@ -91,6 +121,15 @@ REGEX_JOB_LIFE_SPAN = re.compile(
     r"^((?P<d>\d+)d)?((?P<h>\d+)h)?((?P<m>\d+)m)?((?P<s>\d+)s)?$"
 )
 
+# Refresh interval of `neuro ps --watch` in seconds
+WATCH_INTERVAL = 2.0
+
+# Refresh interval of the `neuro top` table of several jobs in seconds
+TOP_INTERVAL = 1.0
+
+# Keys of a job in a spec file of `neuro run --from-file`
+JOB_SPEC_KEYS = frozenset({"image", "cmd", "entrypoint", "env", "preset"})
+
 
 TTY_OPT = option(
     "-t/-T",
@@ -396,7 +435,7 @@ async def submit(
 
 @command(context_settings=dict(allow_interspersed_args=False))
 @argument("job", type=JOB)
-@argument("cmd", nargs=-1, type=click.UNPROCESSED, required=True)
+@argument("cmd", nargs=-1, type=click.UNPROCESSED, required=False)
 @TTY_OPT
 @option(
     "--no-key-check",
@@ -412,6 +451,27 @@ async def submit(
     hidden=True,
     help="Maximum allowed time for executing the command, 0 for no timeout",
 )
+@option(
+    "--tag",
+    metavar="TAG",
+    type=str,
+    help="Execute the command in own running jobs with the tag instead of JOB "
+    "(multiple option)",
+    multiple=True,
+)
+@option(
+    "--prefix",
+    is_flag=True,
+    help="Prefix every line of output with the job instead of grouping "
+    "the output by job, with --tag",
+)
+@option(
+    "--concurrency",
+    type=click.IntRange(1),
+    default=EXEC_CONCURRENCY,
+    show_default=True,
+    help="Maximum number of commands executed concurrently with --tag",
+)
 async def exec(
     root: Root,
     job: str,
@@ -419,10 +479,16 @@ async def exec(
     no_key_check: bool,
     cmd: Sequence[str],
     timeout: float,
+    tag: Sequence[str],
+    prefix: bool,
+    concurrency: int,
 ) -> None:
     """
     Execute command in a running job.
 
+    With --tag the command is executed in all own running jobs with the tag,
+    their output is printed followed by exit codes of the command.
+
     Examples:
 
     # Provides a shell to the container:
@@ -430,7 +496,34 @@ async def exec(
 
     # Executes a single command in the container and returns the control:
     neuro exec --no-tty my-job ls -l
+
+    # Executes a command in every job of a sweep:
+    neuro exec --tag sweep-42 -- nvidia-smi
     """
+    if tag:
+        # There is no JOB, the first argument is a part of the command
+        if tty:
+            raise click.UsageError("Option --tty cannot be used with --tag.")
+        real_cmd = _parse_cmd((job,) + tuple(cmd))
+        labels = {}
+        async for record in root.client.jobs.list(
+            statuses={JobStatus.RUNNING},
+            tags=tag,
+            owners={root.client.username},
+            fields=("id", "name"),
+        ):
+            labels[record.id] = record.name or record.id
+        if not labels:
+            raise ValueError("No running jobs with the tag")
+        await process_exec_many(
+            root,
+            list(labels.items()),
+            real_cmd,
+            prefix=prefix,
+            concurrency=concurrency,
+        )
+    if not cmd:
+        raise click.UsageError('Missing argument "CMD...".')
     real_cmd = _parse_cmd(cmd)
     job = await resolve_job(
         job, client=root.client, status={JobStatus.PENDING, JobStatus.RUNNING}
@@ -495,22 +588,77 @@ async def port_forward(
 
 
 @command()
-@argument("job", type=JOB)
-async def logs(root: Root, job: str) -> None:
+@argument("jobs", nargs=-1, required=False, type=JOB)
+@option(
+    "--tag",
+    metavar="TAG",
+    type=str,
+    help="Print logs of own active jobs with the tag (multiple option)",
+    multiple=True,
+)
+@option(
+    "--tail",
+    type=click.IntRange(0),
+    metavar="LINES",
+    help="Start with the last LINES lines of the log.",
+)
+@option(
+    "-o",
+    "--output",
+    type=click.File("wb", lazy=False),
+    metavar="FILE",
+    help="Write the raw log to FILE instead of the standard output.",
+)
+async def logs(
+    root: Root,
+    jobs: Sequence[str],
+    tag: Sequence[str],
+    tail: Optional[int],
+    output: Optional[BinaryIO],
+) -> None:
     """
-    Print the logs for a job.
+    Print the logs for job(s).
+
+    Logs of several jobs are printed line by line, with every line prefixed
+    by the job.
+
+    Examples:
+
+    neuro logs my-job
+    neuro logs --tail 100 my-job
+    neuro logs -o job.log my-job
+    neuro logs job-1 job-2
+    neuro logs --tag sweep-42
     """
-    id = await resolve_job(
-        job,
-        client=root.client,
-        status={
-            JobStatus.PENDING,
-            JobStatus.RUNNING,
-            JobStatus.SUCCEEDED,
-            JobStatus.FAILED,
-        },
-    )
-    await process_logs(root, id, None)
+    if not jobs and not tag:
+        raise click.UsageError('Missing argument "JOBS...".')
+    status = {
+        JobStatus.PENDING,
+        JobStatus.RUNNING,
+        JobStatus.SUCCEEDED,
+        JobStatus.FAILED,
+    }
+    if len(jobs) == 1 and not tag:
+        id = await resolve_job(jobs[0], client=root.client, status=status)
+        await process_logs(root, id, None, tail=tail, output=output)
+        return
+
+    if output is not None:
+        raise click.UsageError("Option --output works with a single job only.")
+    ids = await resolve_jobs(jobs, client=root.client, status=status)
+    labels = dict(zip(ids, jobs))
+    if tag:
+        async for record in root.client.jobs.list(
+            statuses={JobStatus.PENDING, JobStatus.RUNNING},
+            tags=tag,
+            owners={root.client.username},
+            fields=("id", "name"),
+        ):
+            labels.setdefault(record.id, record.name or record.id)
+    if not labels:
+        raise ValueError("No active jobs with the tag")
+    if not await process_logs_many(root, list(labels.items()), tail=tail):
+        sys.exit(1)
 
 
 @command()
@@ -531,10 +679,10 @@ async def attach(root: Root, job: str) -> None:
     )
     status = await root.client.jobs.status(id)
     progress = JobStartProgress.create(tty=root.tty, color=root.color, quiet=root.quiet)
-    while status.status == JobStatus.PENDING:
-        await asyncio.sleep(0.2)
-        status = await root.client.jobs.status(id)
-        progress.step(status)
+    if status.status == JobStatus.PENDING:
+        status = await wait_job(
+            root.client, status, until={JobStatus.RUNNING}, step=progress.step
+        )
     tty = status.container.tty
     _check_tty(root, tty)
 
@@ -610,6 +758,11 @@ async def attach(root: Root, job: str) -> None:
     default=None,
 )
 @option("--full-uri", is_flag=True, help="Output full image URI.")
+@option(
+    "--watch",
+    is_flag=True,
+    help=f"Refresh the list every {WATCH_INTERVAL:g} seconds until interrupted.",
+)
 async def ls(
     root: Root,
     status: Sequence[str],
@@ -623,6 +776,7 @@ async def ls(
     wide: bool,
     format: Optional[List[JobColumnInfo]],
     full_uri: bool,
+    watch: bool,
 ) -> None:
     """
     List all jobs.
@@ -635,25 +789,34 @@ async def ls(
     neuro ps --description="my favourite job"
     neuro ps -s failed -s succeeded -q
     neuro ps -t tag1 -t tag2
+    neuro ps --watch
     """
+    if watch and not root.tty:
+        raise click.UsageError("--watch requires a terminal")
 
     format = await calc_columns(root.client, format)
 
     statuses = calc_statuses(status, all)
     owners = set(owner)
     tags = set(tag)
-    jobs = root.client.jobs.list(
-        statuses=statuses,
-        name=name,
-        owners=owners,
-        tags=tags,
-        since=_parse_date(since),
-        until=_parse_date(until),
-    )
+    since_date = _parse_date(since)
+
+    def list_jobs(
+        statuses: Set[JobStatus] = statuses, since: Optional[datetime] = since_date
+    ) -> AsyncIterator[JobDescription]:
+        jobs = root.client.jobs.list(
+            statuses=statuses,
+            name=name,
+            owners=owners,
+            tags=tags,
+            since=since,
+            until=_parse_date(until),
+        )
 
-    # client-side filtering
-    if description:
-        jobs = (job async for job in jobs if job.description == description)
+        # client-side filtering
+        if description:
+            jobs = (job async for job in jobs if job.description == description)
+        return jobs
 
     uri_fmtr: URIFormatter
     if full_uri:
@@ -674,7 +837,69 @@ async def ls(
             width, root.client.username, format, image_formatter=image_fmtr
         )
 
-    pager_maybe(formatter([job async for job in jobs]), root.tty, root.terminal_size)
+    if not watch:
+        await pager_maybe_stream(list_jobs(), formatter, root.tty, root.terminal_size)
+        return
+
+    printer = JobsWatchPrinter(root.terminal_size[1])
+    async for jobs in _watch_jobs(list_jobs, statuses, since_date):
+        printer(formatter(jobs))
+        await asyncio.sleep(WATCH_INTERVAL)
+
+
+async def _watch_jobs(
+    list_jobs: Callable[..., AsyncIterator[JobDescription]],
+    statuses: Set[JobStatus],
+    since: Optional[datetime],
+) -> AsyncIterator[List[JobDescription]]:
+    # Jobs are listed in full once, later lists are built by merging into the
+    # snapshot of the session jobs created since the newest known one, jobs
+    # which are not finished and jobs finished since the previous list.  The
+    # latter are listed along with created ones, starting from the creation
+    # time of the oldest of them.  Jobs missing in both listings are dropped.
+    unfinished = {JobStatus.PENDING, JobStatus.RUNNING}
+    live = statuses & unfinished if statuses else unfinished
+    if since is not None:
+        since = since.astimezone(timezone.utc)
+    snapshot: Dict[str, JobDescription] = {}
+    newest: Optional[datetime] = None
+    while True:
+        if newest is None:
+            snapshot = {job.id: job async for job in list_jobs()}
+        else:
+            found: Dict[str, JobDescription] = {}
+            if live:
+                found.update({job.id: job async for job in list_jobs(statuses=live)})
+            finished = [
+                job
+                for job in snapshot.values()
+                if job.status in unfinished and job.id not in found
+            ]
+            oldest = min(
+                [newest]
+                + [
+                    job.history.created_at
+                    for job in finished
+                    if job.history.created_at is not None
+                ]
+            )
+            # The margin covers the rounding of creation times
+            start = oldest - timedelta(seconds=1)
+            if since is not None and since > start:
+                start = since
+            found.update({job.id: job async for job in list_jobs(since=start)})
+            for job in finished:
+                if job.id not in found:
+                    del snapshot[job.id]
+            snapshot.update(found)
+        created = [
+            job.history.created_at
+            for job in snapshot.values()
+            if job.history.created_at is not None
+        ]
+        if created:
+            newest = max(created)
+        yield list(snapshot.values())
 
 
 @command()
@@ -728,7 +953,14 @@ async def browse(root: Root, job: str) -> None:
 
 
 @command()
-@argument("job", type=JOB)
+@argument("jobs", nargs=-1, required=False, type=JOB)
+@option(
+    "--tag",
+    metavar="TAG",
+    type=str,
+    help="Display own active jobs with the tag (multiple option)",
+    multiple=True,
+)
 @option(
     "--timeout",
     default=0,
@@ -736,22 +968,138 @@ async def browse(root: Root, job: str) -> None:
     show_default=True,
     help="Maximum allowed time for executing the command, 0 for no timeout",
 )
-async def top(root: Root, job: str, timeout: float) -> None:
+@option(
+    "--record",
+    type=click.File("ab", lazy=False),
+    metavar="FILE",
+    help="Append the telemetry samples to FILE.",
+)
+@option(
+    "--summary",
+    type=click.File("rb"),
+    metavar="FILE",
+    help="Print p50/p95/max of the telemetry recorded to FILE and exit.",
+)
+async def top(
+    root: Root,
+    jobs: Sequence[str],
+    tag: Sequence[str],
+    timeout: float,
+    record: Optional[BinaryIO],
+    summary: Optional[BinaryIO],
+) -> None:
     """
     Display GPU/CPU/Memory usage.
+
+    Telemetry of several jobs is displayed as a table refreshed in place.
+
+    Examples:
+
+    neuro top my-job
+    neuro top --tag sweep-42
+    neuro top --record sweep.top job-1 job-2
+    neuro top --summary sweep.top
     """
+    if summary is not None:
+        if jobs or tag:
+            raise click.UsageError("Option --summary cannot be used with jobs.")
+        recorded = read_telemetry(summary)
+        rows = [
+            (
+                job,
+                len(columns["timestamp"]),
+                {name: percentiles(values) for name, values in columns.items()},
+            )
+            for job, columns in recorded.items()
+        ]
+        for line in TelemetrySummaryFormatter()(rows):
+            click.echo(line)
+        return
+
+    if not jobs and not tag:
+        raise click.UsageError('Missing argument "JOBS...".')
+    active = {JobStatus.PENDING, JobStatus.RUNNING}
+    ids = await resolve_jobs(jobs, client=root.client, status=active)
+    labels = dict(zip(ids, jobs))
+    if tag:
+        async for item in root.client.jobs.list(
+            statuses=active,
+            tags=tag,
+            owners={root.client.username},
+            fields=("id", "name"),
+        ):
+            labels.setdefault(item.id, item.name or item.id)
+    if not labels:
+        raise ValueError("No active jobs with the tag")
+
+    recorder = TelemetryRecorder(record) if record is not None else None
+    try:
+        async with async_timeout.timeout(timeout if timeout else None):
+            if len(labels) == 1 and not tag:
+                await _top_job(root, ids[0], recorder)
+            else:
+                await _top_jobs(root, labels, recorder)
+    finally:
+        if recorder is not None:
+            recorder.flush()
+
+
+async def _top_job(root: Root, id: str, recorder: Optional[TelemetryRecorder]) -> None:
     formatter = JobTelemetryFormatter()
-    id = await resolve_job(
-        job, client=root.client, status={JobStatus.PENDING, JobStatus.RUNNING}
-    )
     print_header = True
-    async with async_timeout.timeout(timeout if timeout else None):
+    async for res in root.client.jobs.top(id):
+        if recorder is not None:
+            recorder.add(id, res)
+        if print_header:
+            click.echo(formatter.header())
+            print_header = False
+        line = formatter(res)
+        click.echo(f"\r{line}", nl=False)
+
+
+async def _top_jobs(
+    root: Root, labels: Dict[str, str], recorder: Optional[TelemetryRecorder]
+) -> None:
+    # Every job's telemetry is read by its own task, the latest samples are
+    # redrawn each TOP_INTERVAL on a terminal and printed as is otherwise.
+    latest: Dict[str, Optional[JobTelemetry]] = dict.fromkeys(labels)
+    formatter = JobTelemetryFormatter()
+
+    async def read(id: str) -> None:
         async for res in root.client.jobs.top(id):
-            if print_header:
-                click.echo(formatter.header())
-                print_header = False
-            line = formatter(res)
-            click.echo(f"\r{line}", nl=False)
+            if recorder is not None:
+                recorder.add(id, res)
+            latest[id] = res
+            if not root.tty:
+                click.echo(f"{labels[id]}\t{formatter(res)}")
+
+    tasks = {id: asyncio.ensure_future(read(id)) for id in labels}
+    try:
+        if root.tty:
+            printer = JobsWatchPrinter(root.terminal_size[1])
+            table_formatter = JobsTelemetryFormatter()
+            while True:
+                printer(table_formatter([(labels[id], latest[id]) for id in labels]))
+                if all(task.done() for task in tasks.values()):
+                    break
+                await asyncio.wait(list(tasks.values()), timeout=TOP_INTERVAL)
+        else:
+            await asyncio.wait(list(tasks.values()))
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    failed = False
+    for id, task in tasks.items():
+        error = None if task.cancelled() else task.exception()
+        if error is not None:
+            failed = True
+            click.secho(
+                f"Cannot get telemetry of job {labels[id]}: {error}", err=True, fg="red"
+            )
+    if failed:
+        sys.exit(1)
 
 
 @command()
@@ -783,24 +1131,59 @@ async def save(root: Root, job: str, image: RemoteImage) -> None:
 
 
 @command()
-@argument("jobs", nargs=-1, required=True, type=JOB)
-async def kill(root: Root, jobs: Sequence[str]) -> None:
+@argument("jobs", nargs=-1, required=False, type=JOB)
+@option(
+    "--tag",
+    metavar="TAG",
+    type=str,
+    help="Kill own active jobs with the tag (multiple option)",
+    multiple=True,
+)
+@option(
+    "--name-prefix",
+    metavar="PREFIX",
+    type=str,
+    help="Kill own active jobs with the name starting with PREFIX",
+)
+async def kill(
+    root: Root, jobs: Sequence[str], tag: Sequence[str], name_prefix: Optional[str]
+) -> None:
     """
     Kill job(s).
+
+    Examples:
+
+    neuro kill job-1 my-job
+    neuro kill --tag sweep-42
+    neuro kill --name-prefix sweep-
     """
-    errors = []
-    for job in jobs:
-        job_resolved = await resolve_job(
-            job, client=root.client, status={JobStatus.PENDING, JobStatus.RUNNING}
-        )
-        try:
-            await root.client.jobs.kill(job_resolved)
+    if not jobs and not tag and name_prefix is None:
+        raise click.UsageError('Missing argument "JOBS...".')
+    active = {JobStatus.PENDING, JobStatus.RUNNING}
+    ids = await resolve_jobs(jobs, client=root.client, status=active)
+    names = dict(zip(ids, jobs))
+    if tag or name_prefix is not None:
+        # Only own jobs are selected, the API filters by name exactly
+        async for record in root.client.jobs.list(
+            statuses=active,
+            tags=tag,
+            owners={root.client.username},
+            fields=("id", "name"),
+        ):
+            if name_prefix is None or (record.name or "").startswith(name_prefix):
+                if record.id not in names:
+                    ids.append(record.id)
+                    names[record.id] = record.id
+
+    errors: List[Tuple[str, Exception]] = []
+    async for job_resolved, error in root.client.jobs.kill_many(ids):
+        if error is None:
             # TODO (ajuszkowski) printing should be on the cli level
             click.echo(job_resolved)
-        except ValueError as e:
-            errors.append((job, e))
-        except AuthorizationError:
-            errors.append((job, ValueError(f"Not enough permissions")))
+        elif isinstance(error, AuthorizationError):
+            errors.append((names[job_resolved], ValueError(f"Not enough permissions")))
+        else:
+            errors.append((names[job_resolved], error))
 
     def format_fail(job: str, reason: Exception) -> str:
         return click.style(f"Cannot kill job {job}: {reason}", fg="red")
@@ -811,8 +1194,52 @@ async def kill(root: Root, jobs: Sequence[str]) -> None:
         sys.exit(1)
 
 
+@command()
+@argument("jobs", nargs=-1, required=True, type=JOB)
+@option(
+    "-s",
+    "--status",
+    multiple=True,
+    type=click.Choice(["pending", "running", "succeeded", "failed"]),
+    help="Wait until jobs reach the status (multiple option), "
+    "succeeded or failed by default.",
+)
+async def wait(root: Root, jobs: Sequence[str], status: Sequence[str]) -> None:
+    """
+    Wait for job(s) to reach the status.
+
+    Prints every status change of the jobs, exits with error code if some of
+    them failed.
+
+    Examples:
+
+    neuro wait job-1 job-2
+    neuro wait --status running my-job
+    """
+    ids = [
+        await resolve_job(job, client=root.client, status=set(JobStatus))
+        for job in jobs
+    ]
+    if status:
+        until = {JobStatus(item) for item in status}
+    else:
+        until = {JobStatus.SUCCEEDED, JobStatus.FAILED}
+    failed = False
+    async for job in root.client.jobs.wait(ids, until=until):
+        if job.status == JobStatus.FAILED:
+            failed = True
+        if root.quiet:
+            continue
+        line = f"{job.id}: {format_job_status(job.status)}"
+        if job.history.reason:
+            line += f" ({job.history.reason})"
+        click.echo(line)
+    if failed:
+        sys.exit(1)
+
+
 @command(context_settings=dict(allow_interspersed_args=False))
-@argument("image", type=ImageType())
+@argument("image", type=ImageType(), required=False)
 @argument("cmd", nargs=-1, type=click.UNPROCESSED)
 @option(
     "-s",
@@ -954,9 +1381,31 @@ async def kill(root: Root, jobs: Sequence[str]) -> None:
     help="Don't attach to job logs and don't wait for exit code",
 )
 @TTY_OPT
+@option(
+    "--from-file",
+    type=click.File(encoding="utf8", lazy=False),
+    metavar="FILE",
+    help=(
+        "Run jobs listed in a YAML file instead of IMAGE, other options are "
+        "shared by all jobs"
+    ),
+)
+@option(
+    "--concurrency",
+    type=click.IntRange(1),
+    default=RUN_CONCURRENCY,
+    show_default=True,
+    help="Maximum number of jobs submitted concurrently with --from-file",
+)
+@option(
+    "--rate",
+    type=float,
+    metavar="JOBS",
+    help="Maximum number of jobs submitted per second with --from-file",
+)
 async def run(
     root: Root,
-    image: RemoteImage,
+    image: Optional[RemoteImage],
     preset: str,
     extshm: bool,
     http: int,
@@ -977,6 +1426,9 @@ async def run(
     browse: bool,
     detach: bool,
     tty: Optional[bool],
+    from_file: Optional[IO[str]],
+    concurrency: int,
+    rate: Optional[float],
 ) -> None:
     """
     Run a job with predefined resources configuration.
@@ -996,7 +1448,25 @@ async def run(
     # Starts a container using the custom image my-ubuntu:latest stored in neuromation
     # registry, run /script.sh and pass arg1 and arg2 as its arguments:
     neuro run -s cpu-small image:my-ubuntu:latest --entrypoint=/script.sh arg1 arg2
+
+    # Submits jobs listed in sweep.yaml, up to 5 jobs per second. Every job
+    # has an image and optional cmd, entrypoint, env and preset, e.g.
+    #   - image: image:my-model:latest
+    #     cmd: python train.py --lr 0.01
+    #     env: {SEED: 1}
+    neuro run --from-file sweep.yaml --rate 5 --volume=ALL
     """
+    if from_file is not None:
+        if image is not None:
+            raise click.UsageError("Cannot use IMAGE together with --from-file")
+        if name:
+            raise click.UsageError("Cannot use --name together with --from-file")
+        if browse:
+            raise click.UsageError("Cannot use --browse together with --from-file")
+        if rate is not None and rate <= 0:
+            raise click.UsageError("--rate should be positive")
+    elif image is None:
+        raise click.UsageError('Missing argument "IMAGE".')
     if not preset:
         preset = next(iter(root.client.config.presets.keys()))
     job_preset = root.client.config.presets[preset]
@@ -1005,6 +1475,30 @@ async def run(
             "-p/-P option is deprecated and ignored. Use corresponding presets instead."
         )
     log.info(f"Using preset '{preset}': {job_preset}")
+    if from_file is not None:
+        # Jobs are not attached to, so they have no TTY by default
+        await run_jobs_from_file(
+            root,
+            from_file,
+            preset=preset,
+            extshm=extshm,
+            http=http,
+            http_auth=http_auth,
+            entrypoint=entrypoint,
+            volume=volume,
+            env=env,
+            env_file=env_file,
+            restart=restart,
+            life_span=life_span,
+            tags=tag,
+            description=description,
+            pass_config=pass_config,
+            tty=bool(tty),
+            concurrency=concurrency,
+            rate=rate,
+        )
+        return
+    assert image is not None
     if tty is None:
         tty = root.tty
     await run_job(
@@ -1047,6 +1541,7 @@ job.add_command(exec)
 job.add_command(port_forward)
 job.add_command(logs)
 job.add_command(kill)
+job.add_command(wait)
 job.add_command(top)
 job.add_command(save)
 job.add_command(browse)
@@ -1109,7 +1604,15 @@ async def run_job(
     job_life_span = await calc_life_span(root.client, life_span)
     log.debug(f"Job run-time limit: {job_life_span}")
 
-    env_dict = build_env(env, env_file)
+    if tpu_type:
+        if not tpu_software_version:
+            raise ValueError(
+                "--tpu-sw-version cannot be empty while --tpu-type specified"
+            )
+
+    env_dict, volumes = await _build_env_volumes(
+        root, volume, env, env_file, pass_config
+    )
     real_cmd = _parse_cmd(cmd)
 
     log.debug(f'entrypoint="{entrypoint}"')
@@ -1117,11 +1620,6 @@ async def run_job(
 
     log.info(f"Using image '{image}'")
 
-    if tpu_type:
-        if not tpu_software_version:
-            raise ValueError(
-                "--tpu-sw-version cannot be empty while --tpu-type specified"
-            )
     resources = Resources(
         memory_mb=memory,
         cpu=cpu,
@@ -1131,21 +1629,6 @@ async def run_job(
         tpu_type=tpu_type,
         tpu_software_version=tpu_software_version,
     )
-    volumes = await _build_volumes(root, volume, env_dict)
-
-    if pass_config:
-        env_name = NEURO_STEAL_CONFIG
-        if env_name in env_dict:
-            raise ValueError(f"{env_name} is already set to {env_dict[env_name]}")
-        env_var, secret_volume = await upload_and_map_config(root)
-        env_dict[NEURO_STEAL_CONFIG] = env_var
-        volumes.add(secret_volume)
-
-    if volumes:
-        log.info(
-            "Using volumes: \n"
-            + "\n".join(f"  {volume_to_verbose_str(v)}" for v in volumes)
-        )
 
     container = Container(
         image=image,
@@ -1169,10 +1652,10 @@ async def run_job(
     )
     progress = JobStartProgress.create(tty=root.tty, color=root.color, quiet=root.quiet)
     progress.begin(job)
-    while wait_start and job.status == JobStatus.PENDING:
-        await asyncio.sleep(0.2)
-        job = await root.client.jobs.status(job.id)
-        progress.step(job)
+    if wait_start and job.status == JobStatus.PENDING:
+        job = await wait_job(
+            root.client, job, until={JobStatus.RUNNING}, step=progress.step
+        )
     progress.end(job)
     # Even if we detached, but the job has failed to start
     # (most common reason - no resources), the command fails
@@ -1188,6 +1671,130 @@ async def run_job(
     return job
 
 
+async def run_jobs_from_file(
+    root: Root,
+    spec: IO[str],
+    *,
+    preset: str,
+    extshm: bool,
+    http: Optional[int],
+    http_auth: Optional[bool],
+    entrypoint: Optional[str],
+    volume: Sequence[str],
+    env: Sequence[str],
+    env_file: Optional[str],
+    restart: str,
+    life_span: Optional[str],
+    tags: Sequence[str],
+    description: Optional[str],
+    pass_config: bool,
+    tty: bool,
+    concurrency: int,
+    rate: Optional[float],
+) -> None:
+    entries = yaml.safe_load(spec)
+    if not isinstance(entries, list) or not entries:
+        raise click.UsageError(f"{spec.name}: a list of jobs is expected")
+    if http_auth is None:
+        http_auth = True
+    elif not http:
+        if http_auth:
+            raise click.UsageError("--http-auth requires --http")
+        else:
+            raise click.UsageError("--no-http-auth requires --http")
+
+    job_restart_policy = JobRestartPolicy(restart)
+    job_life_span = await calc_life_span(root.client, life_span)
+    # Volumes, environment and the uploaded config are shared by all jobs
+    env_dict, volumes = await _build_env_volumes(
+        root, volume, env, env_file, pass_config
+    )
+
+    containers = []
+    preemptible = set()
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or "image" not in entry:
+            raise click.UsageError(f"{spec.name}: job #{i} has no image")
+        unknown = entry.keys() - JOB_SPEC_KEYS
+        if unknown:
+            raise click.UsageError(
+                f"{spec.name}: job #{i} has unknown keys {', '.join(sorted(unknown))}"
+            )
+        try:
+            job_preset = root.client.config.presets[entry.get("preset", preset)]
+        except KeyError:
+            raise click.UsageError(
+                f"{spec.name}: job #{i} has unknown preset {entry['preset']}"
+            )
+        preemptible.add(job_preset.is_preemptible)
+        cmd = entry.get("cmd", [])
+        job_env = entry.get("env", {})
+        if not isinstance(job_env, dict):
+            raise click.UsageError(f"{spec.name}: job #{i} env should be a mapping")
+        container_env = dict(env_dict)
+        container_env.update((str(key), str(value)) for key, value in job_env.items())
+        containers.append(
+            Container(
+                image=root.client.parse.remote_image(entry["image"]),
+                entrypoint=entry.get("entrypoint", entrypoint),
+                command=_parse_cmd([cmd] if isinstance(cmd, str) else cmd),
+                http=HTTPPort(http, http_auth) if http else None,
+                resources=Resources(
+                    memory_mb=job_preset.memory_mb,
+                    cpu=job_preset.cpu,
+                    gpu=job_preset.gpu,
+                    gpu_model=job_preset.gpu_model,
+                    shm=extshm,
+                    tpu_type=job_preset.tpu_type,
+                    tpu_software_version=job_preset.tpu_software_version,
+                ),
+                env=container_env,
+                volumes=list(volumes),
+                tty=tty,
+            )
+        )
+
+    if len(preemptible) > 1:
+        raise click.UsageError(
+            f"{spec.name}: cannot mix preemptible and non-preemptible presets"
+        )
+
+    rows = [
+        [
+            click.style("Image", bold=True),
+            click.style("Id", bold=True),
+            click.style("Status", bold=True),
+        ]
+    ]
+    failed = False
+    async for container, job, error in root.client.jobs.run_many(
+        containers,
+        concurrency=concurrency,
+        rate=rate,
+        tags=tags,
+        description=description,
+        is_preemptible=preemptible.pop(),
+        restart_policy=job_restart_policy,
+        life_span=job_life_span,
+    ):
+        if job is not None:
+            if root.quiet:
+                click.echo(job.id)
+            rows.append([str(container.image), job.id, format_job_status(job.status)])
+        else:
+            failed = True
+            if root.quiet:
+                click.echo(f"Cannot run job: {error}", err=True)
+            rows.append(
+                [str(container.image), "", click.style(f"Error: {error}", fg="red")]
+            )
+    if not root.quiet:
+        for line in table(rows):
+            click.echo(line)
+    if failed:
+        sys.exit(1)
+
+
 def _parse_cmd(cmd: Sequence[str]) -> str:
     if len(cmd) == 1:
         real_cmd = cmd[0]
@@ -1257,6 +1864,32 @@ async def _build_volumes(
     return volumes
 
 
+async def _build_env_volumes(
+    root: Root,
+    volume: Sequence[str],
+    env: Sequence[str],
+    env_file: Optional[str],
+    pass_config: bool,
+) -> Tuple[Dict[str, str], Set[Volume]]:
+    env_dict = build_env(env, env_file)
+    volumes = await _build_volumes(root, volume, env_dict)
+
+    if pass_config:
+        env_name = NEURO_STEAL_CONFIG
+        if env_name in env_dict:
+            raise ValueError(f"{env_name} is already set to {env_dict[env_name]}")
+        env_var, secret_volume = await upload_and_map_config(root)
+        env_dict[NEURO_STEAL_CONFIG] = env_var
+        volumes.add(secret_volume)
+
+    if volumes:
+        log.info(
+            "Using volumes: \n"
+            + "\n".join(f"  {volume_to_verbose_str(v)}" for v in volumes)
+        )
+    return env_dict, volumes
+
+
 async def upload_and_map_config(root: Root) -> Tuple[str, Volume]:
 
     # store the Neuro CLI config on the storage under some random path
@@ -494,6 +494,7 @@ cli.add_command(job.port_forward)
 cli.add_command(job.attach)
 cli.add_command(job.logs)
 cli.add_command(job.kill)
+cli.add_command(job.wait)
 cli.add_command(job.top)
 cli.add_command(job.save)
 cli.add_command(config.login)
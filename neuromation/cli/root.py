@@ -109,6 +109,16 @@ class Root:
         if self._client is not None:
             return self._client
         client = await self.factory.get(timeout=self.timeout)
+        config = await client.config.get_user_config()
+        section = config.get("job")
+        if section is not None and section.get("index-max-age"):
+            client.jobs.enable_index(section["index-max-age"])
+        section = config.get("storage")
+        if section is not None and section.get("metadata-cache-ttl"):
+            client.storage.enable_cache(
+                section["metadata-cache-ttl"],
+                persistent=section.get("metadata-cache-persistent", False),
+            )
 
         self._client = client
         return self._client
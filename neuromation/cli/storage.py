@@ -1,22 +1,24 @@
-import asyncio
 import dataclasses
 import glob as globmodule  # avoid conflict with subcommand "glob"
 import logging
 import sys
-from typing import Any, Callable, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import click
 from yarl import URL
 
 from neuromation.api import (
     Client,
+    FileStatus,
     FileStatusType,
     IllegalArgumentError,
     ResourceNotFound,
 )
 from neuromation.api.file_filter import FileFilter
+from neuromation.api.storage import WORKERS, _prune_hidden
 from neuromation.api.url_utils import _extract_path
 
+from .click_types import MEGABYTE
 from .const import EX_OSFILE
 from .formatters.storage import (
     BaseFilesFormatter,
@@ -34,6 +36,7 @@ from .utils import (
     Option,
     argument,
     command,
+    format_size,
     group,
     option,
     pager_maybe,
@@ -43,6 +46,8 @@ from .utils import (
 
 NEUROIGNORE_FILENAME = ".neuroignore"
 
+OPERATION_ERRORS = (OSError, ResourceNotFound, IllegalArgumentError)
+
 log = logging.getLogger(__name__)
 
 
@@ -68,7 +73,16 @@ def storage() -> None:
     show_default=True,
     help="Expand glob patterns in PATHS",
 )
-async def rm(root: Root, paths: Sequence[str], recursive: bool, glob: bool) -> None:
+@option(
+    "--workers",
+    type=click.IntRange(1),
+    default=WORKERS,
+    show_default=True,
+    help="Maximum number of paths processed concurrently.",
+)
+async def rm(
+    root: Root, paths: Sequence[str], recursive: bool, glob: bool, workers: int
+) -> None:
     """
     Remove files or directories.
 
@@ -80,10 +94,13 @@ async def rm(root: Root, paths: Sequence[str], recursive: bool, glob: bool) -> N
     neuro rm storage:foo/**/*.tmp
     """
     errors = False
-    for uri in await _expand(paths, root, glob):
-        try:
-            await root.client.storage.rm(uri, recursive=recursive)
-        except (OSError, ResourceNotFound, IllegalArgumentError) as error:
+    uris = await _expand(paths, root, glob)
+    async for uri, error in root.client.storage.rm_many(
+        uris, recursive=recursive, workers=workers
+    ):
+        if error is not None:
+            if not isinstance(error, OPERATION_ERRORS):
+                raise error
             log.error(f"cannot remove {uri}: {error}")
             errors = True
         else:
@@ -117,6 +134,9 @@ async def rm(root: Root, paths: Sequence[str], recursive: bool, glob: bool) -> N
     help="with -l print human readable sizes (e.g., 2K, 540M).",
 )
 @option("-l", "format_long", is_flag=True, help="use a long listing format.")
+@option(
+    "-R", "--recursive", is_flag=True, help="list subdirectories recursively.",
+)
 @option(
     "--sort",
     type=click.Choice(["name", "size", "time"]),
@@ -128,6 +148,7 @@ async def ls(
     paths: Sequence[str],
     human_readable: bool,
     format_long: bool,
+    recursive: bool,
     sort: str,
     directory: bool,
     show_all: bool,
@@ -143,9 +164,12 @@ async def ls(
 
     errors = False
     for uri in uris:
+        listings: Optional[Dict[URL, List[FileStatus]]] = None
         try:
             if directory:
                 files = [await root.client.storage.stat(uri)]
+            elif recursive:
+                listings = await fetch_listings(root.client, uri, show_all)
             else:
                 if root.verbosity > 0:
                     painter = get_painter(root.color, quote=True)
@@ -170,6 +194,10 @@ async def ls(
                 else:
                     formatter = SimpleFilesFormatter(root.color)
 
+            if listings is not None:
+                lines = _format_listings(root, uri, listings, formatter, sort)
+                pager_maybe(lines, root.tty, root.terminal_size)
+                continue
             if not show_all:
                 files = [item for item in files if not item.name.startswith(".")]
             pager_maybe(formatter(files), root.tty, root.terminal_size)
@@ -259,6 +287,15 @@ def filter_option(*args: str, flag_value: bool, help: str) -> Callable[[Any], An
     help="Copy only when the SOURCE file is newer than the destination file "
     "or when the destination file is missing.",
 )
+@option(
+    "--checksum",
+    is_flag=True,
+    help=(
+        "Record content hashes of copied files. With --update, skip files "
+        "whose content is unchanged since they were copied with --checksum, "
+        "regardless of their modification times."
+    ),
+)
 @filter_option(
     "--exclude",
     "filters",
@@ -289,6 +326,49 @@ def filter_option(*args: str, flag_value: bool, help: str) -> Callable[[Any], An
         'configuration variable documented in "neuro help user-config"'
     ),
 )
+@option(
+    "--segments",
+    type=click.IntRange(1),
+    default=1,
+    show_default=True,
+    help=(
+        "Download large files in up to the specified number of byte ranges "
+        "concurrently. Used only for downloading."
+    ),
+)
+@option(
+    "--segment-size",
+    type=MEGABYTE,
+    metavar="SIZE",
+    default="64M",
+    show_default=True,
+    help=(
+        "Minimal size of a byte range for segmented download, "
+        "e.g. 16M, 1G. Used only for downloading."
+    ),
+)
+@option(
+    "--part-size",
+    type=MEGABYTE,
+    metavar="SIZE",
+    default=None,
+    help=(
+        "Upload files larger than SIZE in resumable parts of this size, "
+        "e.g. 64M, 1G. An interrupted upload continues from the last uploaded "
+        "part when the command is repeated. Used only for uploading."
+    ),
+)
+@option(
+    "--schedule",
+    type=click.Choice(["size-desc", "fifo", "small-first"]),
+    default="size-desc",
+    show_default=True,
+    help=(
+        "Order of copying files in recursive mode: size-desc starts the largest "
+        "files first, small-first starts the smallest files first, fifo keeps "
+        "the directory order."
+    ),
+)
 @option(
     "-p/-P",
     "--progress/--no-progress",
@@ -305,8 +385,13 @@ async def cp(
     target_directory: Optional[str],
     no_target_directory: bool,
     update: bool,
+    checksum: bool,
     filters: Optional[Tuple[Tuple[bool, str], ...]],
     exclude_from_files: str,
+    segments: int,
+    segment_size: int,
+    part_size: Optional[int],
+    schedule: str,
     progress: bool,
 ) -> None:
     """
@@ -343,6 +428,16 @@ async def cp(
 
     # download only files with extension `.out` into the current directory
     neuro cp storage:results/*.out .
+
+    # download a large file in 8 concurrent byte ranges
+    neuro cp --segments 8 storage:model.ckpt .
+
+    # upload a large file in resumable parts of 256 MiB
+    neuro cp --part-size 256M model.ckpt storage:
+
+    # upload only files with changed content, even if their modification
+    # times were changed by `git checkout`
+    neuro cp -r -u --checksum -T src storage:src
     """
     target_dir: Optional[URL]
     dst: Optional[URL]
@@ -386,6 +481,7 @@ async def cp(
         file_filter.append(exclude, pattern)
 
     show_progress = root.tty and progress
+    upload_part_size = part_size * 2 ** 20 if part_size is not None else None
 
     errors = False
     for src in srcs:
@@ -404,12 +500,20 @@ async def cp(
                         dst,
                         update=update,
                         filter=file_filter.match,
+                        checksum=checksum,
                         ignore_file_names=ignore_file_names,
+                        part_size=upload_part_size,
+                        schedule=schedule,
                         progress=progress_obj,
                     )
                 else:
                     await root.client.storage.upload_file(
-                        src, dst, update=update, progress=progress_obj
+                        src,
+                        dst,
+                        update=update,
+                        checksum=checksum,
+                        part_size=upload_part_size,
+                        progress=progress_obj,
                     )
             elif src.scheme == "storage" and dst.scheme == "file":
                 if recursive and await _is_dir(root, src):
@@ -418,11 +522,21 @@ async def cp(
                         dst,
                         update=update,
                         filter=file_filter.match,
+                        checksum=checksum,
+                        segments=segments,
+                        segment_size=segment_size * 2 ** 20,
+                        schedule=schedule,
                         progress=progress_obj,
                     )
                 else:
                     await root.client.storage.download_file(
-                        src, dst, update=update, progress=progress_obj
+                        src,
+                        dst,
+                        update=update,
+                        checksum=checksum,
+                        segments=segments,
+                        segment_size=segment_size * 2 ** 20,
+                        progress=progress_obj,
                     )
             else:
                 raise RuntimeError(
@@ -448,17 +562,26 @@ async def cp(
     is_flag=True,
     help="No error if existing, make parent directories as needed",
 )
-async def mkdir(root: Root, paths: Sequence[str], parents: bool) -> None:
+@option(
+    "--workers",
+    type=click.IntRange(1),
+    default=WORKERS,
+    show_default=True,
+    help="Maximum number of paths processed concurrently.",
+)
+async def mkdir(root: Root, paths: Sequence[str], parents: bool, workers: int) -> None:
     """
     Make directories.
     """
     uris = [parse_file_resource(path, root) for path in paths]
 
     errors = False
-    for uri in uris:
-        try:
-            await root.client.storage.mkdir(uri, parents=parents, exist_ok=parents)
-        except (OSError, ResourceNotFound, IllegalArgumentError) as error:
+    async for uri, error in root.client.storage.mkdir_many(
+        uris, parents=parents, exist_ok=parents, workers=workers
+    ):
+        if error is not None:
+            if not isinstance(error, OPERATION_ERRORS):
+                raise error
             log.error(f"cannot create directory {uri}: {error}")
             errors = True
         else:
@@ -494,6 +617,13 @@ async def mkdir(root: Root, paths: Sequence[str], parents: bool) -> None:
     is_flag=True,
     help="Treat DESTINATION as a normal file",
 )
+@option(
+    "--workers",
+    type=click.IntRange(1),
+    default=WORKERS,
+    show_default=True,
+    help="Maximum number of paths processed concurrently.",
+)
 async def mv(
     root: Root,
     sources: Sequence[str],
@@ -501,6 +631,7 @@ async def mv(
     glob: bool,
     target_directory: Optional[str],
     no_target_directory: bool,
+    workers: int,
 ) -> None:
     """
     Move or rename files and directories.
@@ -563,24 +694,29 @@ async def mv(
     if no_target_directory and len(srcs) > 1:
         raise click.UsageError(f"Extra operand after {str(srcs[1])!r}")
 
-    errors = False
+    pairs = []
     for src in srcs:
         if target_dir:
             dst = target_dir / src.name
         assert dst
-        try:
-            if root.verbosity > 0:
-                painter = get_painter(root.color, quote=True)
-                src_status = await root.client.storage.stat(src)
-            await root.client.storage.mv(src, dst)
-        except (OSError, ResourceNotFound, IllegalArgumentError) as error:
+        pairs.append((src, dst))
+
+    errors = False
+    async for src, dst, error in root.client.storage.mv_many(pairs, workers=workers):
+        if error is not None:
+            if not isinstance(error, OPERATION_ERRORS):
+                raise error
             log.error(f"cannot move {src} to {dst}: {error}")
             errors = True
-        else:
-            if root.verbosity > 0:
-                csrc = painter.paint(str(src), src_status.type)
-                cdst = painter.paint(str(dst), src_status.type)
-                click.echo(f"{csrc} -> {cdst}")
+        elif root.verbosity > 0:
+            painter = get_painter(root.color, quote=True)
+            try:
+                file_type = (await root.client.storage.stat(dst)).type
+            except OPERATION_ERRORS:
+                file_type = FileStatusType.FILE
+            csrc = painter.paint(str(src), file_type)
+            cdst = painter.paint(str(dst), file_type)
+            click.echo(f"{csrc} -> {cdst}")
 
     if errors:
         sys.exit(EX_OSFILE)
@@ -647,6 +783,87 @@ async def tree(
         sys.exit(EX_OSFILE)
 
 
+@command()
+@argument("paths", nargs=-1)
+@option(
+    "--human-readable",
+    "-h",
+    is_flag=True,
+    help="Print sizes in a human readable format (e.g., 2K, 540M).",
+)
+@option(
+    "-d",
+    "--max-depth",
+    type=int,
+    help="Print the total for a directory only if it is N or fewer levels below "
+    "the command line argument.",
+    metavar="N",
+)
+@option(
+    "-s",
+    "--summarize",
+    is_flag=True,
+    help="Display only a total for each argument, the same as --max-depth=0.",
+)
+@option(
+    "--cache",
+    is_flag=True,
+    help="Reuse totals of subdirectories which were not modified since the "
+    "previous run with --cache.  Changes deeper in the subdirectory which "
+    "don't modify the subdirectory itself are not noticed.",
+)
+async def du(
+    root: Root,
+    paths: Sequence[str],
+    human_readable: bool,
+    max_depth: Optional[int],
+    summarize: bool,
+    cache: bool,
+) -> None:
+    """
+    Summarize disk usage of directories.
+
+    Totals of subdirectories are printed as soon as they are calculated, a
+    directory always goes after its subdirectories.
+
+    By default PATH is equal user's home dir (storage:)
+
+    Examples:
+
+    # print the total size of every directory in the home dir
+    neuro storage du -h
+
+    # print totals of the first level subdirectories only
+    neuro storage du -d 1 storage:datasets
+
+    # fast recalculation for a mostly static dataset
+    neuro storage du -s --cache storage:datasets
+    """
+    if not paths:
+        paths = ["storage:"]
+    if summarize:
+        max_depth = 0
+    uris = [parse_file_resource(path, root) for path in paths]
+
+    errors = False
+    for uri in uris:
+        try:
+            async for usage in root.client.storage.disk_usage(
+                uri, depth=max_depth, cache=cache
+            ):
+                if human_readable:
+                    size = format_size(usage.size).rstrip("B")
+                else:
+                    size = str(usage.size)
+                click.echo(f"{size}\t{usage.uri}")
+        except (OSError, ResourceNotFound, IllegalArgumentError, ValueError) as error:
+            log.error(f"cannot calculate disk usage for {uri}: {error}")
+            errors = True
+
+    if errors:
+        sys.exit(EX_OSFILE)
+
+
 async def _expand(
     paths: Sequence[str], root: Root, glob: bool, allow_file: bool = False
 ) -> List[URL]:
@@ -692,6 +909,7 @@ storage.add_command(rm)
 storage.add_command(mkdir)
 storage.add_command(mv)
 storage.add_command(tree)
+storage.add_command(du)
 
 
 async def calc_filters(
@@ -724,24 +942,54 @@ async def calc_ignore_file_names(
     return ignore_file_names
 
 
-async def fetch_tree(client: Client, uri: URL, show_all: bool) -> Tree:
-    loop = asyncio.get_event_loop()
-    folders = []
-    files = []
-    tasks = []
-    size = 0
-    async for item in client.storage.ls(uri):
+async def fetch_listings(
+    client: Client, uri: URL, show_all: bool
+) -> Dict[URL, List[FileStatus]]:
+    listings: Dict[URL, List[FileStatus]] = {uri: []}
+    prune = None if show_all else _prune_hidden
+    async for parent, item in client.storage.walk(uri, prune=prune):
         if not show_all and item.name.startswith("."):
             continue
+        listings[parent].append(item)
         if item.is_dir():
-            tasks.append(
-                loop.create_task(fetch_tree(client, uri / item.name, show_all))
-            )
-        else:
-            files.append(item)
-            size += item.size
-    for task in tasks:
-        subtree = await task
-        folders.append(subtree)
-        size += subtree.size
-    return Tree(uri.name, size, folders, files)
+            listings[parent / item.name] = []
+    return listings
+
+
+def _format_listings(
+    root: Root,
+    uri: URL,
+    listings: Dict[URL, List[FileStatus]],
+    formatter: BaseFilesFormatter,
+    sort: str,
+) -> Iterator[str]:
+    painter = get_painter(root.color, quote=True)
+    stack = [uri]
+    while stack:
+        dir_uri = stack.pop()
+        files = sorted(listings[dir_uri], key=FilesSorter(sort).key())
+        if dir_uri != uri:
+            yield ""
+        yield painter.paint(str(dir_uri), FileStatusType.DIRECTORY) + ":"
+        yield from formatter(files)
+        stack.extend(dir_uri / item.name for item in reversed(files) if item.is_dir())
+
+
+async def fetch_tree(client: Client, uri: URL, show_all: bool) -> Tree:
+    listings = await fetch_listings(client, uri, show_all)
+
+    def build(dir_uri: URL) -> Tree:
+        folders = []
+        files = []
+        size = 0
+        for item in listings[dir_uri]:
+            if item.is_dir():
+                subtree = build(dir_uri / item.name)
+                folders.append(subtree)
+                size += subtree.size
+            else:
+                files.append(item)
+                size += item.size
+        return Tree(dir_uri.name, size, folders, files)
+
+    return build(uri)
@@ -0,0 +1,125 @@
+# Compact recording of job telemetry for `neuro top --record`
+
+import math
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, NamedTuple, Optional, Sequence
+
+from neuromation.api import JobTelemetry
+
+
+# A chunk is a header, the job id and every column of the chunk's samples as
+# little-endian doubles.  Missing GPU values are stored as NaN.
+MAGIC = b"NTOP"
+HEADER = struct.Struct("<4sHI")
+COLUMNS = ("timestamp", "cpu", "memory", "gpu_duty_cycle", "gpu_memory")
+
+# Samples of a job are written by chunks of so many samples
+RECORD_CHUNK_SIZE = 256
+
+
+class TelemetryFormatError(ValueError):
+    pass
+
+
+class Percentiles(NamedTuple):
+    p50: float
+    p95: float
+    max: float
+
+
+def _new_columns() -> Dict[str, "array[float]"]:
+    return {name: array("d") for name in COLUMNS}
+
+
+class TelemetryRecorder:
+    """Append telemetry samples of jobs to a binary stream by columnar chunks.
+
+    Samples are kept in arrays of doubles, one per column, and are written
+    when RECORD_CHUNK_SIZE samples of a job are collected or on flush().
+    """
+
+    def __init__(
+        self, stream: BinaryIO, *, chunk_size: int = RECORD_CHUNK_SIZE
+    ) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._pending: Dict[str, Dict[str, "array[float]"]] = {}
+
+    def add(self, job: str, sample: JobTelemetry) -> None:
+        columns = self._pending.get(job)
+        if columns is None:
+            columns = self._pending[job] = _new_columns()
+        columns["timestamp"].append(sample.timestamp)
+        columns["cpu"].append(sample.cpu)
+        columns["memory"].append(sample.memory)
+        columns["gpu_duty_cycle"].append(
+            math.nan if sample.gpu_duty_cycle is None else sample.gpu_duty_cycle
+        )
+        columns["gpu_memory"].append(
+            math.nan if sample.gpu_memory is None else sample.gpu_memory
+        )
+        if len(columns["timestamp"]) >= self._chunk_size:
+            self._write_chunk(job, columns)
+            del self._pending[job]
+            self._stream.flush()
+
+    def flush(self) -> None:
+        for job, columns in self._pending.items():
+            self._write_chunk(job, columns)
+        self._pending.clear()
+        self._stream.flush()
+
+    def _write_chunk(self, job: str, columns: Dict[str, "array[float]"]) -> None:
+        job_id = job.encode()
+        self._stream.write(HEADER.pack(MAGIC, len(job_id), len(columns["cpu"])))
+        self._stream.write(job_id)
+        for name in COLUMNS:
+            column = columns[name]
+            if sys.byteorder == "big":
+                column = array("d", column)
+                column.byteswap()
+            self._stream.write(column.tobytes())
+
+
+def read_telemetry(stream: BinaryIO) -> Dict[str, Dict[str, "array[float]"]]:
+    """Read recorded samples, columns of all chunks of a job are joined."""
+    ret: Dict[str, Dict[str, "array[float]"]] = {}
+    while True:
+        header = stream.read(HEADER.size)
+        if not header:
+            return ret
+        if len(header) < HEADER.size:
+            raise TelemetryFormatError("Truncated telemetry record")
+        magic, id_size, count = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise TelemetryFormatError("Not a telemetry record")
+        job_id = stream.read(id_size)
+        data = stream.read(count * 8 * len(COLUMNS))
+        if len(job_id) < id_size or len(data) < count * 8 * len(COLUMNS):
+            raise TelemetryFormatError("Truncated telemetry record")
+        columns = ret.get(job_id.decode())
+        if columns is None:
+            columns = ret[job_id.decode()] = _new_columns()
+        for i, name in enumerate(COLUMNS):
+            column = array("d")
+            column.frombytes(data[i * count * 8 : (i + 1) * count * 8])
+            if sys.byteorder == "big":
+                column.byteswap()
+            columns[name].extend(column)
+
+
+def percentiles(values: Sequence[float]) -> Optional[Percentiles]:
+    """Nearest-rank p50, p95 and maximum of *values*, NaN values are skipped.
+
+    Returns None if there are no values.
+    """
+    ordered = sorted(filter(math.isfinite, values))
+    if not ordered:
+        return None
+
+    def rank(p: int) -> float:
+        return ordered[max(math.ceil(len(ordered) * p / 100) - 1, 0)]
+
+    return Percentiles(rank(50), rank(95), ordered[-1])
@@ -162,6 +162,16 @@ async def user_config() -> None:
 
       See `neuro help ps-format` for information about the value specification.
 
+    **index-max-age**
+
+      Keep an index of jobs in the local configuration database and answer
+      `neuro ps`, job name resolution and shell completion from it.  The index
+      is synchronized incrementally: if it is older than 5 seconds it is
+      refreshed in background after answering, if it is older than the given
+      number of seconds it is refreshed before answering.  Job statuses shown
+      by these commands can be outdated for up to this time.  The index is
+      disabled by default.
+
     **[storage]**
 
       A section for `neuro storage` command group settings.
@@ -193,6 +203,21 @@ async def user_config() -> None:
       every line contains a pattern, exclamation mark `!` is used to negate
       the pattern, empty lines and lines which start with `#` are ignored.
 
+    **metadata-cache-ttl**
+
+      Cache results of listing and getting status of storage files for the
+      given number of seconds.  Repeated requests for the same paths, e.g.
+      by `neuro cp` and shell completion, don't go to the server while the
+      cached result is fresh.  Files created, removed or moved by the client
+      are dropped from the cache immediately.  The cache is disabled by
+      default.
+
+    **metadata-cache-persistent**
+
+      Keep the storage metadata cache in the local configuration database,
+      so that it is shared by consecutive commands.  Has effect only if
+      `metadata-cache-ttl` is set.  Default is `false`.
+
     **life-span**
 
       Default job run-time limit for `neuro run --life-span=XXX` option.
@@ -209,11 +234,13 @@ async def user_config() -> None:
       [job]
       ps-format = "{id;max=30}, {status;max=10}"
       life-span = "1d6h"
+      index-max-age = 60
 
       # storage section
       [storage]
       cp-exclude = ["*.jpg", "!main.jpg"]
       cp-exclude-from-files = [".neuroignore", ".gitignore"]
+      metadata-cache-ttl = 10
     ```
 
     """
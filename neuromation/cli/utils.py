@@ -1,4 +1,5 @@
 import asyncio
+import contextlib
 import functools
 import inspect
 import itertools
@@ -11,6 +12,7 @@ import shutil
 import sys
 from typing import (
     Any,
+    AsyncIterator,
     Awaitable,
     Callable,
     Dict,
@@ -32,8 +34,17 @@ import humanize
 from click.types import convert_type
 from yarl import URL
 
-from neuromation.api import Action, Client, Factory, JobStatus, TagOption, Volume
+from neuromation.api import (
+    Action,
+    Client,
+    Factory,
+    JobDescription,
+    JobStatus,
+    TagOption,
+    Volume,
+)
 from neuromation.api.url_utils import uri_from_cli
+from neuromation.api.utils import _run_ordered
 
 from .root import Root
 from .stats import upload_gmp_stats
@@ -49,6 +60,9 @@ DEPRECATED_INVOKE_NOTICE = "DeprecationWarning: The command {name} is deprecated
 
 NEURO_STEAL_CONFIG = "NEURO_STEAL_CONFIG"
 
+# Number of job names resolved concurrently by resolve_jobs()
+RESOLVE_CONCURRENCY = 10
+
 
 async def _run_async_function(
     init_client: bool,
@@ -407,9 +421,8 @@ def volume_to_verbose_str(volume: Volume) -> str:
 JOB_ID_PATTERN = r"job-[0-9a-z]{8}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{4}-[0-9a-z]{12}"
 
 
-async def resolve_job(
-    id_or_name_or_uri: str, *, client: Client, status: Set[JobStatus]
-) -> str:
+def _parse_job_ref(id_or_name_or_uri: str, *, client: Client) -> Tuple[str, str]:
+    # Return the owner and the job id or name.
     default_user = client.username
     default_cluster = client.cluster_name
     if id_or_name_or_uri.startswith("job:"):
@@ -431,6 +444,13 @@ async def resolve_job(
     else:
         id_or_name = id_or_name_or_uri
         owner = default_user
+    return owner, id_or_name
+
+
+async def resolve_job(
+    id_or_name_or_uri: str, *, client: Client, status: Set[JobStatus]
+) -> str:
+    owner, id_or_name = _parse_job_ref(id_or_name_or_uri, client=client)
 
     # Temporary fast path.
     if re.fullmatch(JOB_ID_PATTERN, id_or_name):
@@ -454,6 +474,80 @@ async def resolve_job(
     return id_or_name
 
 
+async def resolve_jobs(
+    ids_or_names_or_uris: Sequence[str], *, client: Client, status: Set[JobStatus]
+) -> List[str]:
+    """Resolve several jobs like resolve_job().
+
+    Job names are resolved by a single listing of jobs with *status*, names
+    missing in it are resolved one by one, RESOLVE_CONCURRENCY at once.
+    """
+    refs = [_parse_job_ref(item, client=client) for item in ids_or_names_or_uris]
+    names: Dict[Tuple[str, str], str] = {}
+    for ref, item in zip(refs, ids_or_names_or_uris):
+        if not re.fullmatch(JOB_ID_PATTERN, ref[1]):
+            names.setdefault(ref, item)
+    resolved: Dict[Tuple[str, str], str] = {}
+    if names and status:
+        try:
+            async for job in client.jobs.list(
+                statuses=status,
+                owners={owner for owner, name in names},
+                fields=("id", "name", "owner"),
+            ):
+                # Later jobs win, as the newest job is resolved by resolve_job()
+                key = (job.owner, job.name or "")
+                if key in names:
+                    log.debug(f"Job name '{job.name}' resolved to job ID '{job.id}'")
+                    resolved[key] = job.id
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error(f"Failed to resolve job-names to job-IDs: {e}")
+
+    async def resolve(ref: Tuple[str, str]) -> None:
+        resolved[ref] = await resolve_job(names[ref], client=client, status=status)
+
+    missing = [ref for ref in names if ref not in resolved]
+    async for ref, err in _run_ordered(resolve, missing, RESOLVE_CONCURRENCY):
+        if err is not None:
+            raise err
+    return [resolved.get(ref, ref[1]) for ref in refs]
+
+
+async def wait_job(
+    client: Client,
+    job: JobDescription,
+    *,
+    until: Set[JobStatus],
+    step: Callable[[JobDescription], Optional[bool]],
+    interval: float = 0.2,
+) -> JobDescription:
+    """Wait for the job to reach one of *until* statuses.
+
+    *step* is called for every status change and periodically for redrawing
+    a progress, waiting is stopped if it returns False.  Return the last
+    known job description.
+    """
+    changes = client.jobs.wait([job.id], until=until)
+    next_change = asyncio.ensure_future(changes.__anext__())
+    try:
+        while True:
+            done, pending = await asyncio.wait([next_change], timeout=interval)
+            if done:
+                try:
+                    job = next_change.result()
+                except StopAsyncIteration:
+                    return job
+                next_change = asyncio.ensure_future(changes.__anext__())
+            if step(job) is False:
+                return job
+    finally:
+        next_change.cancel()
+        with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+            await next_change
+
+
 SHARE_SCHEMES = ("storage", "image", "job", "blob", "role")
 
 
@@ -580,6 +674,40 @@ def pager_maybe(
         )
 
 
+async def pager_maybe_stream(
+    items: AsyncIterator[_T],
+    formatter: Callable[[Iterable[_T]], Iterable[str]],
+    tty: bool,
+    terminal_size: Tuple[int, int],
+) -> None:
+    """Format and page items while they are still being received.
+
+    The formatter and the pager run in a worker thread and pull items from
+    the event loop one by one, so the output starts immediately and nothing
+    is accumulated in memory.
+    """
+    loop = asyncio.get_event_loop()
+
+    async def next_item() -> _T:
+        return await items.__anext__()
+
+    def iter_items() -> Iterator[_T]:
+        while True:
+            future = asyncio.run_coroutine_threadsafe(next_item(), loop)
+            try:
+                yield future.result()
+            except StopAsyncIteration:
+                return
+
+    await loop.run_in_executor(
+        None, pager_maybe, formatter(iter_items()), tty, terminal_size
+    )
+    # The pager could be closed by user before reading all items
+    aclose = getattr(items, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
 def steal_config_maybe(dst_path: pathlib.Path) -> None:
     if NEURO_STEAL_CONFIG in os.environ:
         src = pathlib.Path(os.environ[NEURO_STEAL_CONFIG])
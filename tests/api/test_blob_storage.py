@@ -3,7 +3,16 @@ import hashlib
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, AsyncIterator, Callable, Dict, List, NoReturn, Set  # noqa: F401
+from typing import (  # noqa: F401
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+)
 from unittest import mock
 
 import pytest
@@ -579,6 +588,40 @@ async def test_blob_storage_fetch_blob(
         assert buf == body
 
 
+async def test_blob_storage_fetch_blob_offset(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    bucket_name = "foo"
+    key = "text.txt"
+    body = b"0123456789"
+
+    async def handler(request: web.Request) -> web.Response:
+        assert request.headers["Range"] == "bytes=4-"
+        return web.Response(status=206, body=body[request.http_range])
+
+    async def handler_no_ranges(request: web.Request) -> web.Response:
+        assert request.headers["Range"] == "bytes=4-"
+        return web.Response(body=body)
+
+    app = web.Application()
+    app.router.add_get(BlobUrlRotes.GET_OBJECT, handler)
+    app.router.add_get("/no-ranges" + BlobUrlRotes.GET_OBJECT, handler_no_ranges)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        buf = b""
+        async for data in client.blob_storage.fetch_blob(bucket_name, key, 4):
+            buf += data
+        assert buf == b"456789"
+
+    async with make_client(srv.make_url("/no-ranges/")) as client:
+        buf = b""
+        async for data in client.blob_storage.fetch_blob(bucket_name, key, 4):
+            buf += data
+        assert buf == b"456789"
+
+
 async def test_blob_storage_put_blob(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -1051,6 +1094,42 @@ async def test_blob_storage_download_large_file(
     progress.complete.assert_called_with(StorageProgressComplete(src, dst, file_size))
 
 
+async def test_blob_storage_download_file_resume_on_retry(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, tmp_path: Path
+) -> None:
+    body = os.urandom(10000)
+    ranges: List[Optional[str]] = []
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        if request.method == "HEAD":
+            return web.Response(headers={"Content-Length": str(len(body))})
+        ranges.append(request.headers.get("Range"))
+        if len(ranges) == 1:
+            # Break the connection in the middle of the body
+            resp = web.StreamResponse()
+            resp.content_length = len(body)
+            await resp.prepare(request)
+            await resp.write(body[:4000])
+            assert request.transport is not None
+            request.transport.close()
+            return resp
+        return web.Response(status=206, body=body[request.http_range])
+
+    app = web.Application()
+    app.router.add_get(BlobUrlRotes.GET_OBJECT, handler)
+
+    srv = await aiohttp_server(app)
+    local_file = tmp_path / "file.bin"
+
+    async with make_client(srv.make_url("/")) as client:
+        await client.blob_storage.download_file(
+            URL("blob:foo/file.bin"), URL(local_file.as_uri())
+        )
+
+    assert local_file.read_bytes() == body
+    assert ranges == [None, "bytes=4000-"]
+
+
 async def test_blob_storage_download_regular_file_to_existing_file(
     blob_storage_server: Any,
     make_client: _MakeClient,
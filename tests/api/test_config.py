@@ -91,6 +91,21 @@ class TestUserConfigValidators:
         ):
             _validate_user_config({"storage": {"cp-exclude": [1, 2]}}, "file.cfg")
 
+    def test_invalid_number_type(self) -> None:
+        with pytest.raises(
+            ConfigError,
+            match=(
+                "file.cfg: invalid type for storage.metadata-cache-ttl, "
+                "Real is expected"
+            ),
+        ):
+            _validate_user_config({"storage": {"metadata-cache-ttl": "10"}}, "file.cfg")
+        with pytest.raises(
+            ConfigError,
+            match="file.cfg: invalid type for job.index-max-age, Real is expected",
+        ):
+            _validate_user_config({"job": {"index-max-age": "60"}}, "file.cfg")
+
 
 async def test_get_user_config_empty(make_client: _MakeClient) -> None:
     async with make_client("https://example.com") as client:
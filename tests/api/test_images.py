@@ -1,6 +1,9 @@
+import hashlib
+import json
 import os
 import sys
-from typing import Any, AsyncIterator, Callable, Dict, Iterator
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Tuple
 
 import asynctest
 import pytest
@@ -1162,3 +1165,199 @@ class TestRegistry:
             )
             with pytest.raises(ValueError, match="missing image name"):
                 await client.images.tags(image)
+
+
+class _RegistryStandIn:
+    # A minimal registry v2 API keeping manifests and blobs in memory
+    def __init__(self) -> None:
+        self.blobs: Dict[str, bytes] = {}
+        self.manifests: Dict[str, Tuple[bytes, str]] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.corrupt = False
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        repo = "/v2/{owner}/{name}"
+        app.router.add_get(repo + "/manifests/{tag}", self.get_manifest)
+        app.router.add_put(repo + "/manifests/{tag}", self.put_manifest)
+        app.router.add_get(repo + "/blobs/{digest}", self.get_blob)
+        app.router.add_post(repo + "/blobs/uploads/", self.start_upload)
+        app.router.add_put(repo + "/blobs/uploads/{upload}", self.finish_upload)
+        return app
+
+    def add_image(self, tag: str, layers: List[bytes]) -> None:
+        descriptors = []
+        for data in [b'{"architecture": "amd64"}'] + layers:
+            digest = "sha256:" + hashlib.sha256(data).hexdigest()
+            self.blobs[digest] = data
+            descriptors.append({"digest": digest, "size": len(data)})
+        manifest = {
+            "schemaVersion": 2,
+            "mediaType": "application/vnd.oci.image.manifest.v1+json",
+            "config": descriptors[0],
+            "layers": descriptors[1:],
+        }
+        self.manifests[tag] = (
+            json.dumps(manifest).encode(),
+            "application/vnd.oci.image.manifest.v1+json",
+        )
+
+    async def get_manifest(self, request: web.Request) -> web.Response:
+        assert request.match_info["owner"] == "user"
+        self.requests.append(("GET", "manifest"))
+        if request.match_info["tag"] not in self.manifests:
+            raise web.HTTPNotFound()
+        raw, media_type = self.manifests[request.match_info["tag"]]
+        return web.Response(body=raw, content_type=media_type)
+
+    async def put_manifest(self, request: web.Request) -> web.Response:
+        raw = await request.read()
+        self.manifests[request.match_info["tag"]] = (raw, request.content_type)
+        return web.Response(status=201)
+
+    async def get_blob(self, request: web.Request) -> web.Response:
+        self.requests.append((request.method, request.match_info["digest"]))
+        data = self.blobs.get(request.match_info["digest"])
+        if data is None:
+            raise web.HTTPNotFound()
+        if self.corrupt:
+            data = data[::-1]
+        return web.Response(body=data)
+
+    async def start_upload(self, request: web.Request) -> web.Response:
+        return web.Response(
+            status=202, headers={"Location": str(request.path) + "upload-1?_state=x"},
+        )
+
+    async def finish_upload(self, request: web.Request) -> web.Response:
+        assert request.query["_state"] == "x"
+        data = await request.read()
+        digest = request.query["digest"]
+        assert "sha256:" + hashlib.sha256(data).hexdigest() == digest
+        self.requests.append(("PUT", digest))
+        self.blobs[digest] = data
+        return web.Response(status=201)
+
+
+class TestRegistryLayout:
+    async def test_pull_layout(
+        self,
+        aiohttp_server: _TestServerFactory,
+        make_client: _MakeClient,
+        tmp_path: Path,
+    ) -> None:
+        registry = _RegistryStandIn()
+        registry.add_image("v1", [b"layer-1", b"layer-2"])
+        srv = await aiohttp_server(registry.make_app())
+
+        layout = tmp_path / "layout"
+        async with make_client(
+            "http://platform", registry_url=srv.make_url("/")
+        ) as client:
+            image = client.parse.remote_image("image:alpine:v1")
+            await client.images.pull_layout(image, layout)
+
+            index = json.loads((layout / "index.json").read_text())
+            [descriptor] = index["manifests"]
+            assert descriptor["annotations"] == {
+                "org.opencontainers.image.ref.name": "v1"
+            }
+            blobs = {
+                "sha256:" + path.name: path.read_bytes()
+                for path in (layout / "blobs" / "sha256").iterdir()
+            }
+            raw, media_type = registry.manifests["v1"]
+            assert blobs.pop(descriptor["digest"]) == raw
+            assert blobs == registry.blobs
+            assert json.loads((layout / "oci-layout").read_text()) == {
+                "imageLayoutVersion": "1.0.0"
+            }
+
+            # Blobs present in the layout are not downloaded again
+            registry.requests.clear()
+            await client.images.pull_layout(image, layout)
+            assert registry.requests == [("GET", "manifest")]
+
+    async def test_layout_repeated_layer(
+        self,
+        aiohttp_server: _TestServerFactory,
+        make_client: _MakeClient,
+        tmp_path: Path,
+    ) -> None:
+        source = _RegistryStandIn()
+        source.add_image("v1", [b"layer-1", b"layer-2", b"layer-1"])
+        srv = await aiohttp_server(source.make_app())
+        layout = tmp_path / "layout"
+        async with make_client(
+            "http://platform", registry_url=srv.make_url("/")
+        ) as client:
+            image = client.parse.remote_image("image:alpine:v1")
+            await client.images.pull_layout(image, layout)
+        # Every blob is downloaded once
+        assert sorted(source.requests) == sorted(
+            [("GET", "manifest")] + [("GET", digest) for digest in source.blobs]
+        )
+
+        registry = _RegistryStandIn()
+        srv = await aiohttp_server(registry.make_app())
+        async with make_client(
+            "http://platform", registry_url=srv.make_url("/")
+        ) as client:
+            image = client.parse.remote_image("image:alpine:v2")
+            await client.images.push_layout(layout, image)
+        # Every blob is uploaded once
+        uploaded = [digest for method, digest in registry.requests if method == "PUT"]
+        assert sorted(uploaded) == sorted(source.blobs)
+        assert registry.manifests["v2"] == source.manifests["v1"]
+
+    async def test_pull_layout_digest_mismatch(
+        self,
+        aiohttp_server: _TestServerFactory,
+        make_client: _MakeClient,
+        tmp_path: Path,
+    ) -> None:
+        registry = _RegistryStandIn()
+        registry.add_image("latest", [b"layer-1"])
+        registry.corrupt = True
+        srv = await aiohttp_server(registry.make_app())
+
+        layout = tmp_path / "layout"
+        async with make_client(
+            "http://platform", registry_url=srv.make_url("/")
+        ) as client:
+            image = client.parse.remote_image("image:alpine")
+            with pytest.raises(ValueError, match="Digest mismatch"):
+                await client.images.pull_layout(image, layout)
+        assert not list((layout / "blobs" / "sha256").iterdir())
+        assert not (layout / "index.json").exists()
+
+    async def test_push_layout(
+        self,
+        aiohttp_server: _TestServerFactory,
+        make_client: _MakeClient,
+        tmp_path: Path,
+    ) -> None:
+        source = _RegistryStandIn()
+        source.add_image("v1", [b"layer-1", b"layer-2"])
+        srv = await aiohttp_server(source.make_app())
+        layout = tmp_path / "layout"
+        async with make_client(
+            "http://platform", registry_url=srv.make_url("/")
+        ) as client:
+            image = client.parse.remote_image("image:alpine:v1")
+            await client.images.pull_layout(image, layout)
+
+        registry = _RegistryStandIn()
+        srv = await aiohttp_server(registry.make_app())
+        async with make_client(
+            "http://platform", registry_url=srv.make_url("/")
+        ) as client:
+            image = client.parse.remote_image("image:alpine:v2")
+            assert await client.images.push_layout(layout, image) == image
+            assert registry.blobs == source.blobs
+            assert registry.manifests["v2"] == source.manifests["v1"]
+
+            # Blobs present in the registry are not uploaded again
+            registry.requests.clear()
+            await client.images.push_layout(layout, image)
+            assert {method for method, digest in registry.requests} == {"HEAD"}
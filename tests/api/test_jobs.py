@@ -1,6 +1,8 @@
 import asyncio
 import json
+import time
 from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
 
 import pytest
 from aiodocker.exceptions import DockerError
@@ -11,7 +13,9 @@ from yarl import URL
 from neuromation.api import (
     Client,
     Container,
+    ExecResult,
     HTTPPort,
+    JobRecord,
     JobRestartPolicy,
     JobStatus,
     JobTelemetry,
@@ -20,7 +24,12 @@ from neuromation.api import (
     Resources,
     Volume,
 )
-from neuromation.api.jobs import INVALID_IMAGE_NAME, _job_description_from_api
+from neuromation.api.jobs import (
+    INVALID_IMAGE_NAME,
+    JOB_FIELDS,
+    _job_description_from_api,
+    _job_record_from_api,
+)
 from tests import _TestServerFactory
 
 
@@ -77,6 +86,69 @@ async def test_jobs_monitor(
     )
 
 
+async def test_jobs_monitor_resume(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    log = b"".join(b"chunk " + str(i).encode("ascii") + b"\n" for i in range(10))
+    ranges = []
+
+    async def log_stream(request: web.Request) -> web.StreamResponse:
+        ranges.append(request.headers.get("Range"))
+        offset = 0
+        resp = web.StreamResponse()
+        if "Range" in request.headers:
+            offset = int(request.headers["Range"][len("bytes=") : -1])
+            resp.set_status(206)
+        resp.enable_chunked_encoding()
+        resp.enable_compression(web.ContentCoding.identity)
+        await resp.prepare(request)
+        await resp.write(log[offset : offset + 30])
+        if len(ranges) < 3:
+            # Drop the connection in the middle of the log
+            assert request.transport is not None
+            request.transport.close()
+            return resp
+        await resp.write(log[offset + 30 :])
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/jobs/job-id/log", log_stream)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        lst = [data async for data in client.jobs.monitor("job-id")]
+
+    assert b"".join(lst) == log
+    assert ranges == [None, "bytes=30-", "bytes=60-"]
+
+
+async def test_jobs_monitor_offset_without_ranges(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    log = b"".join(b"chunk " + str(i).encode("ascii") + b"\n" for i in range(10))
+
+    async def log_stream(request: web.Request) -> web.StreamResponse:
+        # Ranges are not supported, the whole log is sent
+        resp = web.StreamResponse()
+        resp.enable_chunked_encoding()
+        resp.enable_compression(web.ContentCoding.identity)
+        await resp.prepare(request)
+        for i in range(0, len(log), 7):
+            await resp.write(log[i : i + 7])
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/jobs/job-id/log", log_stream)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        lst = [data async for data in client.jobs.monitor("job-id", offset=20)]
+
+    assert b"".join(lst) == log[20:]
+
+
 async def test_monitor_notexistent_job(
     aiohttp_server: Any, make_client: _MakeClient
 ) -> None:
@@ -211,6 +283,39 @@ async def test_kill_ok(
     assert ret is None
 
 
+async def test_kill_many(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    active = 0
+    max_active = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if request.match_info["id"] == "job-missing":
+            raise web.HTTPNotFound()
+        raise web.HTTPNoContent()
+
+    app = web.Application()
+    app.router.add_delete("/jobs/{id}", handler)
+
+    srv = await aiohttp_server(app)
+
+    ids = [f"job-{i}" for i in range(5)] + ["job-missing", "job-5"]
+    async with make_client(srv.make_url("/")) as client:
+        ret = [
+            (id, error) async for id, error in client.jobs.kill_many(ids, concurrency=3)
+        ]
+
+    assert [id for id, error in ret] == ids
+    assert [id for id, error in ret if error is not None] == ["job-missing"]
+    assert isinstance(ret[5][1], ResourceNotFound)
+    assert max_active == 3
+
+
 async def test_save_image_not_in_neuro_registry(make_client: _MakeClient) -> None:
     async with make_client("http://whatever") as client:
         image = RemoteImage.new_external_image(name="ubuntu")
@@ -730,6 +835,64 @@ async def test_job_run(
         assert ret == _job_description_from_api(JSON, client.parse)
 
 
+async def test_job_run_many(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    active = 0
+    max_active = 0
+
+    async def handler(request: web.Request) -> web.Response:
+        nonlocal active, max_active
+        data = await request.json()
+        assert data["tags"] == ["sweep"]
+        command = data["container"]["command"]
+        active += 1
+        max_active = max(max_active, active)
+        # Later jobs are submitted faster
+        await asyncio.sleep(0.01 * (6 - int(command)))
+        active -= 1
+        if command == "3":
+            raise web.HTTPBadRequest(text="Bad job")
+        return web.json_response(create_job_response(f"job-{command}", "pending"))
+
+    app = web.Application()
+    app.router.add_post("/jobs", handler)
+    srv = await aiohttp_server(app)
+
+    containers = [
+        Container(
+            image=RemoteImage("ubuntu"),
+            command=str(i),
+            resources=Resources(16, 0.1, 0, None, False, None, None),
+        )
+        for i in range(6)
+    ]
+    async with make_client(srv.make_url("/")) as client:
+        started = time.monotonic()
+        ret = [
+            (container, job and job.id, error)
+            async for container, job, error in client.jobs.run_many(
+                containers, concurrency=2, rate=100, tags=["sweep"]
+            )
+        ]
+        elapsed = time.monotonic() - started
+
+    assert [container for container, id, error in ret] == containers
+    assert [id for container, id, error in ret] == [
+        "job-0",
+        "job-1",
+        "job-2",
+        None,
+        "job-4",
+        "job-5",
+    ]
+    errors = [error for container, id, error in ret if error is not None]
+    assert [str(error) for error in errors] == ["Bad job"]
+    assert max_active == 2
+    # The token bucket spaces out submits by 1 / rate seconds
+    assert elapsed >= 0.05
+
+
 async def test_job_run_with_name_and_description(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -1478,6 +1641,64 @@ async def test_list_no_filter(
         assert ret == job_descriptions
 
 
+async def test_list_fields(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    jobs = [
+        create_job_response("job-id-1", "pending", name="job-name-1"),
+        create_job_response("job-id-2", "running"),
+    ]
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response({"jobs": jobs})
+
+    app = web.Application()
+    app.router.add_get("/jobs", handler)
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        ret = [
+            job async for job in client.jobs.list(fields=["id", "status", "history"])
+        ]
+        job_descriptions = [
+            _job_description_from_api(job, client.parse) for job in jobs
+        ]
+
+    assert all(isinstance(job, JobRecord) for job in ret)
+    assert [job.id for job in ret] == ["job-id-1", "job-id-2"]
+    assert [job.status for job in ret] == [JobStatus.PENDING, JobStatus.RUNNING]
+    assert [job.history for job in ret] == [job.history for job in job_descriptions]
+    # decoded once
+    assert ret[0].history is ret[0].history
+    with pytest.raises(AttributeError, match="'name' is not fetched"):
+        ret[0].name
+    with pytest.raises(AttributeError, match="read-only"):
+        ret[0].id = "other"
+
+
+async def test_list_fields_unknown(make_client: _MakeClient) -> None:
+    async with make_client("https://example.com") as client:
+        with pytest.raises(ValueError, match="Unknown job fields: unknown"):
+            async for job in client.jobs.list(fields=["id", "unknown"]):
+                pass
+
+
+def test_job_record_all_fields() -> None:
+    parse = mock.Mock()
+    parse.remote_image.return_value = RemoteImage.new_external_image(name="ubuntu")
+    data = create_job_response("job-id-1", "failed", name="job-name-1", tags=["t"])
+    data["http_url"] = "http://job-id-1.jobs.neu.ro"
+    data["max_run_time_minutes"] = 10
+    description = _job_description_from_api(data, parse)
+    parse.reset_mock()
+    record = _job_record_from_api(data, parse, frozenset(JOB_FIELDS))
+    parse.remote_image.assert_not_called()
+    for name in JOB_FIELDS:
+        assert getattr(record, name) == getattr(description, name)
+        assert getattr(record, name) == getattr(description, name)
+    parse.remote_image.assert_called_once_with("submit-image-name")
+
+
 async def test_list_filter_by_name(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -1855,6 +2076,104 @@ async def test_list_filter_by_date_range(
         assert {job.id for job in ret} == {"job-id-1", "job-id-2"}
 
 
+async def test_list_index(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, monkeypatch: Any
+) -> None:
+    jobs = {
+        "job-id-1": create_job_response("job-id-1", "running", name="job-name"),
+        "job-id-2": create_job_response("job-id-2", "failed", tags=["t1", "t2"]),
+        "job-id-3": create_job_response("job-id-3", "pending", name="job-name"),
+    }
+    jobs["job-id-1"]["history"]["created_at"] = "2018-09-25T12:28:21.298672+00:00"
+    jobs["job-id-2"]["history"]["created_at"] = "2018-09-25T12:28:26.698687+00:00"
+    jobs["job-id-3"]["history"]["created_at"] = "2018-09-25T12:28:31.642202+00:00"
+    requests = []
+
+    async def handler(request: web.Request) -> web.Response:
+        requests.append(request.path_qs)
+        statuses = request.query.getall("status", [])
+        since = isoparse(request.query.get("since", "0001-01-01T00:00:00+00:00"))
+        filtered_jobs = [
+            job
+            for job in jobs.values()
+            if (not statuses or job["status"] in statuses)
+            and since <= isoparse(job["history"]["created_at"])
+        ]
+        return web.json_response({"jobs": filtered_jobs})
+
+    async def status_handler(request: web.Request) -> web.Response:
+        requests.append(request.path_qs)
+        return web.json_response(jobs[request.match_info["id"]])
+
+    app = web.Application()
+    app.router.add_get("/jobs", handler)
+    app.router.add_get("/jobs/{id}", status_handler)
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        client.jobs.enable_index()
+
+        ret = [job async for job in client.jobs.list(statuses={JobStatus.RUNNING})]
+        assert [job.id for job in ret] == ["job-id-1"]
+        assert ret[0] == _job_description_from_api(jobs["job-id-1"], client.parse)
+        assert requests == ["/jobs?cluster_name=default"]
+
+        # Answered from the index
+        ret = [job async for job in client.jobs.list(name="job-name", reverse=True)]
+        assert [job.id for job in ret] == ["job-id-3", "job-id-1"]
+        ret = [job async for job in client.jobs.list(tags=["t2"])]
+        assert [job.id for job in ret] == ["job-id-2"]
+        ret = [job async for job in client.jobs.list(limit=2)]
+        assert [job.id for job in ret] == ["job-id-1", "job-id-2"]
+        assert len(requests) == 1
+
+        del requests[:]
+        jobs["job-id-1"]["status"] = "succeeded"
+        jobs["job-id-3"]["status"] = "running"
+        jobs["job-id-4"] = create_job_response("job-id-4", "pending")
+        jobs["job-id-4"]["history"]["created_at"] = "2018-09-25T12:28:40+00:00"
+        await client.jobs.sync_index()
+        # Finished jobs are fetched with created ones
+        assert requests == [
+            "/jobs?status=pending&status=running&cluster_name=default",
+            "/jobs?since=2018-09-25T12:28:20.298672%2B00:00&cluster_name=default",
+        ]
+
+        records = [job async for job in client.jobs.list(fields=["id", "status"])]
+        assert [(job.id, job.status) for job in records] == [
+            ("job-id-1", JobStatus.SUCCEEDED),
+            ("job-id-2", JobStatus.FAILED),
+            ("job-id-3", JobStatus.RUNNING),
+            ("job-id-4", JobStatus.PENDING),
+        ]
+
+        # Refreshed in background after answering
+        del requests[:]
+        monkeypatch.setattr("neuromation.api.jobs.INDEX_REFRESH_AGE", 0)
+        ret = [job async for job in client.jobs.list(name="job-name")]
+        assert [job.id for job in ret] == ["job-id-1", "job-id-3"]
+        task = client.jobs._index_task
+        assert task is not None
+        await task
+        assert len(requests) == 2
+
+        # Deleted jobs are dropped
+        del requests[:]
+        del jobs["job-id-3"]
+        await client.jobs.sync_index()
+        ret = [job async for job in client.jobs.list(name="job-name")]
+        assert [job.id for job in ret] == ["job-id-1"]
+
+        # Closing does not wait for the background refresh
+        del requests[:]
+        ret = [job async for job in client.jobs.list(name="job-name")]
+        task = client.jobs._index_task
+        assert task is not None
+        await client.jobs._close()
+        assert task.cancelled()
+        assert requests == []
+
+
 async def test_job_run_life_span(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -1948,3 +2267,252 @@ async def test_port_forward(
                 writer.write(str(i).encode("ascii"))
                 ret = await reader.read(1024)
                 assert ret == b"rep-" + str(i).encode("ascii")
+
+
+async def test_port_forward_channel_pool(
+    aiohttp_server: _TestServerFactory,
+    make_client: _MakeClient,
+    aiohttp_unused_port: Callable[[], int],
+) -> None:
+    port = aiohttp_unused_port()
+    opened = 0
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        nonlocal opened
+        opened += 1
+        channel = str(opened).encode("ascii")
+        resp = web.WebSocketResponse()
+        await resp.prepare(request)
+        async for msg in resp:
+            await resp.send_bytes(channel + b"-" + msg.data)
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/jobs/job-id/port_forward/12345", handler)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        async with client.jobs.port_forward("job-id", port, 12345, pool_size=2):
+            # Channels are opened before the first connection
+            for i in range(100):
+                if opened == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert opened == 2
+            channels = set()
+            for i in range(3):
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"ping")
+                channel, data = (await reader.read(1024)).split(b"-")
+                assert data == b"ping"
+                channels.add(channel)
+                writer.close()
+            # Every connection gets its own channel
+            assert len(channels) == 3
+
+
+async def test_port_forward_channel_pool_closed_idle(
+    aiohttp_server: _TestServerFactory,
+    make_client: _MakeClient,
+    aiohttp_unused_port: Callable[[], int],
+) -> None:
+    port = aiohttp_unused_port()
+    opened = 0
+
+    async def handler(request: web.Request) -> web.WebSocketResponse:
+        nonlocal opened
+        opened += 1
+        channel = str(opened).encode("ascii")
+        resp = web.WebSocketResponse()
+        await resp.prepare(request)
+        if opened == 1:
+            # The job side of the first channel is dropped while it is idle
+            await resp.close()
+            return resp
+        # The job's server speaks first
+        await resp.send_bytes(b"hello-" + channel)
+        async for msg in resp:
+            await resp.send_bytes(msg.data)
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/jobs/job-id/port_forward/12345", handler)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        with mock.patch("neuromation.api.jobs.PORT_FORWARD_CHANNEL_TTL", 0.2):
+            async with client.jobs.port_forward("job-id", port, 12345, pool_size=1):
+                # The closed channel is replaced
+                for i in range(100):
+                    if opened == 2:
+                        break
+                    await asyncio.sleep(0.01)
+                assert opened == 2
+                await asyncio.sleep(0.05)
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                assert await reader.read(1024) == b"hello-2"
+                writer.write(b"ping")
+                assert await reader.read(1024) == b"ping"
+                writer.close()
+                # An expired channel is replaced too
+                await asyncio.sleep(0.5)
+                assert opened >= 4
+
+
+async def test_exec_many(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    inspected: Dict[str, int] = {}
+
+    async def create(request: web.Request) -> web.Response:
+        payload = await request.json()
+        assert payload["command"] == "df -h"
+        assert not payload["stdin"]
+        return web.json_response({"exec_id": "exec-" + request.match_info["id"]})
+
+    async def start(request: web.Request) -> web.WebSocketResponse:
+        id = request.match_info["id"]
+        if id == "job-3":
+            raise web.HTTPNotFound()
+        resp = web.WebSocketResponse()
+        await resp.prepare(request)
+        await resp.send_bytes(b"\x01out of " + id.encode())
+        await resp.send_bytes(b"\x02err")
+        await resp.send_bytes(b"\x01!")
+        await resp.close()
+        return resp
+
+    async def inspect(request: web.Request) -> web.Response:
+        id = request.match_info["id"]
+        inspected[id] = inspected.get(id, 0) + 1
+        return web.json_response(
+            {
+                "id": request.match_info["exec_id"],
+                # The exit code is known after the second check
+                "running": inspected[id] < 2,
+                "exit_code": 0 if id == "job-1" else 1,
+                "job_id": id,
+                "tty": False,
+                "entrypoint": "",
+                "command": "df -h",
+            }
+        )
+
+    app = web.Application()
+    app.router.add_post("/jobs/{id}/exec_create", create)
+    app.router.add_get("/jobs/{id}/{exec_id}/exec_start", start)
+    app.router.add_get("/jobs/{id}/{exec_id}/exec_inspect", inspect)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        ret = [
+            item
+            async for item in client.jobs.exec_many(
+                ["job-1", "job-2", "job-3"], "df -h", concurrency=2
+            )
+        ]
+
+    assert [id for id, result, error in ret] == ["job-1", "job-2", "job-3"]
+    assert ret[0][1:] == (ExecResult(0, b"out of job-1!", b"err"), None)
+    assert ret[1][1:] == (ExecResult(1, b"out of job-2!", b"err"), None)
+    assert ret[2][1] is None
+    assert ret[2][2] is not None
+
+
+async def test_wait(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    statuses = {
+        "job-id-1": ["pending", "pending", "running", "succeeded"],
+        "job-id-2": ["running", "unknown"],
+    }
+    requests = []
+
+    async def status_handler(request: web.Request) -> web.Response:
+        requests.append(request.path_qs)
+        id = request.match_info["id"]
+        job = create_job_response(id, statuses[id].pop(0))
+        job["history"]["status"] = job["status"]
+        return web.json_response(job)
+
+    app = web.Application()
+    app.router.add_get("/jobs/{id}", status_handler)
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        ret = [
+            (job.id, job.status)
+            async for job in client.jobs.wait(
+                ["job-id-1", "job-id-2"], min_delay=0.01, max_delay=0.02
+            )
+        ]
+    # A job in an unknown status is not waited anymore
+    assert ret == [
+        ("job-id-1", JobStatus.PENDING),
+        ("job-id-2", JobStatus.RUNNING),
+        ("job-id-2", JobStatus.UNKNOWN),
+        ("job-id-1", JobStatus.RUNNING),
+        ("job-id-1", JobStatus.SUCCEEDED),
+    ]
+    assert requests == ["/jobs/job-id-1", "/jobs/job-id-2"] * 2 + ["/jobs/job-id-1"] * 2
+    assert not any(statuses.values())
+
+
+async def test_wait_many(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    jobs = {
+        "job-id-1": create_job_response("job-id-1", "pending"),
+        "job-id-2": create_job_response("job-id-2", "running"),
+        "job-id-3": create_job_response("job-id-3", "running"),
+    }
+    for job in jobs.values():
+        job["history"]["status"] = job["status"]
+    transitions = [
+        {},
+        {"job-id-1": "running"},
+        {},
+        {"job-id-1": "succeeded", "job-id-2": "failed"},
+    ]
+    requests = []
+
+    async def handler(request: web.Request) -> web.Response:
+        requests.append(request.path_qs)
+        for id, status in transitions.pop(0).items():
+            jobs[id]["status"] = jobs[id]["history"]["status"] = status
+        statuses = request.query.getall("status")
+        filtered_jobs = [job for job in jobs.values() if job["status"] in statuses]
+        return web.json_response({"jobs": filtered_jobs})
+
+    async def status_handler(request: web.Request) -> web.Response:
+        requests.append(request.path_qs)
+        return web.json_response(jobs[request.match_info["id"]])
+
+    app = web.Application()
+    app.router.add_get("/jobs", handler)
+    app.router.add_get("/jobs/{id}", status_handler)
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        with mock.patch("neuromation.api.jobs.WAIT_LIST_THRESHOLD", 1):
+            ret = [
+                (job.id, job.status)
+                async for job in client.jobs.wait(
+                    ["job-id-1", "job-id-2"], min_delay=0.01, max_delay=0.02
+                )
+            ]
+    assert ret == [
+        ("job-id-1", JobStatus.PENDING),
+        ("job-id-2", JobStatus.RUNNING),
+        ("job-id-1", JobStatus.RUNNING),
+        ("job-id-1", JobStatus.SUCCEEDED),
+        ("job-id-2", JobStatus.FAILED),
+    ]
+    # Owners of the jobs are known after the first check
+    listing = "/jobs?status=pending&status=running&owner=owner&cluster_name=default"
+    statuses = ["/jobs/job-id-1", "/jobs/job-id-2"]
+    assert requests == statuses + [listing] * 4 + statuses
+    assert not transitions
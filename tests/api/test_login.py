@@ -17,6 +17,7 @@ from aiohttp.web import (
     Response,
     json_response,
 )
+from jose import jwt
 from yarl import URL
 
 from neuromation.api.login import (
@@ -27,6 +28,7 @@ from neuromation.api.login import (
     HeadlessNegotiator,
     _AuthConfig,
     _AuthToken,
+    _get_username,
     create_app_server,
     create_app_server_once,
     create_auth_code_app,
@@ -84,6 +86,23 @@ class TestAuthToken:
         assert token.is_expired(now=2000)
         assert token.refresh_token == "test_refresh_token"
 
+    def test_username_decoded_once(self, token: str) -> None:
+        auth_token = _AuthToken.create_non_expiring(token)
+        with mock.patch(
+            "neuromation.api.login.jwt.get_unverified_claims",
+            wraps=jwt.get_unverified_claims,
+        ) as get_claims:
+            _get_username.cache_clear()
+            for i in range(10):
+                assert auth_token.username == "user"
+            assert _AuthToken.create_non_expiring(token).username == "user"
+        assert get_claims.call_count == 1
+
+    def test_username_invalid(self) -> None:
+        auth_token = _AuthToken.create_non_expiring("invalid")
+        with pytest.raises(ValueError, match="does not contain valid JWT"):
+            auth_token.username
+
 
 class TestAuthCodeApp:
     @pytest.fixture
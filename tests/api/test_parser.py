@@ -37,6 +37,14 @@ async def test_parse_remote(make_client: _MakeClient) -> None:
     )
 
 
+async def test_image_parser_reused(make_client: _MakeClient) -> None:
+    async with make_client("https://api.localhost.localdomain") as client:
+        parser = client.parse._image_parser()
+        client.parse.local_image("bananas:latest")
+        client.parse.remote_image("image://test-cluster/bob/bananas:latest")
+        assert client.parse._image_parser() is parser
+
+
 async def test_parse_remote_registry_image(make_client: _MakeClient) -> None:
     async with make_client(
         "https://api.localhost.localdomain", registry_url="http://localhost:5000"
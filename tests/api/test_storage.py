@@ -1,11 +1,13 @@
 import asyncio
+import dataclasses
 import errno
+import hashlib
 import json
 import os
 from filecmp import dircmp
 from pathlib import Path
-from shutil import copytree
-from typing import Any, AsyncIterator, Callable, List, Tuple
+from shutil import copytree, rmtree
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from unittest import mock
 
 import pytest
@@ -15,10 +17,12 @@ from yarl import URL
 import neuromation.api.storage
 from neuromation.api import (
     Action,
+    AuthorizationError,
     Client,
     FileStatus,
     FileStatusType,
     IllegalArgumentError,
+    ResourceNotFound,
     StorageProgressComplete,
     StorageProgressStart,
     StorageProgressStep,
@@ -53,9 +57,22 @@ def storage_path(tmp_path: Path) -> Path:
     return ret
 
 
+@pytest.fixture
+def storage_uploads() -> Dict[str, Dict[str, Any]]:
+    return {}
+
+
+@pytest.fixture
+def storage_requests() -> List[Tuple[str, str]]:
+    return []
+
+
 @pytest.fixture
 async def storage_server(
-    aiohttp_raw_server: _RawTestServerFactory, storage_path: Path
+    aiohttp_raw_server: _RawTestServerFactory,
+    storage_path: Path,
+    storage_uploads: Dict[str, Dict[str, Any]],
+    storage_requests: List[Tuple[str, str]],
 ) -> Any:
     PREFIX = "/storage/user"
     PREFIX_LEN = len(PREFIX)
@@ -63,6 +80,7 @@ async def storage_server(
     async def handler(request: web.Request) -> web.StreamResponse:
         assert "b3" in request.headers
         op = request.query["op"]
+        storage_requests.append((op, request.path))
         path = request.path
         assert path.startswith(PREFIX)
         path = path[PREFIX_LEN:]
@@ -73,8 +91,37 @@ async def storage_server(
             content = await request.read()
             local_path.write_bytes(content)
             return web.Response(status=201)
+        elif op == "INIT_UPLOAD":
+            upload_id = f"upload-{len(storage_uploads)}"
+            storage_uploads[upload_id] = {
+                "path": local_path,
+                "size": int(request.query["size"]),
+                "part_size": int(request.query["part_size"]),
+                "parts": {},
+            }
+            return web.json_response({"upload_id": upload_id})
+        elif op == "UPLOAD_PART":
+            upload_id = request.query["upload_id"]
+            content = await request.read()
+            if upload_id not in storage_uploads:
+                raise web.HTTPNotFound()
+            upload = storage_uploads[upload_id]
+            upload["parts"][int(request.query["part"])] = content
+            return web.Response(status=201)
+        elif op == "COMPLETE_UPLOAD":
+            upload = storage_uploads.pop(request.query["upload_id"])
+            parts = upload["parts"]
+            content = b"".join(parts[i] for i in sorted(parts))
+            assert sorted(parts) == list(range(len(parts)))
+            assert len(content) == upload["size"]
+            upload["path"].write_bytes(content)
+            return web.Response(status=201)
         elif op == "OPEN":
-            return web.Response(body=local_path.read_bytes())
+            data = local_path.read_bytes()
+            if "Range" in request.headers:
+                rng = request.http_range
+                return web.Response(status=206, body=data[rng])
+            return web.Response(body=data)
         elif op == "GETFILESTATUS":
             if not local_path.exists():
                 raise web.HTTPNotFound()
@@ -115,6 +162,19 @@ async def storage_server(
                     }
                 )
             return await make_listiter_response(request, ret)
+        elif op == "DELETE":
+            if not local_path.exists():
+                raise web.HTTPNotFound()
+            if local_path.is_dir():
+                rmtree(local_path)
+            else:
+                local_path.unlink()
+            return web.Response(status=204)
+        elif op == "RENAME":
+            destination = request.query["destination"]
+            assert destination.startswith("/user/")
+            local_path.rename(storage_path / destination[len("/user/") :])
+            return web.Response(status=204)
         else:
             raise web.HTTPInternalServerError(text=f"Unsupported operation {op}")
 
@@ -396,6 +456,211 @@ async def test_storage_glob(
         assert await glob("storage:**/b*/") == [URL("storage:folder/bar/")]
 
 
+async def test_storage_glob_recursive_basename(
+    storage_server: Any,
+    make_client: _MakeClient,
+    storage_path: Path,
+    storage_requests: List[Tuple[str, str]],
+) -> None:
+    for i in range(5):
+        (storage_path / "folder" / f"d{i}" / "sub").mkdir(parents=True)
+        (storage_path / "folder" / f"d{i}" / "sub" / "data.json").write_bytes(b"{}")
+        (storage_path / "folder" / f"d{i}" / "data.txt").write_bytes(b"")
+    (storage_path / "folder" / ".hidden").mkdir()
+    (storage_path / "folder" / ".hidden" / "data.json").write_bytes(b"{}")
+    (storage_path / "folder" / "data.json").write_bytes(b"{}")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        ret = [
+            uri async for uri in client.storage.glob(URL("storage:folder/**/*.json"))
+        ]
+    assert sorted(ret) == [
+        URL("storage:folder/d0/sub/data.json"),
+        URL("storage:folder/d1/sub/data.json"),
+        URL("storage:folder/d2/sub/data.json"),
+        URL("storage:folder/d3/sub/data.json"),
+        URL("storage:folder/d4/sub/data.json"),
+        URL("storage:folder/data.json"),
+    ]
+    # Every directory is listed once by the walk, hidden ones are skipped
+    listed = [path for op, path in storage_requests if op == "LISTSTATUS"]
+    assert len(listed) == 11
+    assert len(set(listed)) == 11
+
+
+async def test_storage_walk(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "folder" / "a" / "aa").mkdir(parents=True)
+    (storage_path / "folder" / "a" / "aa" / "file.txt").write_bytes(b"data")
+    (storage_path / "folder" / "b").mkdir()
+    (storage_path / "folder" / "b" / "file.txt").write_bytes(b"data")
+    (storage_path / "folder" / "file.txt").write_bytes(b"data")
+
+    async with make_client(storage_server.make_url("/")) as client:
+
+        async def walk(**kwargs: Any) -> List[str]:
+            return [
+                str(parent / stat.name)[len("storage:folder") :]
+                async for parent, stat in client.storage.walk(
+                    URL("storage:folder"), **kwargs
+                )
+            ]
+
+        entries = await walk(walkers=1)
+        # Breadth-first, every directory is listed after its parent level
+        assert sorted(entries[:3]) == ["/a", "/b", "/file.txt"]
+        assert sorted(entries[3:5]) == ["/a/aa", "/b/file.txt"]
+        assert entries[5:] == ["/a/aa/file.txt"]
+        assert sorted(await walk()) == sorted(entries)
+
+        assert sorted(await walk(max_depth=1)) == ["/a", "/b", "/file.txt"]
+        assert sorted(await walk(max_depth=2)) == [
+            "/a",
+            "/a/aa",
+            "/b",
+            "/b/file.txt",
+            "/file.txt",
+        ]
+
+        async def prune(uri: URL, stat: FileStatus) -> bool:
+            return stat.name == "a"
+
+        assert sorted(await walk(prune=prune)) == [
+            "/a",
+            "/b",
+            "/b/file.txt",
+            "/file.txt",
+        ]
+
+        with pytest.raises(ValueError, match="Invalid number of walkers"):
+            await walk(walkers=0)
+        with pytest.raises(ValueError, match="Invalid max depth"):
+            await walk(max_depth=0)
+
+
+async def test_storage_walk_concurrent(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    active = 0
+    max_active = 0
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        depth = request.path.count("/") - 2
+        if depth > 3:
+            return await make_listiter_response(request, [])
+        return await make_listiter_response(
+            request,
+            [
+                {
+                    "path": f"dir{i}",
+                    "length": 0,
+                    "type": "DIRECTORY",
+                    "modificationTime": 0,
+                    "permission": "read",
+                }
+                for i in range(5)
+            ],
+        )
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        entries = [
+            x async for x in client.storage.walk(URL("storage:folder"), walkers=4)
+        ]
+
+    assert len(entries) == 5 + 5 ** 2 + 5 ** 3
+    assert 1 < max_active <= 4
+
+
+async def test_storage_disk_usage(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "folder" / "a" / "aa").mkdir(parents=True)
+    (storage_path / "folder" / "a" / "aa" / "file.txt").write_bytes(b"x" * 100)
+    (storage_path / "folder" / "a" / "file.txt").write_bytes(b"x" * 10)
+    (storage_path / "folder" / "b").mkdir()
+    (storage_path / "folder" / "file.txt").write_bytes(b"x")
+
+    async with make_client(storage_server.make_url("/")) as client:
+
+        async def du(**kwargs: Any) -> List[Tuple[str, int, int]]:
+            return [
+                (str(usage.uri), usage.size, usage.files)
+                async for usage in client.storage.disk_usage(
+                    URL("storage:folder"), **kwargs
+                )
+            ]
+
+        usages = await du()
+        # Subdirectories go before their parents
+        assert usages.index(("storage:folder/a/aa", 100, 1)) < usages.index(
+            ("storage:folder/a", 110, 2)
+        )
+        assert sorted(usages[:3]) == [
+            ("storage:folder/a", 110, 2),
+            ("storage:folder/a/aa", 100, 1),
+            ("storage:folder/b", 0, 0),
+        ]
+        assert usages[3:] == [("storage:folder", 111, 3)]
+
+        assert sorted(await du(depth=1)) == [
+            ("storage:folder", 111, 3),
+            ("storage:folder/a", 110, 2),
+            ("storage:folder/b", 0, 0),
+        ]
+        assert await du(depth=0) == [("storage:folder", 111, 3)]
+
+        with pytest.raises(ValueError, match="Invalid depth"):
+            await du(depth=-1)
+
+
+async def test_storage_disk_usage_cache(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "folder" / "a" / "aa").mkdir(parents=True)
+    (storage_path / "folder" / "a" / "aa" / "file.txt").write_bytes(b"x" * 100)
+    (storage_path / "folder" / "file.txt").write_bytes(b"x")
+
+    async with make_client(storage_server.make_url("/")) as client:
+
+        async def du() -> List[Tuple[str, int, int]]:
+            return [
+                (str(usage.uri), usage.size, usage.files)
+                async for usage in client.storage.disk_usage(
+                    URL("storage:folder"), cache=True
+                )
+            ]
+
+        assert await du() == [
+            ("storage:folder/a/aa", 100, 1),
+            ("storage:folder/a", 100, 1),
+            ("storage:folder", 101, 2),
+        ]
+
+        # The subtotal of unmodified directory "a" is reused,
+        # the top directory is listed every time
+        (storage_path / "folder" / "a" / "aa" / "file.txt").write_bytes(b"x" * 200)
+        (storage_path / "folder" / "file.txt").write_bytes(b"xx")
+        assert await du() == [("storage:folder/a", 100, 1), ("storage:folder", 102, 2)]
+
+        os.utime(storage_path / "folder" / "a", (0, 0))
+        os.utime(storage_path / "folder" / "a" / "aa", (0, 0))
+        assert await du() == [
+            ("storage:folder/a/aa", 200, 1),
+            ("storage:folder/a", 200, 1),
+            ("storage:folder", 202, 2),
+        ]
+
+
 async def test_storage_rm_file(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -481,6 +746,98 @@ async def test_storage_rm_recursive(
         await client.storage.rm(URL("storage:folder"), recursive=True)
 
 
+async def test_storage_rm_many(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    for i in range(10):
+        (storage_path / f"file{i}.txt").write_bytes(b"data")
+    (storage_path / "folder").mkdir()
+
+    uris = [URL(f"storage:file{i}.txt") for i in range(10)]
+    uris.insert(5, URL("storage:missing.txt"))
+    uris.append(URL("storage:folder"))
+    async with make_client(storage_server.make_url("/")) as client:
+        results = [x async for x in client.storage.rm_many(uris, workers=3)]
+
+    assert [uri for uri, error in results] == uris
+    errors = {str(uri): type(error) for uri, error in results if error is not None}
+    assert errors == {
+        "storage:missing.txt": ResourceNotFound,
+        "storage:folder": IsADirectoryError,
+    }
+    assert [p.name for p in storage_path.iterdir()] == ["folder"]
+
+
+async def test_storage_mkdir_many(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    uris = [
+        URL("storage:a"),
+        URL("storage:a/b"),
+        URL("storage:a/b/c"),
+        URL("storage:d"),
+        URL("storage:x/y"),
+    ]
+    async with make_client(storage_server.make_url("/")) as client:
+        results = [x async for x in client.storage.mkdir_many(uris)]
+
+    assert [uri for uri, error in results] == uris
+    errors = {str(uri): type(error) for uri, error in results if error is not None}
+    assert errors == {"storage:x/y": FileNotFoundError}
+    assert (storage_path / "a" / "b" / "c").is_dir()
+    assert (storage_path / "d").is_dir()
+    assert not (storage_path / "x").exists()
+
+
+async def test_storage_mv_many(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    for i in range(5):
+        (storage_path / f"file{i}.txt").write_bytes(b"data")
+    (storage_path / "folder").mkdir()
+
+    pairs = [
+        (URL(f"storage:file{i}.txt"), URL(f"storage:folder/file{i}.txt"))
+        for i in range(5)
+    ]
+    async with make_client(storage_server.make_url("/")) as client:
+        results = [x async for x in client.storage.mv_many(pairs, workers=2)]
+
+    assert results == [(src, dst, None) for src, dst in pairs]
+    assert sorted(p.name for p in (storage_path / "folder").iterdir()) == [
+        f"file{i}.txt" for i in range(5)
+    ]
+
+
+async def test_run_ordered() -> None:
+    active = 0
+    max_active = 0
+
+    async def func(item: int) -> None:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        # Later items are finished first
+        await asyncio.sleep(0.01 * (10 - item))
+        active -= 1
+        if item % 3 == 0:
+            raise ValueError(item)
+
+    results = [
+        (item, error)
+        async for item, error in neuromation.api.storage._run_ordered(
+            func, range(10), 4
+        )
+    ]
+    assert [item for item, error in results] == list(range(10))
+    assert [item for item, error in results if error is not None] == [0, 3, 6, 9]
+    assert max_active == 4
+
+    with pytest.raises(ValueError, match="Invalid number of workers"):
+        async for x in neuromation.api.storage._run_ordered(func, range(10), 0):
+            pass
+
+
 async def test_storage_mv(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -669,6 +1026,101 @@ async def test_storage_stats(
         )
 
 
+async def test_storage_cache(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "folder").mkdir()
+    (storage_path / "folder" / "file.txt").write_bytes(b"data")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        client.storage.enable_cache()
+        stat = await client.storage.stat(URL("storage:folder/file.txt"))
+        assert stat.size == 4
+        names = [s.name async for s in client.storage.ls(URL("storage:folder"))]
+        assert names == ["file.txt"]
+        with pytest.raises(ResourceNotFound):
+            await client.storage.stat(URL("storage:folder/new.txt"))
+
+        # Changes made by other clients are not visible until expiration
+        (storage_path / "folder" / "file.txt").write_bytes(b"other data")
+        (storage_path / "folder" / "new.txt").write_bytes(b"new")
+        stat = await client.storage.stat(URL("storage:folder/file.txt"))
+        assert stat.size == 4
+        names = [s.name async for s in client.storage.ls(URL("storage:folder"))]
+        assert names == ["file.txt"]
+        with pytest.raises(ResourceNotFound):
+            await client.storage.stat(URL("storage:folder/new.txt"))
+
+        async def gen() -> AsyncIterator[bytes]:
+            yield b"created"
+
+        # Own modifications invalidate the path and its parents
+        await client.storage.create(URL("storage:folder/new.txt"), gen())
+        names = [s.name async for s in client.storage.ls(URL("storage:folder"))]
+        assert sorted(names) == ["file.txt", "new.txt"]
+        stat = await client.storage.stat(URL("storage:folder/new.txt"))
+        assert stat.size == 7
+        stat = await client.storage.stat(URL("storage:folder/file.txt"))
+        assert stat.size == 4
+
+        await client.storage.mv(
+            URL("storage:folder/file.txt"), URL("storage:folder/moved.txt")
+        )
+        names = [s.name async for s in client.storage.ls(URL("storage:folder"))]
+        assert sorted(names) == ["moved.txt", "new.txt"]
+        with pytest.raises(ResourceNotFound):
+            await client.storage.stat(URL("storage:folder/file.txt"))
+        stat = await client.storage.stat(URL("storage:folder/moved.txt"))
+        assert stat.size == 10
+
+        client.storage.disable_cache()
+        (storage_path / "folder" / "moved.txt").write_bytes(b"")
+        stat = await client.storage.stat(URL("storage:folder/moved.txt"))
+        assert stat.size == 0
+
+
+async def test_storage_cache_expired(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "file.txt").write_bytes(b"data")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        client.storage.enable_cache(0.1)
+        assert (await client.storage.stat(URL("storage:file.txt"))).size == 4
+        (storage_path / "file.txt").write_bytes(b"other data")
+        assert (await client.storage.stat(URL("storage:file.txt"))).size == 4
+        await asyncio.sleep(0.2)
+        assert (await client.storage.stat(URL("storage:file.txt"))).size == 10
+
+
+async def test_storage_cache_persistent(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "folder").mkdir()
+    (storage_path / "folder" / "file.txt").write_bytes(b"data")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        client.storage.enable_cache(persistent=True)
+        assert (await client.storage.stat(URL("storage:folder/file.txt"))).size == 4
+        names = [s.name async for s in client.storage.ls(URL("storage:folder"))]
+        assert names == ["file.txt"]
+
+    (storage_path / "folder" / "file.txt").write_bytes(b"other data")
+    (storage_path / "folder" / "new.txt").write_bytes(b"new")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        client.storage.enable_cache(persistent=True)
+        assert (await client.storage.stat(URL("storage:folder/file.txt"))).size == 4
+        names = [s.name async for s in client.storage.ls(URL("storage:folder"))]
+        assert names == ["file.txt"]
+        await client.storage.rm(URL("storage:folder"), recursive=True)
+
+    async with make_client(storage_server.make_url("/")) as client:
+        client.storage.enable_cache(persistent=True)
+        with pytest.raises(ResourceNotFound):
+            await client.storage.stat(URL("storage:folder/file.txt"))
+
+
 async def test_storage_open(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -738,6 +1190,47 @@ async def test_storage_open_directory(
         assert not buf
 
 
+async def test_storage_open_range(
+    storage_server: Any, make_client: _MakeClient, storage_path: Path
+) -> None:
+    (storage_path / "file.txt").write_bytes(b"0123456789")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        buf = bytearray()
+        async for chunk in client.storage.open(URL("storage:file.txt"), 3, 4):
+            buf.extend(chunk)
+        assert buf == b"3456"
+
+        buf = bytearray()
+        async for chunk in client.storage.open(URL("storage:file.txt"), 7):
+            buf.extend(chunk)
+        assert buf == b"789"
+
+
+async def test_storage_open_range_not_supported(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    async def handler(request: web.Request) -> web.StreamResponse:
+        assert request.query["op"] == "OPEN"
+        assert request.headers["Range"] == "bytes=3-6"
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        for i in range(10):
+            await resp.write(str(i).encode("ascii"))
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/storage/user/file", handler)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        buf = bytearray()
+        async for chunk in client.storage.open(URL("storage:file"), 3, 4):
+            buf.extend(chunk)
+        assert buf == b"3456"
+
+
 # test normalizers
 
 
@@ -881,6 +1374,132 @@ async def test_storage_upload_regular_file_to_not_existing(
             )
 
 
+async def test_storage_upload_file_parts(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    storage_uploads: Dict[str, Dict[str, Any]],
+) -> None:
+    content = os.urandom(10000)
+    local_file = tmp_path / "file.bin"
+    local_file.write_bytes(content)
+    progress = mock.Mock()
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_file(
+            URL(local_file.as_uri()),
+            URL("storage:file.bin"),
+            part_size=3000,
+            progress=progress,
+        )
+        with client.config._open_db() as db:
+            assert neuromation.api.storage._load_upload_journal(
+                db,
+                local_file,
+                URL("storage://default/user/file.bin"),
+                local_file.stat(),
+                3000,
+            ) == (None, set())
+
+    assert (storage_path / "file.bin").read_bytes() == content
+    assert not storage_uploads
+    src = URL(local_file.as_uri())
+    dst = URL("storage://default/user/file.bin")
+    progress.start.assert_called_with(StorageProgressStart(src, dst, 10000))
+    progress.step.assert_called_with(StorageProgressStep(src, dst, 10000, 10000))
+    progress.complete.assert_called_with(StorageProgressComplete(src, dst, 10000))
+
+
+async def test_storage_upload_file_parts_small_file(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    storage_uploads: Dict[str, Dict[str, Any]],
+) -> None:
+    local_file = tmp_path / "file.bin"
+    local_file.write_bytes(b"data")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_file(
+            URL(local_file.as_uri()), URL("storage:file.bin"), part_size=3000,
+        )
+
+    assert (storage_path / "file.bin").read_bytes() == b"data"
+
+
+async def test_storage_upload_file_parts_resume(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    storage_uploads: Dict[str, Dict[str, Any]],
+) -> None:
+    content = os.urandom(10000)
+    local_file = tmp_path / "file.bin"
+    local_file.write_bytes(content)
+    dst = URL("storage://default/user/file.bin")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        # Emulate an upload interrupted after two parts
+        upload_id = await client.storage._init_upload(dst, 10000, 3000)
+        storage_uploads[upload_id]["parts"] = {0: content[:3000], 1: content[3000:6000]}
+        # Make sure the uploaded parts are not sent again
+        local_file.write_bytes(b"x" * 6000 + content[6000:])
+        with client.config._open_db() as db:
+            neuromation.api.storage._save_upload_journal(
+                db, local_file, dst, local_file.stat(), 3000, upload_id, {0, 1}
+            )
+
+        await client.storage.upload_file(
+            URL(local_file.as_uri()), URL("storage:file.bin"), part_size=3000,
+        )
+
+    assert (storage_path / "file.bin").read_bytes() == content
+
+
+async def test_storage_upload_file_parts_expired(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    storage_uploads: Dict[str, Dict[str, Any]],
+) -> None:
+    content = os.urandom(10000)
+    local_file = tmp_path / "file.bin"
+    local_file.write_bytes(content)
+    dst = URL("storage://default/user/file.bin")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        with client.config._open_db() as db:
+            neuromation.api.storage._save_upload_journal(
+                db, local_file, dst, local_file.stat(), 3000, "unknown", {0}
+            )
+
+        await client.storage.upload_file(
+            URL(local_file.as_uri()), URL("storage:file.bin"), part_size=3000,
+        )
+
+    assert (storage_path / "file.bin").read_bytes() == content
+
+
+async def test_storage_upload_dir_parts(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path,
+) -> None:
+    local_dir = tmp_path / "folder"
+    copytree(DATA_FOLDER / "nested", local_dir)
+    (local_dir / "large.bin").write_bytes(os.urandom(10000))
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_dir(
+            URL(local_dir.as_uri()), URL("storage:folder"), part_size=3000,
+        )
+
+    diff = dircmp(local_dir, storage_path / "folder")
+    assert not calc_diff(diff)
+
+
 async def test_storage_upload_recursive_src_doesnt_exist(
     make_client: _MakeClient,
 ) -> None:
@@ -987,23 +1606,319 @@ async def test_storage_download_regular_file_to_absent_file(
     progress.complete.assert_called_with(StorageProgressComplete(src, dst, file_size))
 
 
-async def test_storage_download_regular_file_to_existing_file(
-    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path
+async def test_storage_download_file_segments(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, tmp_path: Path
 ) -> None:
-    src_file = DATA_FOLDER / "file.txt"
-    storage_file = storage_path / "file.txt"
-    storage_file.write_bytes(src_file.read_bytes())
-    local_dir = tmp_path / "local"
-    local_dir.mkdir()
-    local_file = local_dir / "file.txt"
-    local_file.write_bytes(b"Previous data")
+    content = os.urandom(10000)
+    ranges: List[str] = []
 
-    async with make_client(storage_server.make_url("/")) as client:
-        await client.storage.download_file(
-            URL("storage:file.txt"), URL(local_file.as_uri())
-        )
+    async def handler(request: web.Request) -> web.Response:
+        if request.query["op"] == "GETFILESTATUS":
+            return web.json_response(
+                {
+                    "FileStatus": {
+                        "path": "/user/file.bin",
+                        "type": "FILE",
+                        "length": len(content),
+                        "modificationTime": 3456,
+                        "permission": "read",
+                    }
+                }
+            )
+        assert request.query["op"] == "OPEN"
+        ranges.append(request.headers["Range"])
+        return web.Response(status=206, body=content[request.http_range])
 
-    expected = src_file.read_bytes()
+    app = web.Application()
+    app.router.add_get("/storage/user/file.bin", handler)
+
+    srv = await aiohttp_server(app)
+    local_file = tmp_path / "file.bin"
+    local_file.write_bytes(b"Previous data" * 1000)
+    progress = mock.Mock()
+
+    async with make_client(srv.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.bin"),
+            URL(local_file.as_uri()),
+            segments=4,
+            segment_size=2000,
+            progress=progress,
+        )
+
+    assert local_file.read_bytes() == content
+    assert sorted(ranges) == [
+        "bytes=0-0",
+        "bytes=0-2499",
+        "bytes=2500-4999",
+        "bytes=5000-7499",
+        "bytes=7500-9999",
+    ]
+    src = URL("storage://default/user/file.bin")
+    dst = URL(local_file.as_uri())
+    progress.step.assert_called_with(StorageProgressStep(src, dst, 10000, 10000))
+    progress.complete.assert_called_with(StorageProgressComplete(src, dst, 10000))
+
+
+async def test_storage_download_file_segments_not_supported(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, tmp_path: Path
+) -> None:
+    content = os.urandom(10000)
+    ranges: List[Optional[str]] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        if request.query["op"] == "GETFILESTATUS":
+            return web.json_response(
+                {
+                    "FileStatus": {
+                        "path": "/user/file.bin",
+                        "type": "FILE",
+                        "length": len(content),
+                        "modificationTime": 3456,
+                        "permission": "read",
+                    }
+                }
+            )
+        assert request.query["op"] == "OPEN"
+        ranges.append(request.headers.get("Range"))
+        return web.Response(body=content)
+
+    app = web.Application()
+    app.router.add_get("/storage/user/file.bin", handler)
+
+    srv = await aiohttp_server(app)
+    local_file = tmp_path / "file.bin"
+
+    async with make_client(srv.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.bin"),
+            URL(local_file.as_uri()),
+            segments=4,
+            segment_size=2000,
+        )
+
+    assert local_file.read_bytes() == content
+    assert ranges == ["bytes=0-0", None]
+
+
+async def test_storage_download_file_invalid_segments(
+    make_client: _MakeClient, tmp_path: Path
+) -> None:
+    async with make_client("https://example.com") as client:
+        with pytest.raises(ValueError, match="Invalid number of segments"):
+            await client.storage.download_file(
+                URL("storage:file.bin"), URL(tmp_path.as_uri()), segments=0
+            )
+
+
+async def test_storage_download_dir_segments(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path
+) -> None:
+    storage_dir = storage_path / "folder"
+    copytree(DATA_FOLDER / "nested", storage_dir)
+    (storage_dir / "large.bin").write_bytes(os.urandom(100000))
+    local_dir = tmp_path / "local"
+    local_dir.mkdir()
+    target_dir = local_dir / "nested"
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_dir(
+            URL("storage:folder"),
+            URL(target_dir.as_uri()),
+            segments=3,
+            segment_size=1000,
+        )
+
+    diff = dircmp(storage_dir, target_dir)
+    assert not calc_diff(diff)
+
+
+async def test_storage_download_file_resume_on_retry(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, tmp_path: Path
+) -> None:
+    content = os.urandom(10000)
+    ranges: List[Optional[str]] = []
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        if request.query["op"] == "GETFILESTATUS":
+            return web.json_response(
+                {
+                    "FileStatus": {
+                        "path": "/user/file.bin",
+                        "type": "FILE",
+                        "length": len(content),
+                        "modificationTime": 3456,
+                        "permission": "read",
+                    }
+                }
+            )
+        assert request.query["op"] == "OPEN"
+        ranges.append(request.headers.get("Range"))
+        if len(ranges) == 1:
+            # Break the connection in the middle of the body
+            resp = web.StreamResponse()
+            resp.content_length = len(content)
+            await resp.prepare(request)
+            await resp.write(content[:4000])
+            assert request.transport is not None
+            request.transport.close()
+            return resp
+        return web.Response(status=206, body=content[request.http_range])
+
+    app = web.Application()
+    app.router.add_get("/storage/user/file.bin", handler)
+
+    srv = await aiohttp_server(app)
+    local_file = tmp_path / "file.bin"
+
+    async with make_client(srv.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.bin"), URL(local_file.as_uri())
+        )
+
+    assert local_file.read_bytes() == content
+    assert ranges == [None, "bytes=4000-"]
+
+
+async def test_storage_download_file_restart_if_modified(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, tmp_path: Path
+) -> None:
+    old_content = os.urandom(10000)
+    content = os.urandom(12000)
+    ranges: List[Optional[str]] = []
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        if request.query["op"] == "GETFILESTATUS":
+            data = content if ranges else old_content
+            return web.json_response(
+                {
+                    "FileStatus": {
+                        "path": "/user/file.bin",
+                        "type": "FILE",
+                        "length": len(data),
+                        "modificationTime": 3456 if ranges else 1234,
+                        "permission": "read",
+                    }
+                }
+            )
+        assert request.query["op"] == "OPEN"
+        ranges.append(request.headers.get("Range"))
+        if len(ranges) == 1:
+            resp = web.StreamResponse()
+            resp.content_length = len(old_content)
+            await resp.prepare(request)
+            await resp.write(old_content[:4000])
+            assert request.transport is not None
+            request.transport.close()
+            return resp
+        return web.Response(body=content)
+
+    app = web.Application()
+    app.router.add_get("/storage/user/file.bin", handler)
+
+    srv = await aiohttp_server(app)
+    local_file = tmp_path / "file.bin"
+
+    async with make_client(srv.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.bin"), URL(local_file.as_uri())
+        )
+
+    assert local_file.read_bytes() == content
+    assert ranges == [None, None]
+
+
+async def test_storage_download_file_resume_partial(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr(neuromation.api.storage, "JOURNAL_MIN_SIZE", 0)
+    content = os.urandom(10000)
+    storage_file = storage_path / "file.bin"
+    storage_file.write_bytes(content)
+    local_file = tmp_path / "file.bin"
+    # A partial file left by a crashed download
+    local_file.write_bytes(content[:3000])
+
+    async with make_client(storage_server.make_url("/")) as client:
+        src = URL("storage://default/user/file.bin")
+        src_stat = await client.storage.stat(src)
+        with client.config._open_db() as db:
+            neuromation.api.storage._save_download_journal(
+                db, src, local_file, src_stat
+            )
+        # Make sure the data is not downloaded again
+        storage_file.write_bytes(b"x" * 3000 + content[3000:])
+
+        progress = mock.Mock()
+        await client.storage.download_file(
+            URL("storage:file.bin"), URL(local_file.as_uri()), progress=progress
+        )
+        progress.step.assert_any_call(
+            StorageProgressStep(src, URL(local_file.as_uri()), 3000, 10000)
+        )
+
+        with client.config._open_db() as db:
+            assert (
+                neuromation.api.storage._resume_offset(db, src, local_file, src_stat)
+                == 0
+            )
+
+    assert local_file.read_bytes() == content
+
+
+async def test_storage_download_file_no_resume_if_modified(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    monkeypatch: Any,
+) -> None:
+    monkeypatch.setattr(neuromation.api.storage, "JOURNAL_MIN_SIZE", 0)
+    content = os.urandom(10000)
+    storage_file = storage_path / "file.bin"
+    storage_file.write_bytes(content)
+    local_file = tmp_path / "file.bin"
+    local_file.write_bytes(b"x" * 3000)
+
+    async with make_client(storage_server.make_url("/")) as client:
+        src = URL("storage://default/user/file.bin")
+        src_stat = await client.storage.stat(src)
+        with client.config._open_db() as db:
+            neuromation.api.storage._save_download_journal(
+                db,
+                src,
+                local_file,
+                dataclasses.replace(src_stat, size=src_stat.size + 1),
+            )
+
+        await client.storage.download_file(
+            URL("storage:file.bin"), URL(local_file.as_uri())
+        )
+
+    assert local_file.read_bytes() == content
+
+
+async def test_storage_download_regular_file_to_existing_file(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path
+) -> None:
+    src_file = DATA_FOLDER / "file.txt"
+    storage_file = storage_path / "file.txt"
+    storage_file.write_bytes(src_file.read_bytes())
+    local_dir = tmp_path / "local"
+    local_dir.mkdir()
+    local_file = local_dir / "file.txt"
+    local_file.write_bytes(b"Previous data")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.txt"), URL(local_file.as_uri())
+        )
+
+    expected = src_file.read_bytes()
     downloaded = local_file.read_bytes()
     assert downloaded == expected
 
@@ -1105,6 +2020,177 @@ async def test_storage_download_dir_slash_ending(
     assert not calc_diff(diff)
 
 
+def _make_tree(path: Path, depth: int, width: int) -> None:
+    path.mkdir()
+    for i in range(width):
+        (path / f"file{i}.txt").write_bytes(os.urandom(i * 100))
+    if depth:
+        for i in range(width):
+            _make_tree(path / f"dir{i}", depth - 1, width)
+
+
+def _check_dir_events(progress: mock.Mock) -> None:
+    entered: List[URL] = []
+    left: List[URL] = []
+    for name, args, kwargs in progress.method_calls:
+        data = args[0]
+        if name == "leave":
+            left.append(data.src)
+        elif name in ("enter", "complete"):
+            # Nothing is transferred into a directory after leaving it
+            assert not any(data.src.path.startswith(src.path + "/") for src in left)
+            if name == "enter":
+                entered.append(data.src)
+    assert sorted(entered) == sorted(left)
+
+
+async def test_storage_upload_dir_bounded_queue(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path
+) -> None:
+    local_dir = tmp_path / "local"
+    _make_tree(local_dir, 2, 3)
+    progress = mock.Mock()
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_dir(
+            URL(local_dir.as_uri()),
+            URL("storage:folder"),
+            workers=2,
+            queue_size=1,
+            progress=progress,
+        )
+
+    diff = dircmp(local_dir, storage_path / "folder")
+    assert not calc_diff(diff)
+    assert progress.complete.call_count == 3 + 3 * 3 + 3 * 3 * 3
+    assert progress.enter.call_count == 1 + 3 + 3 * 3
+    _check_dir_events(progress)
+
+
+async def test_storage_download_dir_bounded_queue(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path
+) -> None:
+    storage_dir = storage_path / "folder"
+    _make_tree(storage_dir, 2, 3)
+    target_dir = tmp_path / "local"
+    progress = mock.Mock()
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_dir(
+            URL("storage:folder"),
+            URL(target_dir.as_uri()),
+            workers=1,
+            queue_size=1,
+            progress=progress,
+        )
+
+    diff = dircmp(storage_dir, target_dir)
+    assert not calc_diff(diff)
+    assert progress.complete.call_count == 3 + 3 * 3 + 3 * 3 * 3
+    assert progress.leave.call_count == 1 + 3 + 3 * 3
+    _check_dir_events(progress)
+
+
+@pytest.mark.parametrize(
+    "schedule,expected",
+    [
+        ("size-desc", [500, 300, 200, 100]),
+        ("small-first", [100, 200, 300, 500]),
+        ("fifo", None),
+    ],
+)
+async def test_storage_download_dir_schedule(
+    storage_server: Any,
+    make_client: _MakeClient,
+    tmp_path: Path,
+    storage_path: Path,
+    schedule: str,
+    expected: Optional[List[int]],
+) -> None:
+    storage_dir = storage_path / "folder"
+    storage_dir.mkdir()
+    for i, size in enumerate([300, 100, 500, 200]):
+        (storage_dir / f"file{i}.bin").write_bytes(b"x" * size)
+    if expected is None:
+        # The listing order
+        expected = [child.stat().st_size for child in storage_dir.iterdir()]
+    progress = mock.Mock()
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_dir(
+            URL("storage:folder"),
+            URL((tmp_path / "local").as_uri()),
+            workers=1,
+            schedule=schedule,
+            progress=progress,
+        )
+
+    sizes = [args[0].size for args, kwargs in progress.start.call_args_list]
+    assert sizes == expected
+
+
+async def test_storage_download_dir_invalid_schedule(
+    make_client: _MakeClient, tmp_path: Path
+) -> None:
+    async with make_client("https://example.com") as client:
+        with pytest.raises(ValueError, match="Invalid schedule"):
+            await client.storage.download_dir(
+                URL("storage:folder"), URL(tmp_path.as_uri()), schedule="random"
+            )
+
+
+async def test_storage_download_dir_error_stops_workers(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient, tmp_path: Path
+) -> None:
+    async def handler(request: web.Request) -> web.StreamResponse:
+        op = request.query["op"]
+        if op == "LISTSTATUS":
+            return web.json_response(
+                {
+                    "FileStatuses": {
+                        "FileStatus": [
+                            {
+                                "path": f"file{i}.txt",
+                                "length": 1,
+                                "type": "FILE",
+                                "modificationTime": 0,
+                                "permission": "read",
+                            }
+                            for i in range(10)
+                        ]
+                    }
+                }
+            )
+        raise web.HTTPForbidden()
+
+    app = web.Application()
+    app.router.add_get("/storage/{path:.*}", handler)
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        with pytest.raises(AuthorizationError):
+            await client.storage.download_dir(
+                URL("storage:folder"),
+                URL((tmp_path / "local").as_uri()),
+                workers=2,
+                queue_size=1,
+            )
+
+
+async def test_storage_download_dir_invalid_workers(
+    make_client: _MakeClient, tmp_path: Path
+) -> None:
+    async with make_client("https://example.com") as client:
+        with pytest.raises(ValueError, match="Invalid number of workers"):
+            await client.storage.download_dir(
+                URL("storage:folder"), URL(tmp_path.as_uri()), workers=0
+            )
+        with pytest.raises(ValueError, match="Invalid queue size"):
+            await client.storage.upload_dir(
+                URL(tmp_path.as_uri()), URL("storage:folder"), queue_size=0
+            )
+
+
 @pytest.fixture
 def zero_time_threshold(monkeypatch: Any) -> None:
     monkeypatch.setattr(neuromation.api.storage, "TIME_THRESHOLD", 0.0)
@@ -1246,6 +2332,149 @@ async def test_storage_download_dir_update(
     assert local_file.read_bytes() == b"xxx"
 
 
+async def test_storage_upload_file_update_checksum(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path,
+) -> None:
+    storage_file = storage_path / "file.txt"
+    local_file = tmp_path / "file.txt"
+
+    local_file.write_bytes(b"old")
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_file(
+            URL(local_file.as_uri()),
+            URL("storage:file.txt"),
+            update=True,
+            checksum=True,
+        )
+    assert storage_file.read_bytes() == b"old"
+
+    # Same content with a newer modification time, e.g. after git checkout
+    stat = local_file.stat()
+    os.utime(local_file, (stat.st_atime + 3600, stat.st_mtime + 3600))
+    progress = mock.Mock()
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_file(
+            URL(local_file.as_uri()),
+            URL("storage:file.txt"),
+            update=True,
+            checksum=True,
+            progress=progress,
+        )
+    progress.start.assert_not_called()
+
+    local_file.write_bytes(b"new")
+    os.utime(local_file, (stat.st_atime, stat.st_mtime))
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_file(
+            URL(local_file.as_uri()),
+            URL("storage:file.txt"),
+            update=True,
+            checksum=True,
+        )
+    assert storage_file.read_bytes() == b"new"
+
+
+async def test_storage_download_file_update_checksum(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path,
+) -> None:
+    storage_file = storage_path / "file.txt"
+    local_file = tmp_path / "file.txt"
+
+    storage_file.write_bytes(b"old")
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.txt"),
+            URL(local_file.as_uri()),
+            update=True,
+            checksum=True,
+        )
+    assert local_file.read_bytes() == b"old"
+
+    # Local modification time is older than remote, but the content is the same
+    os.utime(local_file, (0, 0))
+    progress = mock.Mock()
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.txt"),
+            URL(local_file.as_uri()),
+            update=True,
+            checksum=True,
+            progress=progress,
+        )
+    progress.start.assert_not_called()
+
+    # The same size, the local file is still older than remote
+    local_file.write_bytes(b"xxx")
+    os.utime(local_file, (1, 1))
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.download_file(
+            URL("storage:file.txt"),
+            URL(local_file.as_uri()),
+            update=True,
+            checksum=True,
+        )
+    assert local_file.read_bytes() == b"old"
+
+
+async def test_storage_upload_dir_update_checksum(
+    storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path,
+) -> None:
+    local_dir = tmp_path / "folder"
+    local_dir.mkdir()
+    (local_dir / "same.txt").write_bytes(b"same")
+    (local_dir / "changed.txt").write_bytes(b"old")
+
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_dir(
+            URL(local_dir.as_uri()), URL("storage:folder"), update=True, checksum=True
+        )
+
+    for name in ("same.txt", "changed.txt"):
+        stat = (local_dir / name).stat()
+        os.utime(local_dir / name, (stat.st_atime + 3600, stat.st_mtime + 3600))
+    (local_dir / "changed.txt").write_bytes(b"new")
+    progress = mock.Mock()
+    async with make_client(storage_server.make_url("/")) as client:
+        await client.storage.upload_dir(
+            URL(local_dir.as_uri()),
+            URL("storage:folder"),
+            update=True,
+            checksum=True,
+            progress=progress,
+        )
+
+    assert (storage_path / "folder" / "changed.txt").read_bytes() == b"new"
+    started = [call[0][0].src.name for call in progress.start.call_args_list]
+    assert started == ["changed.txt"]
+
+
+async def test_storage_file_hash_cache(
+    make_client: _MakeClient, tmp_path: Path
+) -> None:
+    local_file = tmp_path / "file.txt"
+    local_file.write_bytes(b"data")
+    stat = local_file.stat()
+
+    async with make_client("https://example.com") as client:
+        with client.config._open_db() as db:
+            assert neuromation.api.storage._load_file_hash(db, local_file, stat) is None
+        # The hash is calculated once and taken from the manifest later
+        with mock.patch.object(
+            neuromation.api.storage,
+            "_calc_file_hash",
+            wraps=neuromation.api.storage._calc_file_hash,
+        ) as calc:
+            content_hash = await client.storage._file_hash(local_file, stat)
+            assert await client.storage._file_hash(local_file, stat) == content_hash
+            assert calc.call_count == 1
+        assert content_hash == hashlib.sha256(b"data").hexdigest()
+
+        local_file.write_bytes(b"other data")
+        stat = local_file.stat()
+        with client.config._open_db() as db:
+            assert neuromation.api.storage._load_file_hash(db, local_file, stat) is None
+
+
 async def test_storage_upload_dir_with_ignore_file_names(
     storage_server: Any, make_client: _MakeClient, tmp_path: Path, storage_path: Path
 ) -> None:
@@ -1,6 +1,15 @@
+from typing import Iterator, List
+
 import pytest
 
-from neuromation.cli.formatters.ftable import Align, ColumnWidth, _cell, _row, table
+from neuromation.cli.formatters.ftable import (
+    Align,
+    ColumnWidth,
+    _cell,
+    _row,
+    table,
+    table_stream,
+)
 
 
 class TestColumnWidth:
@@ -148,3 +157,35 @@ class TestTable:
             )
         )
         assert result == ["a ", "b "]
+
+
+class TestTableStream:
+    def test_empty(self) -> None:
+        assert list(table_stream([])) == []
+
+    def test_same_as_table(self) -> None:
+        rows = [["a", "Alpha"], ["b", "Bravo"], ["c", "Charlie"]]
+        assert list(table_stream(rows)) == list(table(rows))
+
+    def test_widths_from_probe(self) -> None:
+        rows = [["a", "Alpha"], ["b", "Bravo"], ["c", "Charlie"]]
+        result = list(table_stream(rows, probe=2))
+        assert result == ["a  Alpha", "b  Bravo", "c  Charl", "   ie   "]
+
+    def test_widths_from_spec(self) -> None:
+        rows = [["a", "Alpha"], ["b", "Charlie"]]
+        widths = [ColumnWidth(), ColumnWidth(7)]
+        result = list(table_stream(rows, widths=widths, probe=1))
+        assert result == ["a  Alpha  ", "b  Charlie"]
+
+    def test_lazy(self) -> None:
+        consumed = []
+
+        def rows() -> Iterator[List[str]]:
+            for i in range(1000):
+                consumed.append(i)
+                yield [str(i)]
+
+        lines = table_stream(rows(), probe=10)
+        assert next(lines) == "0"
+        assert len(consumed) == 10
@@ -22,6 +22,8 @@ from neuromation.api.parsing_utils import _ImageNameParser
 from neuromation.cli.formatters.jobs import (
     JobStartProgress,
     JobStatusFormatter,
+    JobsTelemetryFormatter,
+    JobsWatchPrinter,
     JobTelemetryFormatter,
     ResourcesFormatter,
     SimpleJobsFormatter,
@@ -1052,6 +1054,21 @@ class TestJobTelemetryFormatter:
         )
 
 
+class TestJobsTelemetryFormatter:
+    def test_format(self) -> None:
+        telemetry = JobTelemetry(
+            cpu=0.12345,
+            memory=256.1234,
+            timestamp=1_517_248_466,
+            gpu_duty_cycle=99,
+            gpu_memory=64.5,
+        )
+        lines = list(JobsTelemetryFormatter()([("job-1", telemetry), ("my-job", None)]))
+        assert lines[0].split()[:3] == ["JOB", "CPU", "MEMORY"]
+        assert lines[1].split()[:5] == ["job-1", "0.123", "256.123", "99", "64.500"]
+        assert lines[2].split() == ["my-job", "-", "-", "-", "-", "-"]
+
+
 class TestJobStatusFormatter:
     def test_format_timedelta(self) -> None:
         delta = timedelta(days=1, hours=2, minutes=3, seconds=4)
@@ -1428,6 +1445,36 @@ class TestTabularJobsFormatter:
         assert result == ["         Status Code", "              failed"]
 
 
+class TestJobsWatchPrinter:
+    def test_redraw_changed_lines(self, capfd: Any, click_tty_emulation: Any) -> None:
+        printer = JobsWatchPrinter(height=24)
+        printer(["ID  STATUS", "job-1  pending", "job-2  pending"])
+        out, err = capfd.readouterr()
+        assert out == "ID  STATUS\njob-1  pending\njob-2  pending\n"
+
+        printer(["ID  STATUS", "job-1  running", "job-2  pending"])
+        out, err = capfd.readouterr()
+        assert "job-1  running" in out
+        assert "ID  STATUS" not in out
+        assert "job-2" not in out
+
+        # Removed lines are cleared
+        printer(["ID  STATUS", "job-1  running"])
+        out, err = capfd.readouterr()
+        assert out == f"{CSI}1A{CSI}0K\n"
+
+        # Nothing changed, nothing is printed
+        printer(["ID  STATUS", "job-1  running"])
+        out, err = capfd.readouterr()
+        assert out == ""
+
+    def test_cut_to_height(self, capfd: Any, click_tty_emulation: Any) -> None:
+        printer = JobsWatchPrinter(height=3)
+        printer(f"line {i}" for i in range(10))
+        out, err = capfd.readouterr()
+        assert out == "line 0\nline 1\n"
+
+
 class TestResourcesFormatter:
     def test_tiny_container(self) -> None:
         resources = Resources(
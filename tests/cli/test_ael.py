@@ -1,7 +1,22 @@
+import asyncio
+import io
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, List, Optional, cast
+from unittest import mock
+
 from prompt_toolkit.key_binding import KeyPress
 from prompt_toolkit.keys import Keys
 
-from neuromation.cli.ael import _has_detach
+from neuromation.api import StdStream
+from neuromation.api.jobs import Message
+from neuromation.cli.ael import (
+    AttachHelper,
+    LogWriter,
+    _has_detach,
+    _process_stdout_non_tty,
+    _tail_log,
+    process_logs_many,
+)
 
 
 def test_detach_short() -> None:
@@ -70,3 +85,140 @@ def test_detach_present_in_the_middle() -> None:
         ],
         term,
     )
+
+
+async def test_tail_log_finished() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"line 1\nline 2\nli"
+        yield b"ne 3\nline 4"
+
+    ret = [chunk async for chunk in _tail_log(chunks(), 2)]
+    assert ret == [b"line 3\nline 4"]
+
+
+async def test_tail_log_running() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"line 1\nline 2\nline 3\n"
+        # The log is caught up, new lines are passed as is
+        await asyncio.sleep(0.1)
+        yield b"line 4\n"
+        yield b"line 5\n"
+
+    with mock.patch("neuromation.cli.ael.LOG_TAIL_IDLE", 0.05):
+        ret = [chunk async for chunk in _tail_log(chunks(), 1)]
+    assert ret == [b"line 3\n", b"line 4\n", b"line 5\n"]
+
+
+async def test_tail_log_zero() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"line 1\nline 2\n"
+
+    assert [chunk async for chunk in _tail_log(chunks(), 0)] == []
+
+
+async def test_log_writer_coalesces_flushes() -> None:
+    stream = mock.Mock(wraps=io.BytesIO())
+    writer = LogWriter(stream, decode=False)
+    for i in range(100):
+        writer.write(b"chunk\n")
+    assert stream.flush.call_count == 0
+    await asyncio.sleep(0.2)
+    assert stream.flush.call_count == 1
+    writer.close()
+    assert stream.getvalue() == b"chunk\n" * 100
+
+
+async def test_log_writer_flush_held_off_by_lock() -> None:
+    stream = mock.Mock(wraps=io.BytesIO())
+    lock = asyncio.Semaphore()
+    writer = LogWriter(stream, decode=False, lock=lock)
+    async with lock:
+        writer.write(b"chunk\n")
+        await asyncio.sleep(0.2)
+        assert stream.flush.call_count == 0
+    await asyncio.sleep(0.2)
+    assert stream.flush.call_count == 1
+    writer.close()
+
+
+async def test_log_writer_decode() -> None:
+    stream = io.StringIO()
+    writer = LogWriter(stream, decode=True)
+    data = "привет\n".encode()
+    written: List[str] = []
+    for i in range(len(data)):
+        writer.write(data[i : i + 1])
+        written.append(stream.getvalue())
+    writer.close()
+    assert stream.getvalue() == "привет\n"
+    # Incomplete characters are not written
+    assert all("\ufffd" not in text for text in written)
+
+
+def _logs_root(logs: Any) -> Any:
+    async def monitor(id: str) -> AsyncIterator[bytes]:
+        for chunk in logs[id]:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+            await asyncio.sleep(0)
+
+    return SimpleNamespace(
+        color=False, client=SimpleNamespace(jobs=SimpleNamespace(monitor=monitor))
+    )
+
+
+async def test_process_logs_many(capsys: Any) -> None:
+    root = _logs_root(
+        {"job-1": [b"one\ntw", b"o\nthree"], "job-2": [b"first\n", b"second\n"]}
+    )
+    ok = await process_logs_many(root, [("job-1", "job-1"), ("job-2", "my-job")])
+    assert ok
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted(lines) == [
+        "[job-1] one",
+        "[job-1] three",
+        "[job-1] two",
+        "[my-job] first",
+        "[my-job] second",
+    ]
+    assert lines.index("[job-1] one") < lines.index("[job-1] two")
+    assert lines.index("[my-job] first") < lines.index("[my-job] second")
+
+
+async def test_process_logs_many_chatty_job(capsys: Any) -> None:
+    root = _logs_root({"job-1": [b"noise\n" * 10000], "job-2": [b"signal\n"]})
+    ok = await process_logs_many(root, [("job-1", "job-1"), ("job-2", "job-2")])
+    assert ok
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 10001
+    assert lines.index("[job-2] signal") <= 1000
+
+
+async def test_process_logs_many_error(capsys: Any) -> None:
+    root = _logs_root({"job-1": [b"line\n", ValueError("boom")], "job-2": [b"ok\n"]})
+    ok = await process_logs_many(root, [("job-1", "job-1"), ("job-2", "job-2")])
+    assert not ok
+    out, err = capsys.readouterr()
+    assert sorted(out.splitlines()) == ["[job-1] line", "[job-2] ok"]
+    assert "Cannot get logs of job job-1: boom" in err
+
+
+async def test_process_stdout_non_tty_raw(capsysbinary: Any) -> None:
+    messages = [
+        Message(1, memoryview(b"binary \xff\xfe\n")),
+        Message(2, memoryview(b"error\n")),
+        Message(1, memoryview(b"tail")),
+    ]
+
+    class Stream:
+        async def read_out(self) -> Optional[Message]:
+            return messages.pop(0) if messages else None
+
+    root: Any = SimpleNamespace(tty=False)
+    stream = cast(StdStream, Stream())
+    await _process_stdout_non_tty(root, stream, AttachHelper(quiet=True))
+    out, err = capsysbinary.readouterr()
+    # Output is not decoded if stdout is not a terminal
+    assert out == b"binary \xff\xfe\ntail"
+    assert err == b"error\n"
@@ -1,30 +1,38 @@
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Callable, Tuple
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from unittest import mock
 
 import click
 import pytest
 import toml
 
-from neuromation.api import Client, JobStatus
+from neuromation.api import Client, Container, ExecResult, JobStatus, JobTelemetry
+from neuromation.api.jobs import Jobs
 from neuromation.cli.job import (
     DEFAULT_JOB_LIFE_SPAN,
     NEUROMATION_ROOT_ENV_VAR,
     _parse_cmd,
     _parse_timedelta,
+    _watch_jobs,
     build_env,
     calc_columns,
     calc_life_span,
     calc_statuses,
 )
 from neuromation.cli.parse_utils import COLUMNS_MAP, get_default_columns
+from neuromation.cli.telemetry import TelemetryRecorder
+
+from .conftest import SysCapWithCode
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 _MakeClient = Callable[..., Client]
+_RunCli = Callable[[List[str]], SysCapWithCode]
 
 
 @pytest.mark.parametrize("statuses", [("all",), ("all", "failed", "succeeded")])
@@ -295,3 +303,257 @@ def test_parse_cmd_single() -> None:
 def test_parse_cmd_multiple() -> None:
     cmd = ["bash", "-c", "ls -l && pwd"]
     assert _parse_cmd(cmd) == "bash -c 'ls -l && pwd'"
+
+
+def test_run_from_file(run_cli: _RunCli, tmp_path: Path) -> None:
+    spec = tmp_path / "sweep.yaml"
+    spec.write_text(
+        "- image: ubuntu\n"
+        "  cmd: [python, train.py, --lr, '0.1']\n"
+        "  env: {SEED: 1}\n"
+        "- image: ubuntu\n"
+        "  cmd: python train.py --lr 0.2\n"
+    )
+    containers = []
+
+    async def run(container: Container, **kwargs: Any) -> Any:
+        assert kwargs["tags"] == ("sweep",)
+        containers.append(container)
+        if len(containers) == 2:
+            raise ValueError("Bad job")
+        return mock.Mock(id="job-id", status=JobStatus.PENDING)
+
+    with mock.patch.object(Jobs, "run", side_effect=run):
+        capture = run_cli(
+            ["run", "--from-file", str(spec), "--tag", "sweep", "-e", "ENV=val"]
+        )
+    assert capture.code == 1
+    assert [container.command for container in containers] == [
+        "python train.py --lr 0.1",
+        "python train.py --lr 0.2",
+    ]
+    assert containers[0].env == {"ENV": "val", "SEED": "1"}
+    assert containers[1].env == {"ENV": "val"}
+    assert "job-id" in capture.out
+    assert "Error: Bad job" in capture.out
+
+
+def test_run_from_file_no_image(run_cli: _RunCli, tmp_path: Path) -> None:
+    spec = tmp_path / "sweep.yaml"
+    spec.write_text("- cmd: python train.py\n")
+    capture = run_cli(["run", "--from-file", str(spec)])
+    assert capture.code == 2
+    assert "job #1 has no image" in capture.err
+
+
+def test_run_from_file_env_not_mapping(run_cli: _RunCli, tmp_path: Path) -> None:
+    spec = tmp_path / "sweep.yaml"
+    spec.write_text("- image: ubuntu\n- image: ubuntu\n  env: [A=1]\n")
+    capture = run_cli(["run", "--from-file", str(spec)])
+    assert capture.code == 2
+    assert "job #2 env should be a mapping" in capture.err
+
+
+def test_kill_name_prefix(run_cli: _RunCli) -> None:
+    killed = []
+
+    def list(**kwargs: Any) -> Any:
+        assert kwargs["owners"] == {"user"}
+        assert kwargs["tags"] == ()
+
+        async def gen() -> Any:
+            for id, name in [("job-1", "sweep-1"), ("job-2", None), ("job-3", "sweep")]:
+                yield SimpleNamespace(id=id, name=name)
+
+        return gen()
+
+    async def kill(id: str) -> None:
+        killed.append(id)
+        if id == "job-3":
+            raise ValueError("Not found")
+
+    with mock.patch.object(Jobs, "list", side_effect=list), mock.patch.object(
+        Jobs, "kill", side_effect=kill
+    ):
+        capture = run_cli(["kill", "--name-prefix", "sweep"])
+    assert killed == ["job-1", "job-3"]
+    assert capture.out == "job-1"
+    assert "Cannot kill job job-3: Not found" in capture.err
+    assert capture.code == 1
+
+
+def test_ls_watch_requires_tty(run_cli: _RunCli) -> None:
+    capture = run_cli(["ps", "--watch"])
+    assert capture.code == 2
+    assert "--watch requires a terminal" in capture.err
+
+
+async def test_watch_jobs() -> None:
+    def job(id: str, status: str, minute: int) -> Any:
+        created_at = datetime(2020, 1, 1, 0, minute, tzinfo=timezone.utc)
+        return SimpleNamespace(
+            id=id,
+            status=JobStatus(status),
+            history=SimpleNamespace(created_at=created_at),
+        )
+
+    jobs = {
+        "job-1": job("job-1", "succeeded", 1),
+        "job-2": job("job-2", "running", 2),
+        "job-3": job("job-3", "pending", 3),
+    }
+    calls: List[Tuple[Set[JobStatus], Optional[datetime]]] = []
+
+    async def list_jobs(
+        statuses: Set[JobStatus] = set(), since: Optional[datetime] = None
+    ) -> AsyncIterator[Any]:
+        calls.append((statuses, since))
+        for item in list(jobs.values()):
+            if statuses and item.status not in statuses:
+                continue
+            if since is not None and item.history.created_at < since:
+                continue
+            yield item
+
+    def ids(ret: List[Any]) -> Dict[str, str]:
+        return {item.id: item.status.value for item in ret}
+
+    lists = _watch_jobs(list_jobs, set(), None)
+    assert ids(await lists.__anext__()) == {
+        "job-1": "succeeded",
+        "job-2": "running",
+        "job-3": "pending",
+    }
+    assert calls == [(set(), None)]
+
+    # Only unfinished and created jobs are listed
+    del calls[:]
+    jobs["job-4"] = job("job-4", "pending", 4)
+    jobs["job-3"] = job("job-3", "running", 3)
+    assert ids(await lists.__anext__()) == {
+        "job-1": "succeeded",
+        "job-2": "running",
+        "job-3": "running",
+        "job-4": "pending",
+    }
+    unfinished = {JobStatus.PENDING, JobStatus.RUNNING}
+    since = datetime(2020, 1, 1, 0, 2, 59, tzinfo=timezone.utc)
+    assert calls == [(unfinished, None), (set(), since)]
+
+    # Finished jobs are listed from their creation, deleted ones are dropped
+    del calls[:]
+    jobs["job-2"] = job("job-2", "failed", 2)
+    del jobs["job-3"]
+    assert ids(await lists.__anext__()) == {
+        "job-1": "succeeded",
+        "job-2": "failed",
+        "job-4": "pending",
+    }
+    since = datetime(2020, 1, 1, 0, 1, 59, tzinfo=timezone.utc)
+    assert calls == [(unfinished, None), (set(), since)]
+
+
+async def test_watch_jobs_statuses() -> None:
+    created_at = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    jobs = [
+        SimpleNamespace(
+            id="job-1",
+            status=JobStatus.RUNNING,
+            history=SimpleNamespace(created_at=created_at),
+        )
+    ]
+
+    async def list_jobs(
+        statuses: Set[JobStatus] = {JobStatus.RUNNING},
+        since: Optional[datetime] = None,
+    ) -> AsyncIterator[Any]:
+        for item in jobs:
+            if item.status in statuses:
+                yield item
+
+    lists = _watch_jobs(list_jobs, {JobStatus.RUNNING}, None)
+    assert [item.id for item in await lists.__anext__()] == ["job-1"]
+    # A job which is finished does not pass the status filter anymore
+    jobs[0] = SimpleNamespace(
+        id="job-1",
+        status=JobStatus.SUCCEEDED,
+        history=SimpleNamespace(created_at=created_at),
+    )
+    assert await lists.__anext__() == []
+
+
+def test_logs_output_several_jobs(run_cli: _RunCli, tmp_path: Path) -> None:
+    output = tmp_path / "job.log"
+    capture = run_cli(["logs", "-o", str(output), "job-1", "job-2"])
+    assert capture.code == 2
+    assert "--output works with a single job only" in capture.err
+
+
+def test_top_summary(run_cli: _RunCli, tmp_path: Path) -> None:
+    path = tmp_path / "sweep.top"
+    with path.open("wb") as stream:
+        recorder = TelemetryRecorder(stream)
+        for i in range(1, 101):
+            recorder.add("job-1", JobTelemetry(cpu=i, memory=2 * i, timestamp=i))
+        recorder.flush()
+    capture = run_cli(["top", "--summary", str(path)])
+    assert capture.code == 0, capture
+    header, row = capture.out.splitlines()
+    assert header.split()[:2] == ["JOB", "SAMPLES"]
+    assert (
+        row.split()
+        == [
+            "job-1",
+            "100",
+            "50.000",
+            "95.000",
+            "100.000",
+            "100.000",
+            "190.000",
+            "200.000",
+        ]
+        + ["-"] * 6
+    )
+
+
+def test_top_summary_with_jobs(run_cli: _RunCli, tmp_path: Path) -> None:
+    path = tmp_path / "sweep.top"
+    path.write_bytes(b"")
+    capture = run_cli(["top", "--summary", str(path), "job-1"])
+    assert capture.code == 2
+    assert "--summary cannot be used with jobs" in capture.err
+
+
+def test_exec_tag(run_cli: _RunCli) -> None:
+    executed = []
+
+    def list(**kwargs: Any) -> Any:
+        assert kwargs["owners"] == {"user"}
+        assert kwargs["tags"] == ("sweep",)
+
+        async def gen() -> Any:
+            for id, name in [("job-1", "sweep-1"), ("job-2", None)]:
+                yield SimpleNamespace(id=id, name=name)
+
+        return gen()
+
+    async def exec_collect(id: str, cmd: str) -> ExecResult:
+        executed.append((id, cmd))
+        if id == "job-1":
+            return ExecResult(exit_code=0, stdout=b"one\ntwo\n", stderr=b"")
+        return ExecResult(exit_code=3, stdout=b"", stderr=b"oops")
+
+    with mock.patch.object(Jobs, "list", side_effect=list), mock.patch.object(
+        Jobs, "_exec_collect", side_effect=exec_collect
+    ):
+        capture = run_cli(["exec", "--tag", "sweep", "--prefix", "--", "df", "-h"])
+    assert executed == [("job-1", "df -h"), ("job-2", "df -h")]
+    assert capture.out.splitlines() == ["[sweep-1] one", "[sweep-1] two"]
+    err = capture.err.splitlines()
+    assert err[0] == "[job-2] oops"
+    assert [line.split() for line in err[1:]] == [
+        ["JOB", "EXIT", "CODE"],
+        ["sweep-1", "0"],
+        ["job-2", "3"],
+    ]
+    assert capture.code == 1
@@ -0,0 +1,63 @@
+import io
+import math
+
+import pytest
+
+from neuromation.api import JobTelemetry
+from neuromation.cli.telemetry import (
+    Percentiles,
+    TelemetryFormatError,
+    TelemetryRecorder,
+    percentiles,
+    read_telemetry,
+)
+
+
+def test_record_and_read() -> None:
+    stream = io.BytesIO()
+    recorder = TelemetryRecorder(stream, chunk_size=2)
+    for i in range(5):
+        recorder.add("job-1", JobTelemetry(cpu=i, memory=10 * i, timestamp=100 + i))
+    recorder.add(
+        "job-2",
+        JobTelemetry(
+            cpu=0.5, memory=16, timestamp=200, gpu_duty_cycle=40, gpu_memory=1024
+        ),
+    )
+    # Full chunks are written as soon as they are collected
+    assert read_telemetry(io.BytesIO(stream.getvalue()))["job-1"]["cpu"].tolist() == [
+        0,
+        1,
+        2,
+        3,
+    ]
+    recorder.flush()
+
+    ret = read_telemetry(io.BytesIO(stream.getvalue()))
+    assert ret["job-1"]["cpu"].tolist() == [0, 1, 2, 3, 4]
+    assert ret["job-1"]["memory"].tolist() == [0, 10, 20, 30, 40]
+    assert ret["job-1"]["timestamp"].tolist() == [100, 101, 102, 103, 104]
+    assert all(math.isnan(value) for value in ret["job-1"]["gpu_duty_cycle"])
+    assert ret["job-2"]["gpu_duty_cycle"].tolist() == [40]
+    assert ret["job-2"]["gpu_memory"].tolist() == [1024]
+
+
+def test_read_truncated() -> None:
+    stream = io.BytesIO()
+    recorder = TelemetryRecorder(stream)
+    recorder.add("job-1", JobTelemetry(cpu=1, memory=1, timestamp=1))
+    recorder.flush()
+    with pytest.raises(TelemetryFormatError):
+        read_telemetry(io.BytesIO(stream.getvalue()[:-1]))
+
+
+def test_read_not_a_record() -> None:
+    with pytest.raises(TelemetryFormatError):
+        read_telemetry(io.BytesIO(b"garbage-garbage"))
+
+
+def test_percentiles() -> None:
+    assert percentiles([float(i) for i in range(1, 101)]) == Percentiles(50, 95, 100)
+    assert percentiles([math.nan, 3.0, math.nan]) == Percentiles(3, 3, 3)
+    assert percentiles([math.nan]) is None
+    assert percentiles([]) is None
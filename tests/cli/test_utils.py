@@ -1,5 +1,15 @@
+import asyncio
 from pathlib import Path
-from typing import Any, Callable, Dict, NoReturn
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+)
 from unittest import mock
 
 import pytest
@@ -10,10 +20,13 @@ from neuromation.api import Action, Client, JobStatus
 from neuromation.cli.root import Root
 from neuromation.cli.utils import (
     pager_maybe,
+    pager_maybe_stream,
     parse_file_resource,
     parse_permission_action,
     parse_resource_for_sharing,
     resolve_job,
+    resolve_jobs,
+    wait_job,
 )
 from tests import _TestServerFactory
 
@@ -354,6 +367,72 @@ async def test_resolve_job_id__from_uri_without_owner__server_error(
         assert resolved == job_name
 
 
+async def test_resolve_jobs(
+    aiohttp_server: _TestServerFactory, make_client: _MakeClient
+) -> None:
+    job_id = "job-81839be3-3ecf-4ec5-80d9-19b1588869db"
+    jobs = [
+        dict(_job_entry("job-id-1"), name="job-name", owner="user"),
+        dict(_job_entry("job-id-2"), name="other-name"),
+        dict(_job_entry("job-id-3"), name="job-name", owner="user"),
+        dict(_job_entry("job-id-4"), name="old-name", owner="user", status="failed"),
+    ]
+    requests = []
+
+    async def handler(request: web.Request) -> web.Response:
+        requests.append(request.query)
+        statuses = request.query.getall("status", [])
+        owners = request.query.getall("owner")
+        name = request.query.get("name")
+        filtered_jobs = [
+            job
+            for job in jobs
+            if (not statuses or job["status"] in statuses)
+            and job["owner"] in owners
+            and (name is None or job["name"] == name)
+        ]
+        if request.query.get("reverse"):
+            filtered_jobs.reverse()
+        return web.json_response({"jobs": filtered_jobs})
+
+    app = web.Application()
+    app.router.add_get("/jobs", handler)
+
+    srv = await aiohttp_server(app)
+
+    async with make_client(srv.make_url("/")) as client:
+        resolved = await resolve_jobs(
+            [
+                "job-name",
+                job_id,
+                "job://default/job-owner/other-name",
+                "job://default/user/other-name",
+                "unknown-name",
+                "old-name",
+            ],
+            client=client,
+            status={JobStatus.RUNNING},
+        )
+    assert resolved == [
+        "job-id-3",
+        job_id,
+        "job-id-2",
+        "other-name",
+        "unknown-name",
+        "job-id-4",
+    ]
+    # Names are resolved by a single listing, missing ones one by one
+    listing, *lookups = requests
+    assert listing.getall("status") == ["running"]
+    assert sorted(listing.getall("owner")) == ["job-owner", "user"]
+    assert sorted((query["owner"], query["name"]) for query in lookups) == [
+        ("user", "old-name"),
+        ("user", "other-name"),
+        ("user", "unknown-name"),
+    ]
+    assert all("status" not in query for query in lookups)
+
+
 async def test_resolve_job_id__from_uri__missing_job_id(
     aiohttp_server: _TestServerFactory, make_client: _MakeClient
 ) -> None:
@@ -585,3 +664,76 @@ def test_pager_maybe_terminal_smaller() -> None:
         mock_echo_via_pager.assert_called_once()
         lines_it = mock_echo_via_pager.call_args[0][0]
         assert "".join(lines_it) == "\n".join(large_input[1:])
+
+
+async def test_pager_maybe_stream() -> None:
+    received: List[int] = []
+
+    async def gen() -> AsyncIterator[int]:
+        for x in range(20):
+            received.append(x)
+            yield x
+
+    def formatter(items: Iterable[int]) -> Iterator[str]:
+        for x in items:
+            # items are pulled lazily, one by one
+            assert received[-1] == x
+            yield f"line {x}"
+
+    with mock.patch.multiple(
+        "click", echo=mock.DEFAULT, echo_via_pager=mock.DEFAULT
+    ) as mocked:
+        mock_echo = mocked["echo"]
+        mock_echo_via_pager = mocked["echo_via_pager"]
+
+        # the pager consumes lines in a worker thread
+        paged: List[str] = []
+        mock_echo_via_pager.side_effect = lambda lines: paged.append("".join(lines))
+
+        await pager_maybe_stream(gen(), formatter, True, (100, 10))
+        mock_echo.assert_not_called()
+        mock_echo_via_pager.assert_called_once()
+        assert paged == ["\n".join(f"line {x}" for x in range(20))]
+
+
+async def test_wait_job() -> None:
+    job = mock.Mock(id="job-id", status=JobStatus.PENDING)
+    running = mock.Mock(id="job-id", status=JobStatus.RUNNING)
+
+    async def wait(ids: List[str], *, until: Any) -> AsyncIterator[Any]:
+        assert ids == ["job-id"]
+        assert until == {JobStatus.RUNNING}
+        await asyncio.sleep(0.05)
+        yield running
+
+    client = mock.Mock()
+    client.jobs.wait = wait
+    steps: List[Any] = []
+    ret = await wait_job(
+        client, job, until={JobStatus.RUNNING}, step=steps.append, interval=0.01
+    )
+    assert ret is running
+    # the progress is redrawn periodically while the job is pending
+    assert steps.count(job) > 1
+    assert steps[-1] is running
+
+
+async def test_wait_job_stopped_by_step() -> None:
+    job = mock.Mock(id="job-id", status=JobStatus.PENDING)
+    finished = False
+
+    async def wait(ids: List[str], *, until: Any) -> AsyncIterator[Any]:
+        nonlocal finished
+        try:
+            await asyncio.sleep(10)
+            yield job
+        finally:
+            finished = True
+
+    client = mock.Mock()
+    client.jobs.wait = wait
+    ret = await wait_job(
+        client, job, until={JobStatus.RUNNING}, step=lambda job: False, interval=0.01
+    )
+    assert ret is job
+    assert finished
@@ -663,6 +663,28 @@ def test_e2e_ls_show_hidden(tmp_path: Path, helper: Helper) -> None:
     assert captured.out.splitlines() == [".bar", "foo"]
 
 
+@pytest.mark.e2e
+def test_ls_recursive(helper: Helper, tmp_path: Path) -> None:
+    folder = tmp_path / "folder"
+    folder.mkdir()
+    (folder / "foo").write_bytes(b"foo")
+    (folder / "bar").write_bytes(b"bar")
+    subfolder = folder / "folder"
+    subfolder.mkdir()
+    (subfolder / "baz").write_bytes(b"baz")
+    (folder / ".hidden").mkdir()
+    (folder / ".hidden" / "qux").write_bytes(b"qux")
+
+    helper.run_cli(["storage", "cp", "-r", folder.as_uri(), helper.tmpstorage])
+
+    captured = helper.run_cli(["storage", "ls", "-R", helper.tmpstorage + "folder"])
+    lines = captured.out.splitlines()
+    assert lines[0].endswith("/folder':")
+    assert lines[1:5] == ["bar", "folder", "foo", ""]
+    assert lines[5].endswith("/folder/folder':")
+    assert lines[6:] == ["baz"]
+
+
 @pytest.mark.e2e
 def test_tree(helper: Helper, data: _Data, tmp_path: Path) -> None:
     folder = tmp_path / "folder"